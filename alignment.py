@@ -0,0 +1,128 @@
+"""
+N-way alignment of date-indexed series on one calendar
+
+The scripts combine series from different sources and frequencies: daily index
+prices from Yahoo (often timezone-aware), monthly FRED observations and
+fortnightly RBI tables reported on irregular dates. normalize_index() is applied
+once when data is loaded (naive dates, sorted, one row per date), and align()
+then puts any number of series on one calendar:
+  inner - the dates every series reports
+  outer - every date any series reports (NaN where a series has no value)
+  asof  - the calendar of one input (`on`), every series taking its last value
+          on or before each date (as merge_asof(direction='backward') would),
+          optionally no older than `tolerance`
+Each input is looked up once (get_indexer / searchsorted) and gathered straight
+into one preallocated array, so no series is reindexed or copied on its own.
+"""
+
+import numpy as np
+import pandas as pd
+
+ALIGN_HOW = ('inner', 'outer', 'asof')
+
+
+def normalize_index(data):
+    """
+    Same data on a naive (timezone dropped, wall-clock dates kept), sorted,
+    duplicate-free DatetimeIndex, the last row winning for duplicate dates.
+    Returns data itself when the index is already like that.
+    """
+    index = data.index
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(pd.to_datetime(index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    if not index.is_unique:
+        keep = ~index.duplicated(keep='last')
+        data, index = data[keep], index[keep]
+    if not index.is_monotonic_increasing:
+        order = index.argsort(kind='stable')
+        data, index = data.iloc[order], index[order]
+    index = index.rename(index.name or 'Date')
+    if index is data.index or (index.equals(data.index) and index.dtype == data.index.dtype
+                               and index.name == data.index.name):
+        return data
+    return data.set_axis(index, axis=0)
+
+
+def _inputs(data):
+    """[(key, normalized frame)] from {key: Series/DataFrame} or a list of them"""
+    items = data.items() if isinstance(data, dict) else ((getattr(d, 'name', None), d) for d in data)
+    inputs = []
+    for key, item in items:
+        if isinstance(item, pd.Series):
+            item = item.to_frame(key if key is not None else item.name)
+        inputs.append((key, normalize_index(item)))
+    return inputs
+
+
+def _dates(index):
+    return index.to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def _calendar(inputs, how, on):
+    if how == 'asof':
+        if isinstance(on, pd.Index):
+            index = pd.DatetimeIndex(on)
+            index = index.tz_localize(None) if index.tz is not None else index
+            return index.unique().sort_values().rename('Date')
+        for key, frame in inputs:
+            if on is None or key == on or (on in frame.columns):
+                return frame.index
+        raise KeyError(f"No input named {on!r} to align on")
+    dates = [_dates(frame.index) for _, frame in inputs]
+    if how == 'inner':
+        common = dates[0]
+        for other in dates[1:]:
+            common = np.intersect1d(common, other, assume_unique=True)
+    else:
+        common = np.unique(np.concatenate(dates))
+    unit = inputs[0][1].index.unit
+    return pd.DatetimeIndex(common.view('datetime64[ns]'), name='Date').as_unit(unit)
+
+
+def align(data, how='inner', on=None, tolerance=None):
+    """
+    Align several date-indexed series on one calendar
+
+    data:      {name: Series or DataFrame} or a list of them; a Series becomes a
+               column named by its key (or its own name), a DataFrame keeps its columns
+    how:       'inner', 'outer' or 'asof' (see module docstring)
+    on:        for 'asof', the key (or a column) of the input whose dates form the
+               calendar, or a DatetimeIndex; default the first input
+    tolerance: for 'asof', maximum age of a carried value (Timedelta, string or days)
+
+    Returns one float date x column frame with a naive index named 'Date'.
+    """
+    if how not in ALIGN_HOW:
+        raise ValueError(f"how must be one of {ALIGN_HOW}, not {how!r}")
+    inputs = _inputs(data)
+    if not inputs:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='Date'))
+
+    calendar = _calendar(inputs, how, on)
+    targets = _dates(calendar)
+    if tolerance is not None and not isinstance(tolerance, pd.Timedelta):
+        tolerance = pd.Timedelta(days=tolerance) if np.isscalar(tolerance) and not isinstance(tolerance, str) \
+            else pd.Timedelta(tolerance)
+
+    columns = [column for _, frame in inputs for column in frame.columns]
+    values = np.full((len(calendar), len(columns)), np.nan)
+    start = 0
+    for _, frame in inputs:
+        width = frame.shape[1]
+        if frame.empty:
+            start += width
+            continue
+        if how == 'asof':
+            dates = _dates(frame.index)
+            rows = np.searchsorted(dates, targets, side='right') - 1
+            if tolerance is not None:
+                rows[targets - dates[np.maximum(rows, 0)] > tolerance.value] = -1
+        else:
+            rows = frame.index.get_indexer(calendar)
+        found = rows >= 0
+        values[found, start:start + width] = frame.to_numpy(dtype='float64')[rows[found]]
+        start += width
+
+    return pd.DataFrame(values, index=calendar.rename('Date'), columns=pd.Index(columns))
@@ -0,0 +1,262 @@
+"""
+Compute-only core of the analysis scripts
+
+Returns, volatility, rolling risk, monthly changes and jumps, money stock
+aggregates, growth rates and correlations: everything a stats-only query needs,
+without the plotting, download and Excel layers. Importing this module loads
+numpy, pandas and the engine modules only; matplotlib, requests and yfinance are
+never imported from here. The scripts import these functions from here, so
+nse_analysis.calculate_returns etc. keep working
+(`python benchmarks/bench_import.py` keeps an eye on the import cost).
+"""
+
+import numpy as np
+import pandas as pd
+
+from returns_engine import price_panel, panel_returns, rolling_risk, ROLLING_WINDOWS
+from fx_jumps import rank_jumps
+from rbi_io import parse_indian_numbers
+from money_aggregates import resolve_aggregates
+from growth_engine import growth_rates, growth_summary, YOY_TOLERANCE_DAYS
+from alignment import align, normalize_index
+from cross_correlation import lagged_correlations, peak_lags
+from ohlc_pyramid import BARS_PER_YEAR
+
+
+# ---------------------------------------------------------------------------
+# NSE indices (Part 1)
+# ---------------------------------------------------------------------------
+
+def calculate_returns(data):
+    """Calculate daily returns"""
+    return data['Close'].pct_change().dropna()
+
+def calculate_volatility(returns):
+    """Calculate annualized volatility"""
+    return returns.std() * np.sqrt(252) * 100  # Annualized percentage
+
+ROLLING_LABELS = {'volatility': 'Volatility (%)', 'sharpe': 'Sharpe Ratio', 'downside_deviation': 'Downside Deviation (%)'}
+
+def calculate_rolling_risk(data_dict, windows=ROLLING_WINDOWS):
+    """
+    Rolling annualized volatility, Sharpe ratio and downside deviation for every index at once
+    Returns a date-indexed frame with (index, metric, window) columns, volatility and
+    downside deviation in percent like calculate_volatility
+    """
+    risk = rolling_risk(panel_returns(price_panel(data_dict)), windows=windows)
+    percent = risk.columns.get_level_values('metric') != 'sharpe'
+    risk.loc[:, percent] *= 100
+    return risk
+
+def rolling_risk_table(risk):
+    """Flat-column version of calculate_rolling_risk output for Excel"""
+    table = risk.copy()
+    table.columns = [f"{index} - {ROLLING_LABELS[metric]} {window}d" for index, metric, window in risk.columns]
+    return table
+
+HORIZON_LEVELS = ('weekly', 'monthly', 'quarterly')
+
+def horizon_returns(bars):
+    """
+    Weekly, monthly and quarterly return statistics from OHLC pyramid bars
+    bars: {index name: {level: bars with a Close column}} (see ohlc_pyramid.py)
+    Returns in percent, volatility annualized with the bars per year of each level;
+    the period still in progress (Complete False) is left out
+    """
+    rows = []
+    for index_name, levels in bars.items():
+        for level, data in levels.items():
+            if data is not None and 'Complete' in data.columns:
+                data = data[data['Complete']]
+            if data is None or data.empty:
+                continue
+            returns = data['Close'].pct_change().dropna() * 100
+            rows.append({
+                'Index': index_name,
+                'Horizon': level.title(),
+                'Periods': len(returns),
+                'Mean Return (%)': returns.mean(),
+                'Annualized Volatility (%)': returns.std() * np.sqrt(BARS_PER_YEAR[level]),
+                'Best (%)': returns.max(),
+                'Worst (%)': returns.min(),
+                'Positive (%)': (returns > 0).mean() * 100,
+            })
+    return pd.DataFrame(rows)
+
+def calculate_daily_returns(data):
+    """Calculate daily returns"""
+    return data['Close'].pct_change().dropna()
+
+def calculate_cumulative_returns(returns):
+    """Calculate cumulative returns"""
+    return (1 + returns).cumprod() - 1
+
+
+# ---------------------------------------------------------------------------
+# INR/USD (Part 2)
+# ---------------------------------------------------------------------------
+
+def calculate_monthly_changes(data):
+    """Calculate month-over-month percentage changes"""
+    monthly_pct_change = data.pct_change() * 100
+    return monthly_pct_change.dropna()
+
+def find_biggest_jumps(data, n=5, jumps=None):
+    """Find the n biggest single month jumps (positive changes) of the first column
+    jumps: optional rank_jumps(data) output to select from instead of recomputing"""
+    if isinstance(data, pd.DataFrame) and len(data.columns) == 0:
+        return pd.Series(dtype=float)
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    if jumps is None:
+        jumps = rank_jumps(data.iloc[:, :1], n=n, horizons=(1,))
+    
+    # Get biggest positive changes (INR depreciation)
+    selected = jumps[(jumps['series'] == data.columns[0]) & (jumps['horizon'] == 1) &
+                     (jumps['direction'] == 'depreciation') & (jumps['rank'] <= n)]
+    biggest_jumps = pd.Series(selected['change'].to_numpy(), name=data.columns[0],
+                              index=pd.DatetimeIndex(selected['date'], name=data.index.name))
+    
+    return biggest_jumps
+
+
+# ---------------------------------------------------------------------------
+# RBI money stock (Part 3)
+# ---------------------------------------------------------------------------
+
+def extract_money_components(data):
+    """
+    Extract M0, M1, M3 components from RBI data.
+    Handles both direct columns and component-based structure.
+    """
+    components = {}
+    
+    if isinstance(data, dict):
+        # Multiple sheets - process each sheet
+        for sheet_name, sheet_data in data.items():
+            print(f"Processing sheet: {sheet_name}")
+            result = _extract_from_dataframe(sheet_data)
+            components.update(result)
+    else:
+        # Single DataFrame
+        components = _extract_from_dataframe(data)
+    
+    return components
+
+def _extract_from_dataframe(df):
+    """Helper function to extract M0, M1, M3 from a single DataFrame"""
+    print(f"  Available columns: {list(df.columns)[:15]}...")  # Show first 15 columns
+    
+    # Parse every text column once up front, then resolve all aggregates
+    # (direct columns or component formulas, see money_aggregates.AGGREGATES) in one pass
+    return resolve_aggregates(parse_indian_numbers(df))
+
+def calculate_correlation(components):
+    """Calculate correlation between money stock components"""
+    # Combine all components into a single DataFrame
+    df = pd.DataFrame(components)
+    
+    # Calculate correlation matrix
+    corr_matrix = df.corr()
+    
+    return corr_matrix
+
+GROWTH_LABELS = {'yoy': 'YoY (%)', 'period': 'Fortnightly (%)', 'annualized': 'Annualized (%)'}
+
+def calculate_growth_rates(data):
+    """
+    YoY, fortnight-on-fortnight and annualized growth of every numeric Table 6
+    column (see growth_engine.py), with flat 'column metric' headers for export
+    """
+    growth = growth_rates(data.select_dtypes('number'))
+    return growth.set_axis([f"{series} {GROWTH_LABELS[metric]}" for series, metric in growth.columns], axis=1)
+
+# Table 5 ratios that join the aggregates in the lead/lag analysis
+LAG_RATIOS = [
+    'Cash-Deposit Ratio(Including merger)',
+    'Credit-Deposit Ratio(Including merger)',
+    'Investment-Deposit Ratio(Including merger)',
+]
+
+def calculate_lagged_correlation(components, ratios=None, max_lag=26, freq='SME'):
+    """
+    Lead/lag correlations of growth rates between aggregates and Table 5 ratios
+    (see cross_correlation.py). Everything is put on one semi-monthly calendar;
+    aggregates enter as % growth, ratios and rates as changes in percentage points.
+    Returns (lag x pair correlation matrix, strongest lag per pair)
+    """
+    levels = align(components, how='outer').resample(freq).last()
+    growth = (levels / levels.shift(1) - 1) * 100
+    if ratios is not None and not ratios.empty:
+        columns = [c for c in LAG_RATIOS if c in ratios.columns] or list(ratios.columns)
+        rates = normalize_index(ratios[columns]).resample(freq).last()
+        growth = align([growth, rates.diff()], how='outer')
+    
+    correlations = lagged_correlations(growth, max_lag=max_lag)
+    return correlations, peak_lags(correlations)
+
+def extract_money_stock(table6_data):
+    """Extract M3 from Table 6"""
+    components = {}
+    
+    # Look for M3 column
+    if 'M3' in table6_data.columns:
+        components['M3'] = table6_data['M3']
+        print(f"✓ Found M3 with {len(table6_data['M3'].dropna())} data points")
+    
+    # Look for M3 (Excluding Merger) as backup
+    if 'M3 (Excluding Merger)' in table6_data.columns:
+        components['M3_excl_merger'] = table6_data['M3 (Excluding Merger)']
+    
+    return components
+
+def align_money_with_yields(money_components, yields, tolerance_days=YOY_TOLERANCE_DAYS):
+    """
+    M3, its YoY growth and the 10-year G-sec yield on M3's reporting dates: the
+    last yield quoted on or before each Table 6 date (no more than tolerance_days old)
+    """
+    if yields is None or 'M3' not in money_components or '10_year_gsec' not in yields:
+        return None
+    aligned = align({'M3': money_components['M3'], '10_year_gsec': yields['10_year_gsec']},
+                    how='asof', on='M3', tolerance=tolerance_days)
+    aligned['M3 YoY Growth (%)'] = growth_rates(aligned['M3'])[('M3', 'yoy')]
+    return aligned
+
+def normalize_series(series):
+    """Normalize a series to start at 100 for comparison"""
+    if series is None or len(series) == 0:
+        return None
+    
+    # Remove NaN values and get first valid value
+    series_clean = series.dropna()
+    if len(series_clean) == 0:
+        return None
+    
+    first_value = series_clean.iloc[0]
+    if first_value == 0 or pd.isna(first_value):
+        return None
+    
+    return (series / first_value) * 100
+
+def create_summary_statistics(money_components):
+    """Create summary statistics for M3 (any row order, see growth_engine.py)"""
+    stats = {}
+    
+    if 'M3' in money_components:
+        summary = growth_summary(money_components['M3'].rename('M3'))
+        if summary.empty:
+            return stats
+        m3 = summary.loc['M3']
+        
+        stats['Latest M3 (₹ Lakh Crore)'] = m3['latest'] / 100000
+        stats['Earliest M3 (₹ Lakh Crore)'] = m3['earliest'] / 100000
+        stats['Total Growth (₹ Lakh Crore)'] = (m3['latest'] - m3['earliest']) / 100000
+        stats['Growth Rate (%)'] = m3['total_growth']
+        stats['Annualized Growth (%)'] = m3['cagr']
+        stats['Latest YoY Growth (%)'] = m3['latest_yoy']
+        stats['Average YoY Growth (%)'] = m3['average_yoy']
+        stats['Latest Date'] = m3['latest_date'].strftime('%Y-%m-%d')
+        stats['Earliest Date'] = m3['earliest_date'].strftime('%Y-%m-%d')
+        stats['Number of Observations'] = m3['observations']
+        
+    return stats
@@ -0,0 +1,196 @@
+"""
+Content-addressed cache for the generated PNG and XLSX files
+
+An artifact is stored under a key hashed from everything that determines its
+bytes: the input frames and arrays, the generating function's parameters and
+the source of the code that draws or writes it. A rerun on unchanged data finds
+the key and copies the stored file into place instead of rendering the chart or
+rewriting the workbook; any change to the data, a label, a dpi or the drawing
+code gives a new key. RenderService.submit() and WorkbookExport use it
+automatically.
+
+Files live under <cache root>/artifacts/ (see cache_utils.py); the least
+recently used ones are dropped once the directory grows beyond
+MONETARY_ARTIFACT_CACHE_MB (default 500). MONETARY_ARTIFACT_CACHE=0 turns the
+cache off.
+"""
+
+import os
+import sys
+import shutil
+import pickle
+import hashlib
+import inspect
+import filecmp
+from functools import lru_cache
+from importlib import metadata
+import numpy as np
+import pandas as pd
+
+from cache_utils import cache_dir, file_digest
+
+# Bump when the way artifacts are generated changes outside the hashed code
+ARTIFACT_VERSION = 1
+
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _module_digest(module_name):
+    """Digest of a repo-local module's source and of the repo-local modules it uses"""
+    module = sys.modules.get(module_name)
+    path = getattr(module, '__file__', None)
+    if not path or not path.endswith('.py'):
+        return None
+    root = os.path.dirname(os.path.abspath(path))
+    used = set()
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        other = getattr(sys.modules.get(name), '__file__', None) if isinstance(name, str) else None
+        if name != module_name and other and os.path.dirname(os.path.abspath(other)) == root:
+            used.add(other)
+    h = hashlib.blake2b(digest_size=16)
+    for source in [path] + sorted(used):
+        h.update(file_digest(source).encode())
+    return h.hexdigest()
+
+
+def code_digest(func):
+    """Digest of the code behind a function: its module and the repo modules that module imports"""
+    digest = _module_digest(getattr(func, '__module__', None))
+    if digest is not None:
+        return digest
+    try:
+        return hashlib.blake2b(inspect.getsource(func).encode(), digest_size=16).hexdigest()
+    except (OSError, TypeError):
+        return getattr(func, '__qualname__', repr(func))
+
+
+def _feed_pandas(h, obj):
+    h.update(repr((type(obj).__name__, obj.shape, str(obj.index.dtype), list(obj.index.names))).encode())
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr((list(obj.columns), list(obj.columns.names), [str(t) for t in obj.dtypes])).encode())
+    else:
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts): fall back to the pickle
+        h.update(pickle.dumps(obj, protocol=4))
+
+
+def feed(h, obj):
+    """Add obj (frames, arrays, dicts, lists, functions, scalars) to the hash h"""
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        _feed_pandas(h, obj)
+    elif isinstance(obj, pd.Index):
+        _feed_pandas(h, obj.to_series())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(pickle.dumps(obj, protocol=4) if obj.dtype.hasobject else np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b'{%d' % len(obj))
+        for key, value in obj.items():
+            feed(h, key)
+            feed(h, value)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[%d' % len(obj))
+        for value in obj:
+            feed(h, value)
+    elif callable(obj):
+        h.update(repr((getattr(obj, '__module__', None), getattr(obj, '__qualname__', None))).encode())
+        h.update(code_digest(obj).encode())
+    else:
+        h.update(repr(obj).encode())
+    h.update(b'|')
+
+
+class ArtifactCache:
+    """
+    Generated files stored by content key
+
+        key = cache.key(draw, data, style, savefig)
+        if not cache.restore(key, path):
+            ... write path ...
+            cache.store(key, path)
+
+    directory: where the artifacts live (default .cache/artifacts)
+    max_bytes: size above which the least recently used artifacts are removed
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or cache_dir('artifacts')
+        os.makedirs(self.directory, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = float(os.environ.get('MONETARY_ARTIFACT_CACHE_MB', 500)) * 1024 * 1024
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def hasher():
+        h = hashlib.blake2b(digest_size=20)
+        feed(h, ('artifact', ARTIFACT_VERSION))
+        return h
+
+    def key(self, *parts):
+        """Content key of an artifact generated from parts"""
+        h = self.hasher()
+        for part in parts:
+            feed(h, part)
+        return h.hexdigest()
+
+    def _blob(self, key, path):
+        return os.path.join(self.directory, key + os.path.splitext(path)[1])
+
+    def restore(self, key, path):
+        """Put the artifact stored under key at path; False if there is none"""
+        blob = self._blob(key, path)
+        if not os.path.exists(blob):
+            return False
+        os.utime(blob)  # most recently used
+        if os.path.exists(path) and filecmp.cmp(blob, path, shallow=False):
+            return True
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        shutil.copyfile(blob, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+
+    def store(self, key, path):
+        """Keep a copy of the freshly written file at path under key"""
+        blob = self._blob(key, path)
+        tmp_path = f"{blob}.{os.getpid()}.tmp"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, blob)
+        self.prune()
+
+    def prune(self):
+        """Remove the least recently used artifacts until the cache fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+@lru_cache(maxsize=None)
+def get_artifact_cache():
+    """The artifact cache shared by the scripts, or None when MONETARY_ARTIFACT_CACHE=0"""
+    if os.environ.get('MONETARY_ARTIFACT_CACHE', '1').strip().lower() in ('0', 'false', 'no', 'off'):
+        return None
+    return ArtifactCache()
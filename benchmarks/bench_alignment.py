@@ -0,0 +1,86 @@
+"""
+Benchmark: alignment.align vs per-series pandas joins for mixed-frequency series
+
+Daily (timezone-aware), fortnightly and monthly series are aligned three ways:
+inner and outer joins (pandas: strip the timezone, dedupe and concat) and an
+as-of join onto the fortnightly calendar (pandas: one merge_asof per series).
+
+Usage:
+    python benchmarks/bench_alignment.py --series 3 30 --years 25
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alignment import align
+
+
+def make_series(n, years, rng):
+    end = pd.Timestamp('2025-12-31')
+    start = end - pd.DateOffset(years=years)
+    calendars = [
+        pd.bdate_range(start, end, tz='Asia/Kolkata'),
+        pd.date_range(start, end, freq='SMS'),
+        pd.date_range(start, end, freq='MS'),
+    ]
+    series = {}
+    for i in range(n):
+        index = calendars[i % 3]
+        index = index.delete(rng.choice(len(index), len(index) // 20, replace=False))
+        series[f'S{i}'] = pd.Series(rng.normal(100, 5, len(index)), index=index)
+    return series
+
+
+def pandas_join(series, how):
+    cleaned = {}
+    for name, s in series.items():
+        if s.index.tz is not None:
+            s = s.tz_localize(None)
+        cleaned[name] = s[~s.index.duplicated(keep='last')].sort_index()
+    if how == 'asof':
+        on = next(iter(cleaned))
+        result = cleaned[on].rename(on).to_frame()
+        for name, s in cleaned.items():
+            if name != on:
+                result = pd.merge_asof(result, s.rename(name).to_frame(), left_index=True, right_index=True)
+        return result
+    return pd.concat(cleaned, axis=1, join=how, sort=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--series', type=int, nargs='+', default=[3, 30])
+    parser.add_argument('--years', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.series:
+        series = make_series(n, args.years, rng)
+        # 'inner' on daily/fortnightly/monthly calendars is only the shared dates
+        on = 'S1' if n > 1 else 'S0'
+        for how in ('inner', 'outer', 'asof'):
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                legacy = pandas_join({on: series[on], **series} if how == 'asof' else series, how)
+            t1 = time.perf_counter()
+            for _ in range(args.repeat):
+                aligned = align(series, how=how, on=on)
+            t2 = time.perf_counter()
+
+            legacy = legacy[aligned.columns]
+            same = (legacy.shape == aligned.shape and
+                    np.allclose(legacy.to_numpy(dtype='float64'), aligned.to_numpy(), equal_nan=True))
+            print(f"{n:>3} series, {how:<5} ({len(aligned):>5} dates): pandas {(t1 - t0) / args.repeat * 1000:8.2f} ms"
+                  f" | align {(t2 - t1) / args.repeat * 1000:8.2f} ms | "
+                  f"{(t1 - t0) / (t2 - t1):5.1f}x | identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: render time and PNG size of full-resolution vs LTTB-downsampled line plots
+
+Each series is drawn the way plot_nifty_data draws a close (line plus
+fill_between on a 20-inch wide axis, saved at 300 dpi), once with every point
+and once through downsample.thin(). A decade of daily closes is already within
+the pixel budget and is drawn unchanged; intraday-length series (minute bars)
+are where the downsampling pays off.
+
+Usage:
+    python benchmarks/bench_downsample.py --lengths 2520 94500 945000
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsample import thin, PLOT_DPI
+
+
+def render(series, downsampled, dpi):
+    fig, ax = plt.subplots(figsize=(20, 6))
+    t0 = time.perf_counter()
+    line = thin(ax, series, dpi=dpi) if downsampled else series
+    ax.plot(line.index, line, linewidth=2.8, color='#1E88E5')
+    ax.fill_between(line.index, line, alpha=0.12, color='#1E88E5')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    elapsed = time.perf_counter() - t0
+    plt.close(fig)
+    return elapsed, buffer.tell(), line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[2520, 94500, 945000],
+                        help='points per series (2520 ~ 10 years daily, 945000 ~ 10 years of minute bars)')
+    parser.add_argument('--dpi', type=int, default=PLOT_DPI)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.lengths:
+        index = pd.date_range('2015-01-01', periods=n, freq='min' if n > 10000 else 'B')
+        series = pd.Series(10000 * np.exp(np.cumsum(rng.normal(0, 0.01 / np.sqrt(n / 2520), n))), index=index)
+
+        full_time, full_size, _ = render(series, False, args.dpi)
+        thin_time, thin_size, line = render(series, True, args.dpi)
+        peaks = series.max() == line.max() and series.min() == line.min()
+        print(f"{n:>9,} points -> {len(line):>6,}: full {full_time:6.2f} s {full_size / 1024:7.0f} KB | "
+              f"LTTB {thin_time:6.2f} s {thin_size / 1024:7.0f} KB | "
+              f"{full_time / thin_time:5.1f}x | peaks kept: {peaks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: EventCalendar.overlapping vs a scan of every event
+
+The catalog is a synthetic one of short events (a few days each, like the
+elections and devaluations in events.csv), optionally with one long episode
+across the middle of the history (like the 16-month Fed tightening cycle). The
+scan checks start <= hi and end >= lo for every event on every query. The
+candidates column is the mean number of events checked per query by a window
+bounded with the longest interval (lo - longest) and by the running maximum of
+the ends that overlapping() uses.
+
+Usage:
+    python benchmarks/bench_event_calendar.py --events 1000 100000 --queries 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_calendar import EventCalendar
+
+
+def synthetic_events(n, years, long_days, rng):
+    origin = pd.Timestamp('1990-01-01')
+    dates = origin + pd.to_timedelta(rng.integers(0, years * 365, n), unit='D')
+    events = pd.DataFrame({'date': dates, 'window_days': rng.integers(0, 5, n), 'name': np.arange(n)})
+    if long_days:
+        middle = origin + pd.Timedelta(days=years * 365 // 2)
+        long_event = pd.DataFrame({'date': [middle], 'start': [middle],
+                                   'end': [middle + pd.Timedelta(days=long_days)], 'name': [n]})
+        events = pd.concat([events, long_event], ignore_index=True)
+    return events
+
+
+def scan(calendar, lo, hi):
+    mask = (calendar._starts <= hi) & (calendar._ends >= lo)
+    return calendar.events[mask]
+
+
+def candidates(calendar, lo, hi):
+    """Mean candidates per query: window from lo - longest interval vs from the running end"""
+    last = np.searchsorted(calendar._starts, hi, side='right')
+    longest = (calendar._ends - calendar._starts).max()
+    by_longest = last - np.searchsorted(calendar._starts, lo - longest, side='left')
+    by_reach = np.maximum(last - np.searchsorted(calendar._reach, lo, side='left'), 0)
+    return by_longest.mean(), by_reach.mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=35)
+    parser.add_argument('--long-days', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.events:
+        for long_days in (0, args.long_days):
+            calendar = EventCalendar(synthetic_events(n, args.years, long_days, rng))
+            lo = np.datetime64('1990-01-01', 'ns') + rng.integers(0, args.years * 365, args.queries) * np.timedelta64(1, 'D')
+            hi = lo + rng.integers(0, 31, args.queries) * np.timedelta64(1, 'D')
+
+            t0 = time.perf_counter()
+            legacy = [scan(calendar, a, b) for a, b in zip(lo, hi)]
+            t1 = time.perf_counter()
+            indexed = [calendar.overlapping(pd.Timestamp(a), pd.Timestamp(b)) for a, b in zip(lo, hi)]
+            t2 = time.perf_counter()
+
+            same = all(a['name'].tolist() == b['name'].tolist() for a, b in zip(legacy, indexed))
+            by_longest, by_reach = candidates(calendar, lo, hi)
+            label = f"with a {long_days}-day event" if long_days else "short events only"
+            print(f"{n:>7} events, {label:<22}: scan {t1 - t0:7.3f} s | overlapping {t2 - t1:7.3f} s | "
+                  f"{(t1 - t0) / (t2 - t1):6.1f}x | candidates {by_longest:8.1f} -> {by_reach:6.1f} | "
+                  f"identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
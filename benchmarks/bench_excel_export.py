@@ -0,0 +1,96 @@
+"""
+Benchmark: write-only WorkbookExport vs the pd.ExcelWriter path the scripts used before
+
+Each mode runs in a fresh subprocess so its peak RSS is not polluted by the
+other; 'frame only' is the cost of building the test data without exporting.
+
+Usage:
+    python benchmarks/bench_excel_export.py --rows 50000 100000 --cols 4
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ['frame only', 'pd.ExcelWriter', 'WorkbookExport']
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported, e.g. Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def make_returns(rows, cols, seed=0):
+    """A 'Daily Returns'-like sheet: a Date column plus one column of returns per index"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start='1950-01-02', periods=rows).tz_localize('Asia/Kolkata')
+    data = {'Date': dates}
+    for i in range(cols):
+        data[f'INDEX {i} Returns'] = rng.normal(0.0004, 0.011, rows)
+    return pd.DataFrame(data)
+
+
+def worker(mode, rows, cols, path):
+    frame = make_returns(rows, cols)
+    stats = pd.DataFrame({'Metric': ['Rows'], 'Value': [rows]})
+    t0 = time.perf_counter()
+    if mode == 'pd.ExcelWriter':
+        frame['Date'] = frame['Date'].dt.tz_localize(None)
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            stats.to_excel(writer, sheet_name='Statistics', index=False)
+            frame.to_excel(writer, sheet_name='Daily Returns', index=False)
+    elif mode == 'WorkbookExport':
+        from excel_export import WorkbookExport
+        with WorkbookExport(path, side_outputs=(), cache=False) as writer:
+            writer.add(stats, 'Statistics', index=False)
+            writer.add(frame, 'Daily Returns', index=False)
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def run(mode, rows, cols, path):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode,
+                          '--rows', str(rows), '--cols', str(cols), '--path', path],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--cols', type=int, default=3)
+    parser.add_argument('--path', default=os.path.join('.cache', 'bench_export.xlsx'))
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.rows[0], args.cols, args.path)
+        return
+
+    os.makedirs(os.path.dirname(args.path) or '.', exist_ok=True)
+    for rows in args.rows:
+        print(f"\n{rows:,} rows x {args.cols + 1} columns")
+        print(f"  {'mode':<16}{'write time':>12}{'peak RSS':>12}")
+        for mode in MODES:
+            result = run(mode, rows, args.cols, args.path)
+            rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+            seconds = f"{result['seconds']:.2f} s" if mode != 'frame only' else '-'
+            print(f"  {mode:<16}{seconds:>12}{rss:>12}")
+    if os.path.exists(args.path):
+        os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
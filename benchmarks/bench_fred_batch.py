@@ -0,0 +1,94 @@
+"""
+Benchmark: batch FRED downloads through FredCache against a local stand-in server
+
+A small HTTP server mimics FRED's series/observations endpoint (synthetic
+monthly data, fixed latency per request) and the real FredHTTPClient is pointed
+at it. Compared: one series after another with a new client each (what
+download_fred_data did), a cold concurrent get_many(), and a warm refresh that
+only asks for observations after the cached ones.
+
+Usage:
+    python benchmarks/bench_fred_batch.py --series 20 --latency 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_providers import SyntheticProvider, FredProvider, FredHTTPClient
+from fred_cache import FredCache
+
+
+def make_handler(latency, served):
+    source = SyntheticProvider()
+
+    class StandInFred(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if not url.path.endswith('/series/observations') or 'series_id' not in params:
+                self.send_error(404)
+                return
+            time.sleep(latency)
+            data = source.fred_series(params['series_id'], start=params.get('observation_start'))
+            observations = [{'date': d.strftime('%Y-%m-%d'), 'value': f"{v:.4f}"} for d, v in data.items()]
+            served.append(len(observations))
+            body = json.dumps({'observations': observations}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInFred
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--series', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per request')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    served = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.latency, served))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/fred"
+    series_ids = [f'SERIES{i}' for i in range(args.series)]
+    directory = tempfile.mkdtemp(prefix='fred_cache_')
+
+    try:
+        t0 = time.perf_counter()
+        for series_id in series_ids:
+            FredHTTPClient(base_url=base_url).get_series(series_id)
+        sequential = time.perf_counter() - t0
+        print(f"{args.series} series, {args.latency:.2f} s latency per request")
+        print(f"  one by one, new client each : {sequential:6.2f} s  ({sum(served):,} observations)")
+
+        cache = FredCache(FredProvider(base_url=base_url), directory=directory, max_workers=args.workers)
+        for label in ('get_many, cold cache', 'get_many, warm refresh'):
+            served.clear()
+            t0 = time.perf_counter()
+            results = cache.get_many(series_ids)
+            elapsed = time.perf_counter() - t0
+            complete = all(s is not None and len(s) > 0 for s in results.values())
+            print(f"  {label:<28}: {elapsed:6.2f} s  ({sum(served):,} observations, complete: {complete})")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: rank_jumps vs per-series pct_change + nlargest/nsmallest loops
+
+The loop is what ranking every currency at every horizon took with the
+find_biggest_jumps approach: one pct_change and two full selections per
+(series, horizon).
+
+Usage:
+    python benchmarks/bench_fx_jumps.py --series 1 50 500 --months 600
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fx_jumps import rank_jumps, JUMP_HORIZONS
+
+
+def per_series(panel, n=5, horizons=JUMP_HORIZONS):
+    results = []
+    for name in panel.columns:
+        for h in horizons:
+            changes = panel[name].pct_change(h) * 100
+            results.append(changes.nlargest(n).to_numpy())
+            results.append(-changes.nsmallest(n).to_numpy())
+    return np.concatenate(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--series', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--months', type=int, default=600)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('1970-01-31', periods=args.months, freq='ME')
+    for n in args.series:
+        rates = np.exp(np.cumsum(rng.normal(0.002, 0.02, (args.months, n)), axis=0)) * 50
+        panel = pd.DataFrame(rates, index=dates, columns=[f'FX{i}' for i in range(n)])
+
+        t0 = time.perf_counter()
+        legacy = per_series(panel, n=args.top)
+        t1 = time.perf_counter()
+        jumps = rank_jumps(panel, n=args.top)
+        t2 = time.perf_counter()
+
+        signs = np.where(jumps['direction'] == 'depreciation', 1.0, -1.0)
+        same = np.allclose(legacy, jumps['change'].to_numpy() * signs)
+        print(f"{n:>4} series x {args.months} months: per-series {t1 - t0:7.3f} s | "
+              f"rank_jumps {t2 - t1:7.3f} s | {(t1 - t0) / (t2 - t1):6.1f}x | identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: import time of the compute-only core vs the analysis scripts
+
+Each module is imported in a fresh interpreter, several times, and the median
+wall time of the import statement is reported together with the heavy packages
+it pulled in. analytics (and, since plotting and downloads are imported on
+first use, the scripts themselves) should never load matplotlib, requests or
+yfinance. The legacy column imports what the scripts used to import eagerly.
+
+Usage:
+    python benchmarks/bench_import.py --repeat 5 --max-ms 600
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['analytics', 'nse_analysis', 'nse_challenging', 'inr_usd_analysis', 'rbi_money_stock', 'rbi_challenging']
+HEAVY = ['matplotlib', 'requests', 'yfinance', 'openpyxl', 'xlsxwriter']
+LEGACY = 'import pandas, numpy, matplotlib.pyplot, requests'
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - t0
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def time_import(statement, repeat):
+    times, loaded = [], []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY)],
+                                cwd=ROOT, capture_output=True, text=True, check=True,
+                                env={**os.environ, 'MPLBACKEND': 'Agg'})
+        elapsed, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        times.append(elapsed * 1000)
+    return statistics.median(times), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='exit with status 1 if a module takes longer to import or loads a heavy package')
+    args = parser.parse_args()
+
+    legacy, _ = time_import(LEGACY, args.repeat)
+    print(f"{'legacy eager imports':<20}: {legacy:7.0f} ms ({LEGACY})")
+    failed = []
+    for module in args.modules:
+        elapsed, loaded = time_import(f'import {module}', args.repeat)
+        print(f"{module:<20}: {elapsed:7.0f} ms | {legacy / elapsed:4.1f}x | "
+              f"heavy packages: {', '.join(loaded) or 'none'}")
+        if args.max_ms is not None and (elapsed > args.max_ms or loaded):
+            failed.append(module)
+    if failed:
+        print(f"✗ Over the import budget: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: single-pass parse_indian_numbers vs the per-column cleaning chain
+previously used in load_money_stock_data / load_rbi_table6
+
+Usage:
+    python benchmarks/bench_indian_numeric.py --rows 20000 --cols 300
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rbi_io import parse_indian_numbers
+
+
+def indian_format(value):
+    """Format an integer with lakh/crore grouping, e.g. 29502905 -> '2,95,02,905'"""
+    s = str(abs(int(value)))
+    if len(s) > 3:
+        head, tail = s[:-3], s[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        s = ",".join(groups) + "," + tail
+    return ('-' if value < 0 else '') + s
+
+
+def make_frame(rows, cols, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = np.array([indian_format(v) for v in rng.integers(-10**6, 10**9, 5000)], dtype=object)
+    data = pool[rng.integers(0, len(pool), size=(rows, cols))]
+    data[rng.random((rows, cols)) < 0.05] = '-'
+    data[rng.random((rows, cols)) < 0.02] = np.nan
+    return pd.DataFrame(data, columns=[f"col_{i}" for i in range(cols)])
+
+
+def legacy_chain(frame):
+    """The per-column cleaning loop the loaders used before parse_indian_numbers"""
+    data = frame.copy()
+    for col in data.columns:
+        # pandas >= 3 infers a 'str' dtype instead of object, so check both
+        if data[col].dtype == 'object' or pd.api.types.is_string_dtype(data[col].dtype):
+            data[col] = data[col].astype(str).str.replace(',', '').str.replace(' ', '')
+            data[col] = data[col].str.rstrip(' -')
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+    return data
+
+
+def best_of(func, frame, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(frame)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--cols', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows, args.cols)
+    print(f"Frame: {args.rows:,} rows x {args.cols} columns ({frame.size:,} cells)")
+
+    legacy_time, legacy = best_of(legacy_chain, frame, args.repeat)
+    fast_time, fast = best_of(parse_indian_numbers, frame, args.repeat)
+
+    same = np.allclose(legacy.to_numpy(dtype=float), fast.to_numpy(dtype=float), equal_nan=True)
+    print(f"  legacy per-column chain : {legacy_time:8.3f} s")
+    print(f"  parse_indian_numbers    : {fast_time:8.3f} s")
+    print(f"  speed-up                : {legacy_time / fast_time:8.2f}x")
+    print(f"  identical results       : {same}")
+
+
+if __name__ == "__main__":
+    main()
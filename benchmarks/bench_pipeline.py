@@ -0,0 +1,85 @@
+"""
+End-to-end throughput benchmark on deterministic synthetic data
+Runs the download -> analytics path of the scripts without any network access
+
+Usage:
+    python benchmarks/bench_pipeline.py --years 5 20 50
+    python benchmarks/bench_pipeline.py --years 20 --profile
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import cProfile
+import pstats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_providers import SyntheticProvider
+from price_cache import PriceCache
+from fred_cache import FredCache
+import nse_analysis
+import inr_usd_analysis
+
+
+def run_pipeline(years, provider, cache_root):
+    """Run the compute path of the NSE and INR/USD scripts, returning stage timings"""
+    timings = {}
+    cache = PriceCache(provider, directory=os.path.join(cache_root, f'prices_{years}'))
+
+    t0 = time.perf_counter()
+    nifty50 = nse_analysis.download_nifty_data('NIFTY 50', years=years, cache=cache)
+    nifty_bank = nse_analysis.download_nifty_data('NIFTY BANK', years=years, cache=cache)
+    timings['download (cold cache)'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    nse_analysis.download_nifty_data('NIFTY 50', years=years, cache=cache)
+    nse_analysis.download_nifty_data('NIFTY BANK', years=years, cache=cache)
+    timings['download (warm cache)'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for data in (nifty50, nifty_bank):
+        nse_analysis.calculate_volatility(nse_analysis.calculate_returns(data))
+        nse_analysis.analyze_us_election_impact(data, 'bench')
+    timings['returns / volatility / events'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fred_cache = FredCache(provider, directory=os.path.join(cache_root, f'fred_{years}'))
+    fx = inr_usd_analysis.download_fred_data(cache=fred_cache)
+    inr_usd_analysis.find_biggest_jumps(fx, n=5)
+    timings['FRED + biggest jumps'] = time.perf_counter() - t0
+
+    return len(nifty50), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', action='store_true', help='print the top cProfile entries')
+    args = parser.parse_args()
+
+    provider = SyntheticProvider(seed=args.seed, origin='1970-01-01')
+    with tempfile.TemporaryDirectory() as cache_root:
+        for years in args.years:
+            profiler = cProfile.Profile() if args.profile else None
+            if profiler:
+                profiler.enable()
+            rows, timings = run_pipeline(years, provider, cache_root)
+            if profiler:
+                profiler.disable()
+
+            print("\n" + "=" * 60)
+            print(f"{years} years ({rows} trading days per index)")
+            print("=" * 60)
+            for stage, seconds in timings.items():
+                print(f"  {stage:<32} {seconds * 1000:10.1f} ms")
+            print(f"  {'throughput (rows/s, cold)':<32} {2 * rows / timings['download (cold cache)']:10.0f}")
+            if profiler:
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
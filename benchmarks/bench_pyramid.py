@@ -0,0 +1,78 @@
+"""
+Benchmark: reading pyramid levels vs resampling the daily history on every read
+
+A long synthetic daily history is cached through PriceCache. For each coarse
+level the legacy way (read the whole daily file, resample it) is timed against
+PriceCache.bars(), which reads the stored level. A refresh that appends the
+last month is then timed with the incremental pyramid update against a full
+rebuild of the levels, and the results are checked against each other.
+
+Usage:
+    python benchmarks/bench_pyramid.py --years 10 30
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_providers import SyntheticProvider
+from price_cache import PriceCache
+from ohlc_pyramid import OHLCPyramid, ohlc_bars, LEVEL_PERIODS
+
+SYMBOL = '^NSEI'
+
+
+def timed(func, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - t0) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[10, 30])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    provider = SyntheticProvider()
+    end = pd.Timestamp('2025-12-31')
+    for years in args.years:
+        directory = tempfile.mkdtemp(prefix='pyramid_')
+        try:
+            start = end - pd.DateOffset(years=years)
+            cache = PriceCache(provider, directory=directory)
+            cache.get(SYMBOL, start=start, end=end - pd.DateOffset(months=1))
+            print(f"{years} years ({len(cache.load(SYMBOL)[0]):,} daily bars)")
+
+            for level in LEVEL_PERIODS:
+                legacy_ms, legacy = timed(lambda: ohlc_bars(cache.load(SYMBOL)[0], level), args.repeat)
+                pyramid_ms, bars = timed(lambda: cache.bars(SYMBOL, start, end, level=level), args.repeat)
+                print(f"  {level:<9} ({len(bars):>5} bars): daily + resample {legacy_ms:7.2f} ms | "
+                      f"stored level {pyramid_ms:7.2f} ms | {legacy_ms / pyramid_ms:5.1f}x | "
+                      f"identical: {bars.equals(legacy)}")
+
+            # Refresh: the last month is appended, only the trailing buckets are recomputed
+            fetched_through = cache.load(SYMBOL)[0].index.max()
+            cache.get(SYMBOL, start=start, end=end)
+            daily = cache.load(SYMBOL)[0]
+            changed_from = daily.index[daily.index >= fetched_through][0]
+            incremental_ms, _ = timed(lambda: cache.pyramid.update(SYMBOL, daily, changed_from), args.repeat)
+            rebuild = OHLCPyramid(os.path.join(directory, 'rebuild'))
+            rebuild_ms, _ = timed(lambda: rebuild.update(SYMBOL, daily), args.repeat)
+            same = all(cache.pyramid.read(SYMBOL, level).equals(rebuild.read(SYMBOL, level))
+                       for level in LEVEL_PERIODS)
+            print(f"  refresh of the last month: incremental update {incremental_ms:7.2f} ms | "
+                  f"full rebuild {rebuild_ms:7.2f} ms | identical: {same}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
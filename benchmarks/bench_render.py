@@ -0,0 +1,118 @@
+"""
+Benchmark: the five main charts rendered one after another vs through RenderService
+
+Builds the figure specs of nifty_plots.png, nifty_returns_comparison.png,
+inr_usd_plots.png, money_stock_components.png and money_stock_analysis.png on
+deterministic synthetic data and renders them in the calling process
+(MONETARY_RENDER_WORKERS=0, what the scripts did) and across worker processes.
+Also reports what crosses the process boundary: the pickled data frames vs the
+shared memory block plus the pickled layout.
+
+Usage:
+    python benchmarks/bench_render.py --years 20 --workers 2 4
+"""
+
+import os
+import sys
+import time
+import pickle
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_providers import SyntheticProvider
+from returns_engine import price_panel, analyze_panel
+from render_service import FigureSpec, RenderService, pack
+import nse_analysis
+import nse_challenging
+import inr_usd_analysis
+import rbi_money_stock
+import rbi_challenging
+
+
+def build_specs(years, directory):
+    provider = SyntheticProvider()
+    end = pd.Timestamp('2025-12-31')
+    start = end - pd.DateOffset(years=years)
+    prices = {name: provider.history(symbol, start=start, end=end)
+              for name, symbol in (('NIFTY 50', '^NSEI'), ('NIFTY BANK', '^NSEBANK'),
+                                   ('NIFTY 100', '^CNX100'), ('NIFTY 500', '^NSE500'))}
+    prices = {name: nse_analysis.normalize_index(data) for name, data in prices.items()}
+    panel = analyze_panel(price_panel({k: prices[k] for k in ('NIFTY 50', 'NIFTY 100', 'NIFTY 500')}))
+    fx = inr_usd_analysis.normalize_index(provider.fred_series('CCUSMA02INM618N', start=start).rename('Rate').to_frame())
+    changes = inr_usd_analysis.calculate_monthly_changes(fx)
+    fortnights = pd.date_range(start, end, freq='SMS')
+    rng = np.random.default_rng(0)
+    money = {key: pd.Series(base * np.exp(np.cumsum(rng.normal(0.005, 0.01, len(fortnights)))), index=fortnights)
+             for key, base in (('M0', 2e5), ('M1', 4e5), ('M3', 1.2e6))}
+    yields = pd.DataFrame({'10_year_gsec': 7 + np.cumsum(rng.normal(0, 0.02, len(prices['NIFTY 50'])))},
+                          index=prices['NIFTY 50'].index)
+
+    def path(name):
+        return os.path.join(directory, name)
+
+    return [
+        FigureSpec(nse_analysis.draw_nifty_plots, path('nifty_plots.png'),
+                   data={'nifty50_data': prices['NIFTY 50'][['Close']],
+                         'nifty_bank_data': prices['NIFTY BANK'][['Close']]},
+                   style={'trump_elections': nse_analysis.get_trump_elections()},
+                   savefig={'dpi': 300, 'bbox_inches': 'tight', 'facecolor': '#fafafa'}),
+        FigureSpec(nse_challenging.draw_returns_comparison, path('nifty_returns_comparison.png'),
+                   data={'returns': panel['returns'], 'cumulative': panel['cumulative']}, style={'years': years},
+                   savefig={'dpi': 300, 'bbox_inches': 'tight'}),
+        FigureSpec(inr_usd_analysis.draw_exchange_rate, path('inr_usd_plots.png'),
+                   data={'data': fx, 'monthly_changes': changes,
+                         'biggest_jumps': inr_usd_analysis.find_biggest_jumps(fx, n=5)},
+                   savefig={'dpi': 300, 'bbox_inches': 'tight'}),
+        FigureSpec(rbi_money_stock.draw_money_components, path('money_stock_components.png'),
+                   data={'components': money}, savefig={'dpi': 300, 'bbox_inches': 'tight'}),
+        FigureSpec(rbi_challenging.draw_money_stock, path('money_stock_analysis.png'),
+                   data={'money_components': {'M3': money['M3']}, 'yields': yields},
+                   savefig={'dpi': 300, 'bbox_inches': 'tight'}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='render_')
+    try:
+        specs = build_specs(args.years, directory)
+        pickled = sum(len(pickle.dumps(spec.data)) for spec in specs)
+        shared, layout = 0, 0
+        for spec in specs:
+            block, spec_layout = pack(spec.data)
+            layout += len(pickle.dumps(spec_layout))
+            if block is not None:
+                shared += block.size
+                block.close()
+                block.unlink()
+        print(f"{len(specs)} charts, {args.years} years of data, {os.cpu_count()} CPUs")
+        print(f"  data per render: pickled {pickled / 1024:,.0f} KB | "
+              f"shared memory {shared / 1024:,.0f} KB + pickled layout {layout / 1024:,.0f} KB")
+
+        for workers in [0] + args.workers:
+            with RenderService(max_workers=workers, cache=False) as service:
+                if workers:
+                    service.render([specs[-1]])  # start the workers outside the timing
+                t0 = time.perf_counter()
+                paths = service.render(specs)
+                elapsed = time.perf_counter() - t0
+            label = 'one after another' if workers == 0 else f'{workers} worker processes'
+            complete = all(os.path.getsize(p) > 0 for p in paths)
+            print(f"  {label:<20}: {elapsed:6.2f} s (complete: {complete})")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
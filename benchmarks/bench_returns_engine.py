@@ -0,0 +1,69 @@
+"""
+Benchmark: panel returns engine vs per-index pandas statistics
+
+The per-index path is what plot_returns_comparison did for each of its three
+indices (pct_change, cumprod, mean/std/Sharpe per series, chained index
+intersections); the engine does the same for all indices on one 2-D array.
+
+Usage:
+    python benchmarks/bench_returns_engine.py --indices 3 100 500 --years 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from returns_engine import analyze_panel, common_dates, price_panel, TRADING_DAYS, RISK_FREE_RATE
+from data_providers import SyntheticProvider
+
+
+def per_index(data_dict):
+    stats, aligned = {}, None
+    for name, data in data_dict.items():
+        returns = data['Close'].pct_change().dropna()
+        cumret = (1 + returns).cumprod() - 1
+        stats[name] = (
+            cumret.iloc[-1],
+            (1 + cumret.iloc[-1]) ** (TRADING_DAYS / len(returns)) - 1,
+            returns.std() * np.sqrt(TRADING_DAYS),
+            (returns.mean() * TRADING_DAYS - RISK_FREE_RATE) / (returns.std() * np.sqrt(TRADING_DAYS)),
+        )
+        aligned = returns.index if aligned is None else aligned.intersection(returns.index)
+    return stats, aligned
+
+
+def engine(data_dict):
+    panel = analyze_panel(price_panel(data_dict))
+    return panel['stats'], common_dates(panel['returns'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--indices', type=int, nargs='+', default=[3, 100, 500])
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    provider = SyntheticProvider(tz=None)
+    start = pd.Timestamp.now().normalize() - pd.DateOffset(years=args.years)
+    for n in args.indices:
+        data_dict = {f'INDEX {i}': provider.history(f'SYM{i}', start=start) for i in range(n)}
+
+        t0 = time.perf_counter()
+        legacy, _ = per_index(data_dict)
+        t1 = time.perf_counter()
+        stats, _ = engine(data_dict)
+        t2 = time.perf_counter()
+
+        same = np.allclose(np.array(list(legacy.values())),
+                           stats[['total_return', 'annualized_return', 'volatility', 'sharpe']].to_numpy())
+        print(f"{n:>4} indices x {args.years} years: per-index {t1 - t0:7.3f} s | "
+              f"panel engine {t2 - t1:7.3f} s | {(t1 - t0) / (t2 - t1):5.1f}x | identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
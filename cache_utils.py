@@ -0,0 +1,62 @@
+"""
+Shared helpers for the on-disk caches used by the analysis scripts
+Frames are stored as Parquet when pyarrow is installed, otherwise as pickles
+"""
+
+import os
+import hashlib
+import pandas as pd
+
+CACHE_ROOT = os.environ.get('MONETARY_CACHE_DIR', '.cache')
+
+
+def _has_parquet():
+    """Check whether a Parquet engine is available"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+FRAME_SUFFIX = '.parquet' if _has_parquet() else '.pkl'
+
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the cache root"""
+    path = os.path.join(CACHE_ROOT, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def safe_name(name):
+    """Turn a symbol or series id like '^NSEI' into a file-system friendly name"""
+    return "".join(c if c.isalnum() or c in '-_.' else '_' for c in str(name))
+
+
+def write_frame(df, path):
+    """Write a DataFrame atomically (columnar Parquet if available, pickle otherwise)"""
+    tmp_path = path + '.tmp'
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path):
+    """Read a DataFrame written by write_frame, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def file_digest(filepath, chunk_size=1 << 20):
+    """Content hash of a file, used to key snapshots and artifacts"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
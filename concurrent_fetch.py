@@ -0,0 +1,74 @@
+"""
+Concurrent fetch layer for downloading several NSE indices at once
+Every index is fetched in parallel and, where an index has several candidate
+Yahoo symbols, the variants are raced: the first non-empty result wins. The pool
+has a worker per request, so every variant is already running by then; the
+losing requests are abandoned, not cancelled. fetch_indices returns without
+waiting for them, but their threads still finish in the background (and the
+interpreter waits for them at exit)
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def _fetch(provider, symbol, start, end):
+    return provider.history(symbol, start=start, end=end)
+
+
+def fetch_indices(symbol_map, provider, start=None, end=None, max_workers=None):
+    """
+    Download all indices concurrently
+
+    symbol_map: {index name: [symbol variants in order of preference]}
+    provider: object with history(symbol, start, end), see data_providers.py
+
+    Returns {index name: (winning symbol, data)}; indices where every variant
+    failed or came back empty map to (None, None).
+    Wall time is roughly that of the slowest index, not the sum of all of them.
+    """
+    n_requests = sum(len(symbols) for symbols in symbol_map.values())
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(n_requests, 1))
+
+    futures = {}
+    for index_name, symbols in symbol_map.items():
+        for symbol in symbols:
+            future = executor.submit(_fetch, provider, symbol, start, end)
+            futures[future] = (index_name, symbol)
+
+    results = {}
+    pending = {name: len(symbols) for name, symbols in symbol_map.items()}
+    try:
+        for future in as_completed(futures):
+            index_name, symbol = futures[future]
+            pending[index_name] -= 1
+            if index_name in results:
+                continue
+
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"  ✗ Failed with {symbol}: {str(e)[:50]}")
+                data = None
+
+            if data is not None and not data.empty:
+                print(f"  ✓ {index_name}: downloaded using {symbol}")
+                results[index_name] = (symbol, data)
+            elif pending[index_name] == 0:
+                results[index_name] = (None, None)
+
+            if len(results) == len(symbol_map):
+                break
+    finally:
+        # Don't wait for abandoned requests still in flight; only queued ones
+        # (with a max_workers below the number of requests) are cancelled
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for index_name in symbol_map:
+        results.setdefault(index_name, (None, None))
+    return results
+
+
+def race_symbols(symbols, provider, start=None, end=None, label=None):
+    """Race symbol variants for a single index, returning (symbol, data) of the first non-empty result"""
+    label = label or symbols[0]
+    return fetch_indices({label: list(symbols)}, provider, start, end)[label]
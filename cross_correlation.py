@@ -0,0 +1,104 @@
+"""
+Lead/lag cross-correlations of many series at once, via FFT
+
+lagged_correlations() returns, for every pair of columns (x, y) and every lag k
+in [-max_lag, max_lag], the Pearson correlation of x[t] with y[t + k] over the
+dates where both are observed (what x.corr(y.shift(-k)) gives in pandas, so a
+positive lag means x leads y). Instead of one shift-and-correlate per lag, the
+six sums behind each correlation (count, sums, sums of squares and the cross
+product, all restricted to jointly observed dates) are cross-correlations of
+masked series, computed for all lags with one FFT per column and one inverse
+FFT per pair.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _fft_length(n):
+    return 1 << max(int(n - 1).bit_length(), 0)
+
+
+def _pairs(columns, pairs):
+    if pairs is None:
+        return [(columns[i], columns[j]) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+    return [tuple(pair) for pair in pairs]
+
+
+def lagged_correlations(data, max_lag=52, pairs=None, min_periods=10, chunk_pairs=256):
+    """
+    Correlation of x[t] with y[t + lag] for every pair and lag
+
+    data:        date x series frame on one calendar (e.g. growth rates); NaN = missing
+    max_lag:     largest lead/lag in rows
+    pairs:       (x, y) column pairs; default every unordered pair once (the
+                 (y, x) correlation at lag k is the (x, y) one at lag -k)
+    min_periods: minimum jointly observed dates, NaN below it
+    chunk_pairs: pairs per inverse FFT batch (bounds memory)
+
+    Returns a lag x pair frame: index 'lag' from -max_lag to max_lag, columns
+    a MultiIndex of (x, y).
+    """
+    pairs = _pairs(list(data.columns), pairs)
+    values = data.to_numpy(dtype='float64')
+    n_rows = values.shape[0]
+    max_lag = min(max_lag, max(n_rows - 1, 0))
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    valid = np.isfinite(values)
+    # Pearson is shift invariant; centering keeps the sums-of-squares variance accurate
+    with np.errstate(invalid='ignore'):
+        center = np.nanmean(np.where(valid, values, np.nan), axis=0) if n_rows else np.zeros(values.shape[1])
+    centered = np.where(valid, values - np.nan_to_num(center), 0.0)
+    mask = valid.astype('float64')
+
+    n_fft = _fft_length(n_rows + max_lag)
+    spectra = {name: np.fft.rfft(channel, n=n_fft, axis=0)
+               for name, channel in (('m', mask), ('x', centered), ('xx', centered ** 2))}
+    position = {col: i for i, col in enumerate(data.columns)}
+
+    result = np.full((len(lags), len(pairs)), np.nan)
+    for start in range(0, len(pairs), chunk_pairs):
+        chunk = pairs[start:start + chunk_pairs]
+        i = np.array([position[x] for x, _ in chunk], dtype='int64')
+        j = np.array([position[y] for _, y in chunk], dtype='int64')
+
+        def cross(a, b):
+            # sum_t a_i[t] * b_j[t + k]  <->  conj(A_i) * B_j
+            return np.conj(spectra[a][:, i]) * spectra[b][:, j]
+
+        products = np.stack([cross('m', 'm'), cross('x', 'm'), cross('m', 'x'),
+                             cross('xx', 'm'), cross('m', 'xx'), cross('x', 'x')])
+        sums = np.fft.irfft(products, n=n_fft, axis=1)[:, lags % n_fft]
+        n, sx, sy, sxx, syy, sxy = sums
+        n = np.rint(n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = n * sxy - sx * sy
+            variance = np.maximum(n * sxx - sx ** 2, 0.0) * np.maximum(n * syy - sy ** 2, 0.0)
+            corr = np.clip(covariance / np.sqrt(variance), -1.0, 1.0)
+        corr[(n < max(min_periods, 2)) | ~np.isfinite(corr)] = np.nan
+        result[:, start:start + len(chunk)] = corr
+
+    columns = pd.MultiIndex.from_tuples(pairs, names=['x', 'y'])
+    return pd.DataFrame(result, index=pd.Index(lags, name='lag'), columns=columns)
+
+
+def peak_lags(correlations):
+    """
+    Strongest lead/lag per pair: lag with the largest |correlation|, its
+    correlation and the contemporaneous (lag 0) one
+    """
+    values = correlations.to_numpy()
+    filled = np.where(np.isnan(values), -1.0, np.abs(values))
+    best = filled.argmax(axis=0)
+    has_value = ~np.isnan(values).all(axis=0)
+    lags = correlations.index.to_numpy()
+    zero = correlations.loc[0].to_numpy() if 0 in correlations.index else np.full(values.shape[1], np.nan)
+    peaks = pd.DataFrame({
+        'x': correlations.columns.get_level_values(0),
+        'y': correlations.columns.get_level_values(1),
+        'peak_lag': np.where(has_value, lags[best], 0),
+        'peak_correlation': np.where(has_value, values[best, np.arange(values.shape[1])], np.nan),
+        'lag0_correlation': zero,
+    })
+    return peaks
@@ -0,0 +1,394 @@
+"""
+Market data providers used by the download functions
+
+A provider is any object with
+  history(symbol, start=None, end=None)  -> OHLC DataFrame indexed by date (empty if unavailable)
+  fred_series(series_id, start=None)     -> Series of observations indexed by date (empty if unavailable)
+
+Backends:
+  LiveProvider       - yfinance for prices, FRED REST API / pandas_datareader for FRED
+  RecordingProvider  - wraps another provider and saves every payload to a directory
+  ReplayProvider     - serves previously recorded payloads, no network needed
+  SyntheticProvider  - deterministic generated data of any history length (benchmarks)
+
+The scripts pick a backend from the MONETARY_DATA_PROVIDER environment variable,
+see get_provider(). Every provider has a cache_namespace: the on-disk caches keep
+each provider's data in its own directory, so synthetic or replayed prices never
+show up in a live run.
+"""
+
+import os
+import time
+import zlib
+import hashlib
+import threading
+from functools import lru_cache
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from cache_utils import safe_name
+
+FRED_API_KEY = os.environ.get('FRED_API_KEY', "2cfb19b1c2dbf27ec1a7831223f74a6a")
+FRED_API_URL = os.environ.get('FRED_API_URL', 'https://api.stlouisfed.org/fred')
+
+# Yahoo Finance symbols of the NSE indices, in order of preference
+# (nse_challenging races the NIFTY 500 variants, first non-empty result wins)
+INDEX_SYMBOLS = {
+    'NIFTY 50': ['^NSEI'],
+    'NIFTY BANK': ['^NSEBANK'],
+    'NIFTY 100': ['^CNX100'],
+    'NIFTY 500': ['NIFTY500.NS', '^NSE500', 'NIFTY500.BO']
+}
+
+
+def _naive(ts):
+    """Drop timezone information from a timestamp, keeping the wall-clock time"""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tz is not None else ts
+
+
+def filter_date_range(data, start=None, end=None):
+    """Keep rows with start <= date < end, ignoring timezone differences"""
+    if data is None or data.empty:
+        return data
+    index = data.index
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    mask = np.ones(len(index), dtype=bool)
+    if start is not None:
+        mask &= index >= _naive(start)
+    if end is not None:
+        mask &= index < _naive(end)
+    return data[mask]
+
+
+def provider_namespace(provider):
+    """Cache directory name for the data of a provider (its cache_namespace, else its class name)"""
+    return safe_name(getattr(provider, 'cache_namespace', None) or type(provider).__name__)
+
+
+def _yfinance_period(start):
+    """Shortest yfinance history period reaching back to start (None past 10 years: use max)"""
+    if start is None:
+        return None
+    years = (pd.Timestamp.now() - _naive(start)).days / 365.25
+    for period in (1, 2, 5, 10):
+        if years <= period:
+            return f"{period}y"
+    return None
+
+
+class YFinanceProvider:
+    """Live provider backed by Yahoo Finance"""
+
+    cache_namespace = 'live'
+
+    def history(self, symbol, start=None, end=None):
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+
+        # Method 1: Try with date range
+        try:
+            data = ticker.history(start=start, end=end)
+        except Exception as e:
+            print(f"  Warning: Date range method failed for {symbol}: {e}")
+            data = pd.DataFrame()
+
+        # Method 2: If empty, try the shortest period covering start and filter locally
+        period = _yfinance_period(start)
+        if data.empty and period is not None:
+            try:
+                data = filter_date_range(ticker.history(period=period), start, end)
+            except Exception as e:
+                print(f"  Warning: Period method ({period}) failed for {symbol}: {e}")
+                data = pd.DataFrame()
+
+        # Method 3: If still empty, download max period and filter locally
+        if data.empty:
+            try:
+                data = filter_date_range(ticker.history(period="max"), start, end)
+            except Exception as e:
+                print(f"  Warning: Max period method failed for {symbol}: {e}")
+                data = pd.DataFrame()
+
+        return data
+
+
+class FredHTTPClient:
+    """
+    Minimal FRED REST client (series/observations) on one requests.Session
+
+    base_url defaults to FRED_API_URL, so the whole download path can be pointed
+    at a local stand-in server, e.g. FRED_API_URL=http://127.0.0.1:8000/fred
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=30):
+        self.api_key = api_key or FRED_API_KEY
+        self.base_url = (base_url or FRED_API_URL).rstrip('/')
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            return self._session
+
+    def get_series(self, series_id, observation_start=None):
+        """Observations of one series as a float Series indexed by date ('.' values become NaN)"""
+        params = {'series_id': series_id, 'api_key': self.api_key, 'file_type': 'json'}
+        if observation_start is not None:
+            params['observation_start'] = _naive(observation_start).strftime('%Y-%m-%d')
+        response = self._get_session().get(f"{self.base_url}/series/observations",
+                                           params=params, timeout=self.timeout)
+        response.raise_for_status()
+        observations = response.json().get('observations', [])
+        dates = pd.DatetimeIndex(pd.to_datetime([o['date'] for o in observations]), name='Date')
+        values = pd.to_numeric(pd.Series([o['value'] for o in observations], dtype=object), errors='coerce')
+        return pd.Series(values.to_numpy(dtype='float64'), index=dates, name=series_id)
+
+
+@lru_cache(maxsize=None)
+def shared_fred_client(api_key=None, base_url=None):
+    """One FredHTTPClient (and connection pool) per key and URL for the whole process"""
+    return FredHTTPClient(api_key=api_key, base_url=base_url)
+
+
+class FredProvider:
+    """Live FRED provider: FRED REST API through the shared client, pandas_datareader as fallback"""
+
+    cache_namespace = 'live'
+
+    def __init__(self, api_key=None, base_url=None):
+        self.api_key = api_key or FRED_API_KEY
+        self.base_url = base_url or FRED_API_URL
+
+    def _fred(self):
+        return shared_fred_client(self.api_key, self.base_url)
+
+    def fred_series(self, series_id, start=None):
+        try:
+            return self._fred().get_series(series_id, observation_start=start)
+        except Exception as e:
+            print(f"  Warning: FRED API download failed for {series_id}: {str(e)[:60]}")
+
+        # Alternative: Use pandas_datareader
+        import pandas_datareader.data as web
+        data = web.DataReader(series_id, 'fred', start or datetime(1970, 1, 1), datetime.now())
+        return data.iloc[:, 0]
+
+
+class LiveProvider(YFinanceProvider):
+    """Yahoo Finance prices plus FRED series, i.e. what the scripts use by default"""
+
+    def __init__(self, fred=None):
+        self.fred = fred or FredProvider()
+
+    def fred_series(self, series_id, start=None):
+        return self.fred.fred_series(series_id, start=start)
+
+
+class ReplayProvider:
+    """
+    Offline provider that serves recorded payloads from a local directory
+    OHLC data:   <directory>/<symbol>.csv with the date as first column
+    FRED series: <directory>/fred/<series_id>.csv with the date as first column
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.calls = []  # (symbol, start, end) for every request, handy for checking cache behaviour
+
+    @property
+    def cache_namespace(self):
+        path = os.path.abspath(self.directory)
+        return f"replay_{os.path.basename(path)}_{hashlib.blake2b(path.encode(), digest_size=4).hexdigest()}"
+
+    def history(self, symbol, start=None, end=None):
+        self.calls.append((symbol, start, end))
+        path = os.path.join(self.directory, safe_name(symbol) + '.csv')
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        return filter_date_range(data, start, end)
+
+    def fred_series(self, series_id, start=None):
+        self.calls.append((series_id, start, None))
+        path = os.path.join(self.directory, 'fred', safe_name(series_id) + '.csv')
+        if not os.path.exists(path):
+            return pd.Series(dtype=float)
+        data = pd.read_csv(path, index_col=0, parse_dates=True).iloc[:, 0]
+        return filter_date_range(data, start)
+
+
+class RecordingProvider:
+    """Pass-through provider that records every non-empty payload for later replay"""
+
+    def __init__(self, inner, directory):
+        self.inner = inner
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'fred'), exist_ok=True)
+
+    @property
+    def cache_namespace(self):
+        return provider_namespace(self.inner)
+
+    @staticmethod
+    def _merge_into(path, data):
+        if os.path.exists(path):
+            old = pd.read_csv(path, index_col=0, parse_dates=True)
+            if isinstance(data, pd.Series):
+                old = old.iloc[:, 0]
+            data = pd.concat([old, data])
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+        data.to_csv(path)
+
+    def history(self, symbol, start=None, end=None):
+        data = self.inner.history(symbol, start=start, end=end)
+        if data is not None and not data.empty:
+            self._merge_into(os.path.join(self.directory, safe_name(symbol) + '.csv'), data)
+        return data
+
+    def fred_series(self, series_id, start=None):
+        data = self.inner.fred_series(series_id, start=start)
+        if data is not None and not data.empty:
+            data = data.rename(series_id)
+            data.index.name = 'Date'
+            self._merge_into(os.path.join(self.directory, 'fred', safe_name(series_id) + '.csv'), data)
+        return data
+
+
+class SyntheticProvider:
+    """
+    Deterministic generated data for benchmarking and reproducible runs
+
+    Prices are a geometric random walk on business days anchored at `origin`
+    (Close 10000 there), running forwards and backwards from it. The shocks come
+    in fixed blocks of business days, each seeded by the symbol and the block's
+    position relative to `origin`, so any two windows return the same values for
+    the dates they share. FRED series are monthly random walks from 1970 onwards.
+    """
+
+    BLOCK_DAYS = 256
+
+    def __init__(self, seed=0, origin='2000-01-03', tz='Asia/Kolkata',
+                 annual_return=0.10, annual_volatility=0.18):
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.tz = tz
+        self.annual_return = annual_return
+        self.annual_volatility = annual_volatility
+
+    @property
+    def cache_namespace(self):
+        params = repr((self.origin, self.tz, self.annual_return, self.annual_volatility))
+        return f"synthetic_{self.seed}_{zlib.crc32(params.encode()):08x}"
+
+    def _rng(self, name):
+        return np.random.default_rng([self.seed, zlib.crc32(str(name).encode())])
+
+    def _shocks(self, symbol, first_block, last_block):
+        """Per-day draws of the blocks first_block..last_block (block 0 starts at origin)"""
+        daily_mu = self.annual_return / 252
+        daily_sigma = self.annual_volatility / np.sqrt(252)
+        symbol_key = zlib.crc32(str(symbol).encode())
+        parts = []
+        for block in range(first_block, last_block + 1):
+            rng = np.random.default_rng([self.seed, symbol_key, int(block < 0), abs(block)])
+            parts.append((rng.normal(daily_mu - 0.5 * daily_sigma ** 2, daily_sigma, self.BLOCK_DAYS),
+                          rng.normal(0, daily_sigma / 4, self.BLOCK_DAYS),
+                          np.abs(rng.normal(0, daily_sigma / 2, self.BLOCK_DAYS)),
+                          rng.integers(100_000, 1_000_000, self.BLOCK_DAYS)))
+        return [np.concatenate(draws) for draws in zip(*parts)]
+
+    def history(self, symbol, start=None, end=None):
+        end = _naive(end) if end is not None else pd.Timestamp(datetime.now()).normalize()
+        first = _naive(start) if start is not None else self.origin
+        dates = pd.bdate_range(first, end, inclusive='left')
+        if len(dates) == 0:
+            return pd.DataFrame()
+
+        # Business days relative to origin, and the blocks from origin out to the window
+        # (including the day before it, whose close the first open starts from)
+        days = np.busday_count(self.origin.date(), dates.values.astype('datetime64[D]'))
+        first_block = min((int(days[0]) - 1) // self.BLOCK_DAYS, 0)
+        last_block = max(int(days[-1]) // self.BLOCK_DAYS, 0)
+        log_returns, open_noise, spread, volume = self._shocks(symbol, first_block, last_block)
+        # Log close relative to the day before origin: returns summed forwards from
+        # origin, and backwards (negated) for the days before it; both sums always
+        # start at origin, so every window gets bit-identical values
+        offset = -first_block * self.BLOCK_DAYS
+        log_close = np.cumsum(log_returns[offset:])
+        if offset:
+            backward = np.cumsum(log_returns[:offset][::-1])[::-1]
+            log_close = np.concatenate([-backward[1:], [0.0], log_close])
+        pos = days + offset
+        close = 10000.0 * np.exp(log_close[pos])
+        open_ = 10000.0 * np.exp(log_close[pos - 1] + open_noise[pos])
+        data = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + spread[pos]),
+            'Low': np.minimum(open_, close) * (1 - spread[pos]),
+            'Close': close,
+            'Volume': volume[pos],
+        }, index=dates)
+        data.index.name = 'Date'
+        if self.tz:
+            data.index = data.index.tz_localize(self.tz)
+        return filter_date_range(data, start, end)
+
+    def fred_series(self, series_id, start=None):
+        dates = pd.date_range('1970-01-01', datetime.now(), freq='MS')
+        rng = self._rng(series_id)
+        drift = np.log(85.0 / 7.5) / len(dates)
+        values = 7.5 * np.exp(np.cumsum(rng.normal(drift, 0.015, len(dates))))
+        data = pd.Series(values, index=pd.DatetimeIndex(dates, name='Date'), name=series_id)
+        return filter_date_range(data, start)
+
+
+class LatencyProvider:
+    """
+    Wraps another provider and sleeps before every request to mimic network latency
+    delays: {symbol: seconds} overrides the default delay for specific symbols
+    """
+
+    def __init__(self, inner, delay=0.5, delays=None):
+        self.inner = inner
+        self.delay = delay
+        self.delays = delays or {}
+
+    @property
+    def cache_namespace(self):
+        return provider_namespace(self.inner)
+
+    def history(self, symbol, start=None, end=None):
+        time.sleep(self.delays.get(symbol, self.delay))
+        return self.inner.history(symbol, start=start, end=end)
+
+    def fred_series(self, series_id, start=None):
+        time.sleep(self.delays.get(series_id, self.delay))
+        return self.inner.fred_series(series_id, start=start)
+
+
+def get_provider(spec=None):
+    """
+    Build a provider from a spec string (default: MONETARY_DATA_PROVIDER env variable)
+      live               - Yahoo Finance + FRED (default)
+      replay:<dir>       - recorded payloads from <dir>
+      record:<dir>       - live downloads, also saved to <dir>
+      synthetic[:seed]   - generated data
+    """
+    spec = spec or os.environ.get('MONETARY_DATA_PROVIDER', 'live')
+    kind, _, arg = spec.partition(':')
+    if kind == 'live':
+        return LiveProvider()
+    if kind == 'replay':
+        return ReplayProvider(arg or 'recordings')
+    if kind == 'record':
+        return RecordingProvider(LiveProvider(), arg or 'recordings')
+    if kind == 'synthetic':
+        return SyntheticProvider(seed=int(arg or 0))
+    raise ValueError(f"Unknown data provider spec: {spec}")
@@ -0,0 +1,85 @@
+"""
+Largest-triangle-three-buckets (LTTB) downsampling in front of the line plots
+
+A line drawn on a 16-20 inch axis saved at 300 dpi has a few thousand pixel
+columns; anything beyond that only costs render time and PNG size. thin()
+reduces a series to the pixel budget of the axis it is drawn on. LTTB splits
+the series into equal buckets and keeps, per bucket, the point that spans the
+largest triangle with the previously kept point and the next bucket's average,
+so spikes and turning points survive where plain decimation would drop them.
+The global maximum and minimum and any dates passed as `keep` (event markers)
+are always kept; series already within the budget are returned unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+
+PLOT_DPI = 300
+
+
+def lttb_indices(x, y, n_out):
+    """Sorted positions of the n_out points LTTB keeps from x, y (x ascending, no NaN)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    x = x - x[0]
+
+    # n_out - 2 buckets over the points between the first and last
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    sums_x = np.concatenate([[0.0], np.cumsum(x)])
+    sums_y = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = np.diff(edges)
+    mean_x = (sums_x[edges[1:]] - sums_x[edges[:-1]]) / sizes
+    mean_y = (sums_y[edges[1:]] - sums_y[edges[:-1]]) / sizes
+    # Third vertex of every bucket's triangle: the next bucket's average (the last point for the last bucket)
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(series, n_out, keep=None):
+    """
+    Series reduced to about n_out points with LTTB (NaN dropped, sorted by index)
+
+    keep: dates that must stay, e.g. event markers (the nearest point is kept)
+    """
+    series = series.dropna()
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index()
+    if len(series) <= n_out:
+        return series
+
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy(dtype='float64')
+    y = series.to_numpy(dtype='float64')
+    positions = [lttb_indices(x, y, n_out), [y.argmax(), y.argmin()]]
+    if keep is not None and len(keep):
+        keep = pd.DatetimeIndex(keep) if isinstance(index, pd.DatetimeIndex) else pd.Index(keep)
+        if isinstance(index, pd.DatetimeIndex) and keep.tz != index.tz:
+            keep = keep.tz_localize(None) if keep.tz is not None else keep
+            keep = keep.tz_localize(index.tz) if index.tz is not None else keep
+        keep = keep[(keep >= index[0]) & (keep <= index[-1])]
+        positions.append(index.get_indexer(keep, method='nearest'))
+    return series.iloc[np.unique(np.concatenate(positions))]
+
+
+def pixel_budget(ax, dpi=PLOT_DPI):
+    """Pixel columns of an axis when its figure is saved at dpi"""
+    width = ax.get_position().width * ax.figure.get_figwidth()
+    return max(int(width * dpi), 3)
+
+
+def thin(ax, series, keep=None, dpi=PLOT_DPI):
+    """series reduced to the pixel budget of the axis it will be drawn on (see downsample)"""
+    return downsample(series, pixel_budget(ax, dpi), keep=keep)
@@ -0,0 +1,83 @@
+"""
+On-disk event catalog with interval lookups
+
+Every dated event the scripts use (US elections for the NIFTY plots and event
+studies, currency and policy episodes for the INR/USD context) lives in
+events.csv. Each row has an event date and an interval: explicit start/end
+columns, or date +/- window_days when those are empty.
+
+EventCalendar keeps the intervals sorted by start together with the running
+maximum of their ends, so "which events overlap this date or window" is two
+binary searches plus a check of the candidates in between, instead of a scan of
+the whole catalog. A long event only widens the queries that reach back into it.
+"""
+
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+from data_providers import _naive
+
+EVENT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'events.csv')
+
+
+class EventCalendar:
+    """
+    Events sorted by interval start, queried by date or date range
+
+        calendar = load_event_calendar()
+        calendar.overlapping('2013-08-01', '2013-08-31')   # frame of matching events
+        calendar.select(category='us_election')            # sub-calendar
+    """
+
+    def __init__(self, events):
+        frame = events.copy()
+        for col in ('date', 'start', 'end'):
+            if col not in frame:
+                frame[col] = pd.NaT
+            frame[col] = pd.to_datetime(frame[col])
+        window = pd.to_timedelta(frame.get('window_days', pd.Series(0, index=frame.index)).fillna(0), unit='D')
+        starts = frame['start'].fillna(frame['date'] - window).to_numpy(dtype='datetime64[ns]')
+        ends = frame['end'].fillna(frame['date'] + window).to_numpy(dtype='datetime64[ns]')
+
+        order = np.argsort(starts, kind='stable')
+        self.events = frame.iloc[order].reset_index(drop=True)
+        self._starts = starts[order]
+        self._ends = ends[order]
+        # Latest end among the events up to each position (non-decreasing, NaT ignored)
+        self._reach = np.fmax.accumulate(self._ends) if len(frame) else self._ends
+
+    @classmethod
+    def from_csv(cls, path=EVENT_CATALOG):
+        return cls(pd.read_csv(path))
+
+    def __len__(self):
+        return len(self.events)
+
+    def select(self, **fields):
+        """Sub-calendar of the events whose columns equal the given values, e.g. select(category='crisis')"""
+        mask = np.ones(len(self.events), dtype=bool)
+        for col, value in fields.items():
+            mask &= (self.events[col] == value).to_numpy()
+        return EventCalendar(self.events[mask])
+
+    def overlapping(self, start, end=None):
+        """Events whose interval overlaps [start, end] (a single date if end is None), in start order"""
+        lo = np.datetime64(_naive(start).to_datetime64(), 'ns')
+        hi = np.datetime64(_naive(end if end is not None else start).to_datetime64(), 'ns')
+        # Events before the first position whose running end reaches lo all end before it
+        first = np.searchsorted(self._reach, lo, side='left')
+        last = np.searchsorted(self._starts, hi, side='right')
+        candidates = np.arange(first, last)
+        return self.events.iloc[candidates[self._ends[candidates] >= lo]]
+
+    def records(self):
+        """Events as a list of dicts (missing values as None)"""
+        return self.events.astype(object).where(self.events.notna(), None).to_dict('records')
+
+
+@lru_cache(maxsize=8)
+def load_event_calendar(path=EVENT_CATALOG):
+    """EventCalendar of the catalog at path, read once per process"""
+    return EventCalendar.from_csv(path)
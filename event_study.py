@@ -0,0 +1,169 @@
+"""
+Batched event studies over a date x index panel of prices
+
+event_study() measures every index around every event for every window size in
+one pass (N events x M indices x K windows). Each index keeps its own trading
+calendar: the valid prices of all indices are packed into one 1-D array sorted
+by (index, date), so the trading days nearest to all event dates, and then to
+all window boundaries, are each found with a single searchsorted call.
+Volatilities come from running sums of the packed daily returns, so the cost
+does not depend on how long the windows are.
+"""
+
+import numpy as np
+import pandas as pd
+
+from returns_engine import TRADING_DAYS, _running_total
+
+EVENT_WINDOWS = (30,)
+SECONDS_PER_DAY = 86400
+
+
+def event_frame(events):
+    """Events as a frame with a naive 'date' column, from a frame, a list of dicts or a list of dates"""
+    if isinstance(events, pd.DataFrame):
+        frame = events.reset_index(drop=True).copy()
+    else:
+        events = list(events)
+        frame = pd.DataFrame(events) if events and isinstance(events[0], dict) else pd.DataFrame({'date': events})
+    if 'date' not in frame:
+        raise ValueError("Events need a 'date' column")
+    dates = pd.to_datetime(frame['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    frame['date'] = dates
+    return frame
+
+
+def _window_days(windows):
+    """(days_before, days_after) pairs from symmetric ints or explicit pairs"""
+    pairs = [(w, w) if np.isscalar(w) else tuple(w) for w in windows]
+    return np.array(pairs, dtype='int64').reshape(-1, 2)
+
+
+def _seconds(dates):
+    return np.asarray(dates, dtype='datetime64[s]').astype('int64')
+
+
+def _nearest(keys, queries, first, last):
+    """
+    Position of the key nearest to each query within keys[first:last] (ties go to
+    the later key, as get_indexer(method='nearest') does)
+    """
+    pos = np.searchsorted(keys, queries)
+    right = np.minimum(pos, last - 1)
+    left = np.maximum(pos - 1, first)
+    return np.where(queries - keys[left] < keys[right] - queries, left, right)
+
+
+def _volatility(total1, total2, first, last, periods):
+    """Annualized sample volatility of the packed daily returns first..last-1 (NaN under two returns)"""
+    n = last - first
+    s1 = total1[last] - total1[first]
+    s2 = total2[last] - total2[first]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.sqrt(np.maximum(s2 - s1 ** 2 / n, 0.0) / (n - 1) * periods)
+    return np.where(n >= 2, volatility, np.nan)
+
+
+def event_study(prices, events, windows=EVENT_WINDOWS, benchmark=None, periods=TRADING_DAYS):
+    """
+    Returns and volatility of every index before and after every event
+
+    prices:    date x index panel (see returns_engine.price_panel)
+    events:    frame or list of dicts with a 'date' column (other columns are
+               carried into the result), or a plain list of dates
+    windows:   calendar days around the event, each an int (same before and
+               after) or a (days_before, days_after) pair
+    benchmark: optional column of prices; adds abnormal returns (index return
+               minus benchmark return between the same dates)
+
+    The event day is the index's trading day nearest to the event date, and each
+    window runs from the trading day nearest to event day - days_before to the one
+    nearest to event day + days_after. Events outside an index's data range are
+    skipped for that index.
+
+    Returns one row per (event, index, window) with the event columns followed by
+    index, days_before, days_after, start, event_day, end, event_price,
+    pre_return, post_return, total_return, pre_volatility, post_volatility and,
+    with a benchmark, abnormal_pre, abnormal_post, abnormal_total. Returns and
+    volatilities are fractions (not percent), volatilities annualized.
+    """
+    events = event_frame(events)
+    spans = _window_days(windows)
+    dates = prices.index
+    if getattr(dates, 'tz', None) is not None:
+        dates = dates.tz_localize(None)
+    values = prices.to_numpy(dtype='float64')
+    valid = ~np.isnan(values)
+
+    # Valid prices index after index; keys sort by (index, date) so one sorted array serves every lookup
+    rows, cols = np.nonzero(valid.T)[::-1]
+    packed = values[rows, cols]
+    times = _seconds(dates)[rows]
+    counts = valid.sum(axis=0)
+    firsts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    lasts = firsts + counts
+    event_times = _seconds(events['date'])
+
+    bounds = np.concatenate([times, event_times])
+    lo = bounds.min() - spans[:, 0].max() * SECONDS_PER_DAY if len(bounds) else 0
+    hi = bounds.max() + spans[:, 1].max() * SECONDS_PER_DAY if len(bounds) else 0
+    span = hi - lo + 1
+    keys = cols * span + (times - lo)
+
+    # Event day of every (event, index) pair inside the index's data range
+    has_data = counts > 0
+    first_time = np.full(len(counts), np.iinfo('int64').max)
+    last_time = np.full(len(counts), np.iinfo('int64').min)
+    first_time[has_data] = times[firsts[has_data]]
+    last_time[has_data] = times[lasts[has_data] - 1]
+    in_range = (event_times[:, None] >= first_time) & (event_times[:, None] <= last_time)
+    event_pos, col_pos = np.nonzero(in_range)
+    day = _nearest(keys, col_pos * span + (event_times[event_pos] - lo), firsts[col_pos], lasts[col_pos])
+
+    # Window boundaries of every (event, index, window)
+    before = np.tile(spans[:, 0], len(day))
+    after = np.tile(spans[:, 1], len(day))
+    event_pos, col_pos, day = (np.repeat(a, len(spans)) for a in (event_pos, col_pos, day))
+    targets = np.concatenate([keys[day] - before * SECONDS_PER_DAY, keys[day] + after * SECONDS_PER_DAY])
+    boundary = _nearest(keys, targets, np.tile(firsts[col_pos], 2), np.tile(lasts[col_pos], 2))
+    start, end = boundary[:len(day)], boundary[len(day):]
+
+    # Daily returns against the previous packed price; an index's first price has none
+    daily = np.zeros(len(packed))
+    daily[1:] = packed[1:] / packed[:-1] - 1.0
+    daily[firsts[has_data]] = 0.0
+    center = daily.mean() if len(daily) else 0.0
+    total1 = _running_total(daily - center)
+    total2 = _running_total((daily - center) ** 2)
+
+    pre_return = packed[day] / packed[start] - 1.0
+    post_return = packed[end] / packed[day] - 1.0
+    total_return = packed[end] / packed[start] - 1.0
+
+    table = events.iloc[event_pos].reset_index(drop=True).rename(columns={'date': 'event_date'})
+    table['index'] = prices.columns[col_pos]
+    table['days_before'] = before
+    table['days_after'] = after
+    table['start'] = dates[rows[start]]
+    table['event_day'] = dates[rows[day]]
+    table['end'] = dates[rows[end]]
+    table['event_price'] = packed[day]
+    table['pre_return'] = pre_return
+    table['post_return'] = post_return
+    table['total_return'] = total_return
+    table['pre_volatility'] = _volatility(total1, total2, start + 1, day + 1, periods)
+    table['post_volatility'] = _volatility(total1, total2, day + 1, end + 1, periods)
+
+    if benchmark is not None:
+        # Benchmark price as of each boundary date, on the benchmark's own calendar
+        b = prices.columns.get_loc(benchmark)
+        lookups = b * span + (times[np.concatenate([start, day, end])] - lo)
+        pos = np.searchsorted(keys, lookups, side='right') - 1
+        level = np.where(pos >= firsts[b], packed[np.maximum(pos, 0)], np.nan)
+        b_start, b_day, b_end = np.split(level, 3)
+        table['abnormal_pre'] = pre_return - (b_day / b_start - 1.0)
+        table['abnormal_post'] = post_return - (b_end / b_day - 1.0)
+        table['abnormal_total'] = total_return - (b_end / b_start - 1.0)
+    return table
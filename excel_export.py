@@ -0,0 +1,228 @@
+"""
+Shared workbook export used by all analysis scripts
+
+WorkbookExport writes sheets through openpyxl's write-only mode: rows are
+streamed to disk as they are appended, so memory stays flat no matter how long
+the exported series are (pd.ExcelWriter keeps every cell object alive until the
+workbook is saved). Timezones are dropped from dates on the way out because
+Excel cannot store them.
+
+Every table can also be written as Parquet and/or CSV side outputs for
+downstream tools, either per export (side_outputs=('parquet', 'csv')) or for all
+scripts at once with the MONETARY_SIDE_OUTPUTS environment variable, e.g.
+MONETARY_SIDE_OUTPUTS=parquet,csv. Side outputs go to <workbook name>_tables/.
+
+In write-only mode the sheets are only written when the export is closed, and
+not at all if a workbook with exactly the same sheets was written before: it is
+copied from the artifact cache instead (see artifact_cache.py).
+
+update_workbook() edits an existing workbook in place instead (append rows to
+some sheets, rewrite others), for incremental runs that only change a few tables.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from cache_utils import safe_name, _has_parquet
+from artifact_cache import get_artifact_cache, feed, code_digest, _package_version
+
+SIDE_OUTPUT_FORMATS = ('parquet', 'csv')
+
+
+def _side_outputs_from_env():
+    spec = os.environ.get('MONETARY_SIDE_OUTPUTS', '')
+    return tuple(fmt.strip().lower() for fmt in spec.split(',') if fmt.strip())
+
+
+def strip_timezones(df):
+    """Copy of df with timezone-aware dates (index or columns) converted to naive wall-clock time"""
+    out = df
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        out = out.copy()
+        out.index = out.index.tz_localize(None)
+    tz_cols = [c for c in out.columns if isinstance(out[c].dtype, pd.DatetimeTZDtype)]
+    if tz_cols:
+        out = out.copy() if out is df else out
+        for c in tz_cols:
+            out[c] = out[c].dt.tz_localize(None)
+    return out
+
+
+def _cell_column(values):
+    """Column of Python cell values: missing -> empty cell, +/-inf -> 'inf'/'-inf' (as pandas does)"""
+    series = pd.Series(values)
+    cells = series.to_numpy(dtype=object, na_value=None)
+    if series.dtype.kind == 'f':
+        inf = np.isinf(series.to_numpy())
+        if inf.any():
+            cells[inf] = np.where(series.to_numpy()[inf] > 0, 'inf', '-inf')
+    return cells
+
+
+def _header_label(col):
+    if isinstance(col, tuple):
+        return " ".join(str(p) for p in col if str(p).strip() and 'Unnamed' not in str(p))
+    return col
+
+
+def frame_rows(df, index=True):
+    """Yield the header row and then every data row of df as tuples of plain cell values"""
+    df = strip_timezones(df)
+    header, columns = [], []
+    if index:
+        levels = [df.index.get_level_values(i) for i in range(df.index.nlevels)]
+        header += [name if name is not None else '' for name in df.index.names]
+        columns += [_cell_column(level) for level in levels]
+    header += [_header_label(c) for c in df.columns]
+    columns += [_cell_column(df.iloc[:, i]) for i in range(df.shape[1])]
+
+    yield tuple(header)
+    yield from zip(*columns)
+
+
+class WorkbookExport:
+    """
+    Context manager replacing pd.ExcelWriter for the scripts' workbook exports
+
+        with WorkbookExport('nifty_analysis.xlsx') as book:
+            book.add(summary_df, 'Summary', index=False)
+
+    write_only=False falls back to pd.ExcelWriter (formatted headers, higher memory).
+    side_outputs: iterable of 'parquet' / 'csv' (default: MONETARY_SIDE_OUTPUTS).
+    cache: ArtifactCache for unchanged workbooks (default get_artifact_cache(),
+           write-only mode only); False always writes the workbook.
+    """
+
+    def __init__(self, path, write_only=True, side_outputs=None, side_dir=None, cache=None):
+        self.path = path
+        self.write_only = write_only
+        self.cache = (get_artifact_cache() if cache is None else cache or None) if write_only else None
+        self.side_outputs = tuple(side_outputs) if side_outputs is not None else _side_outputs_from_env()
+        unknown = set(self.side_outputs) - set(SIDE_OUTPUT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown side output format(s): {', '.join(sorted(unknown))}")
+        if 'parquet' in self.side_outputs and not _has_parquet():
+            print("  ⚠ Parquet side outputs need pyarrow (pip install pyarrow), writing CSV only")
+            self.side_outputs = tuple(fmt for fmt in self.side_outputs if fmt != 'parquet') or ('csv',)
+        self.side_dir = side_dir or os.path.splitext(path)[0] + '_tables'
+        self.sheets = []
+        self._workbook = None
+        self._writer = None
+        self._tables = None
+        self._hash = None
+
+    def __enter__(self):
+        if self.cache is not None:
+            # Sheets are kept until close(), where the cache decides whether to write them
+            self._tables = []
+            self._hash = self.cache.hasher()
+        elif self.write_only:
+            self._open_workbook()
+        else:
+            self._writer = pd.ExcelWriter(self.path, engine='openpyxl')
+        return self
+
+    def _open_workbook(self):
+        from openpyxl import Workbook
+        self._workbook = Workbook(write_only=True)
+
+    def _write_sheet(self, df, sheet_name, index):
+        sheet = self._workbook.create_sheet(title=sheet_name)
+        for row in frame_rows(df, index=index):
+            sheet.append(row)
+
+    def add(self, df, sheet_name, index=True):
+        """Append df as a new sheet (and as side outputs, if enabled)"""
+        if isinstance(df, pd.Series):
+            df = df.to_frame()
+        if self._tables is not None:
+            self._tables.append((df, sheet_name, index))
+            feed(self._hash, (sheet_name, index, df))
+        elif self.write_only:
+            self._write_sheet(df, sheet_name, index)
+        else:
+            strip_timezones(df).to_excel(self._writer, sheet_name=sheet_name, index=index)
+        self.sheets.append(sheet_name)
+        if self.side_outputs:
+            self._write_side_outputs(df, sheet_name, index)
+
+    def _write_side_outputs(self, df, sheet_name, index):
+        os.makedirs(self.side_dir, exist_ok=True)
+        stem = os.path.join(self.side_dir, safe_name(sheet_name))
+        if 'csv' in self.side_outputs:
+            df.to_csv(stem + '.csv', index=index)
+        if 'parquet' in self.side_outputs:
+            table = df.set_axis([str(_header_label(c)) for c in df.columns], axis=1)
+            table.to_parquet(stem + '.parquet', index=index)
+
+    def close(self):
+        if self._tables is not None:
+            tables, self._tables = self._tables, None
+            feed(self._hash, (code_digest(frame_rows), _package_version('openpyxl')))
+            key = self._hash.hexdigest()
+            if self.cache.restore(key, self.path):
+                return
+            self._open_workbook()
+            for df, sheet_name, index in tables:
+                self._write_sheet(df, sheet_name, index)
+            self._save_workbook()
+            try:
+                self.cache.store(key, self.path)
+            except OSError as e:
+                print(f"  ⚠ Could not cache '{self.path}': {e}")
+            return
+        self._save_workbook()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _save_workbook(self):
+        if self._workbook is not None:
+            if not self.sheets:
+                self._workbook.create_sheet(title='Sheet1')
+            self._workbook.save(self.path)
+            self._workbook = None
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Don't leave a half-written workbook behind
+            self._workbook = None
+            self._tables = None
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        return False
+
+
+def _write_rows(sheet, rows):
+    for row in rows:
+        sheet.append(row)
+
+
+def update_workbook(path, append=None, replace=None):
+    """
+    Update an existing workbook in place, leaving all other sheets untouched
+
+    append:  {sheet name: (df, index)} rows added below the sheet's existing data
+             (df must have the sheet's columns)
+    replace: {sheet name: (df, index)} sheets rewritten from scratch (created,
+             at the end, if missing)
+
+    Raises KeyError if a sheet to append to does not exist.
+    """
+    from openpyxl import load_workbook
+    workbook = load_workbook(path)
+    for sheet_name, (df, index) in (append or {}).items():
+        rows = frame_rows(df, index=index)
+        next(rows)  # the header is already there
+        _write_rows(workbook[sheet_name], rows)
+    for sheet_name, (df, index) in (replace or {}).items():
+        position = None
+        if sheet_name in workbook.sheetnames:
+            position = workbook.sheetnames.index(sheet_name)
+            del workbook[sheet_name]
+        _write_rows(workbook.create_sheet(title=sheet_name, index=position), frame_rows(df, index=index))
+    workbook.save(path)
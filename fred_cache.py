@@ -0,0 +1,117 @@
+"""
+Persistent incremental cache for FRED series downloads
+Each series is kept in a local file next to a small JSON record of its last
+observation; a refresh only asks the provider for observations from that date
+on, and get_many() fetches several series concurrently through one provider
+(and therefore one shared HTTP client)
+"""
+
+import os
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+from cache_utils import cache_dir, safe_name, read_frame, write_frame, FRAME_SUFFIX
+from data_providers import get_provider, filter_date_range, provider_namespace, _naive
+
+
+class FredCache:
+    """
+    Local FRED series cache in front of a data provider
+
+    provider: object with fred_series(series_id, start), see data_providers.py
+              (default: get_provider(), i.e. MONETARY_DATA_PROVIDER or live FRED)
+    directory: where the per-series files live (default .cache/fred/<provider namespace>)
+    max_workers: concurrent downloads in get_many()
+
+    The last cached observation is always requested again, since FRED revises
+    the latest values of many series.
+    """
+
+    def __init__(self, provider=None, directory=None, max_workers=8):
+        self.provider = provider if provider is not None else get_provider()
+        self.directory = directory or cache_dir('fred', provider_namespace(self.provider))
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_workers = max_workers
+
+    def _data_path(self, series_id):
+        return os.path.join(self.directory, safe_name(series_id) + FRAME_SUFFIX)
+
+    def _meta_path(self, series_id):
+        return os.path.join(self.directory, safe_name(series_id) + '.json')
+
+    def load(self, series_id):
+        """Return (cached series, metadata) for a series id"""
+        data = read_frame(self._data_path(series_id))
+        if data is not None:
+            data = data.iloc[:, 0]
+        meta = {}
+        if os.path.exists(self._meta_path(series_id)):
+            with open(self._meta_path(series_id)) as f:
+                meta = json.load(f)
+        return data, meta
+
+    def _save(self, series_id, data, covered_from):
+        write_frame(data.rename(series_id).to_frame(), self._data_path(series_id))
+        with open(self._meta_path(series_id), 'w') as f:
+            json.dump({
+                'covered_from': covered_from.isoformat() if covered_from is not None else None,
+                'first_observation': data.index.min().isoformat(),
+                'last_observation': data.index.max().isoformat(),
+                'observations': int(len(data)),
+                'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            }, f, indent=2)
+
+    def get(self, series_id, start=None):
+        """Return observations from start on (all of them if None), fetching only what is missing"""
+        start = _naive(start) if start is not None else None
+        cached, meta = self.load(series_id)
+        covered_from = pd.Timestamp(meta['covered_from']) if meta.get('covered_from') else None
+        usable = (cached is not None and not cached.empty and 'last_observation' in meta
+                  and (covered_from is None or (start is not None and start >= covered_from)))
+
+        if not usable:
+            # Nothing usable on disk (or an older start than cached): one full download
+            data = self.provider.fred_series(series_id, start=start)
+            if data is None or data.empty:
+                return data
+            data = data.sort_index()
+            self._save(series_id, data, start)
+            return data
+
+        # Only the observations since the last one on disk
+        try:
+            tail = self.provider.fred_series(series_id, start=pd.Timestamp(meta['last_observation']))
+        except (OSError, ValueError) as e:
+            # Offline, HTTP error or malformed payload (requests and pandas_datareader
+            # raise IOError subclasses): the cached observations are still good.
+            # Anything else is a bug and propagates.
+            print(f"  ⚠ Could not refresh {series_id}, using cached data through "
+                  f"{meta['last_observation'][:10]}: {str(e)[:60]}")
+            return filter_date_range(cached, start)
+        data = cached
+        if tail is not None and not tail.empty:
+            data = pd.concat([cached, tail.rename(cached.name)])
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            self._save(series_id, data, covered_from)
+        return filter_date_range(data, start)
+
+    def get_many(self, series_ids, start=None):
+        """
+        Fetch several series concurrently
+
+        Returns {series id: Series}; series that failed or came back empty map to None.
+        """
+        series_ids = list(dict.fromkeys(series_ids))
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(series_ids)))) as executor:
+            futures = {series_id: executor.submit(self.get, series_id, start) for series_id in series_ids}
+            for series_id, future in futures.items():
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"  ✗ Failed to download {series_id}: {str(e)[:50]}")
+                    data = None
+                results[series_id] = data if data is not None and not data.empty else None
+        return results
@@ -0,0 +1,258 @@
+"""
+Multi-horizon jump ranking for exchange rate series
+
+rank_jumps() computes the % change over every horizon (1, 3, 6 and 12 months by
+default) for every column of a date x currency frame, then picks the k largest
+rises (depreciations, for rates quoted as local currency per dollar) and the k
+largest falls (appreciations) of each (currency, horizon) at once. Selection uses
+np.partition over all columns together to find each column's k-th score, so only
+the rows at or above it are sorted, not the whole history.
+
+JumpTracker keeps the same ranking for one series incrementally: the last few
+levels, a size-n heap per (horizon, direction) and running aggregates are saved
+as JSON, so appending new months costs O(new rows) instead of a full re-rank.
+"""
+
+import os
+import json
+import heapq
+import numpy as np
+import pandas as pd
+
+JUMP_HORIZONS = (1, 3, 6, 12)
+JUMP_DIRECTIONS = ('depreciation', 'appreciation')
+
+
+def horizon_changes(data, horizons=JUMP_HORIZONS):
+    """
+    % change over each horizon (in observations, i.e. months for monthly series)
+    as a (horizon, date, column) array; NaN where either price is missing
+    """
+    values = data.to_numpy(dtype='float64')
+    changes = np.full((len(horizons),) + values.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i, h in enumerate(horizons):
+            if h < len(values):
+                changes[i, h:] = (values[h:] / values[:-h] - 1) * 100
+    return changes
+
+
+def _top_k(scores, k):
+    """
+    Row positions and scores of the k largest finite scores in each column,
+    largest first, earlier rows first on ties; missing ranks have score NaN
+    """
+    n_rows, n_cols = scores.shape
+    k = min(k, n_rows)
+    filled = np.where(np.isfinite(scores), scores, -np.inf)
+    if k == 0:
+        return np.empty((0, n_cols), dtype='int64'), np.empty((0, n_cols))
+    # k-th largest score of each column; every row at or above it is a candidate,
+    # so ties at the k-th place are all kept until the row order breaks them
+    threshold = np.partition(filled, n_rows - k, axis=0)[n_rows - k]
+    rows, cols = np.nonzero(filled >= threshold)
+    order = np.lexsort((rows, -filled[rows, cols], cols))
+    # Candidates are now grouped by column (at least k each), largest first
+    counts = np.bincount(cols, minlength=n_cols)
+    starts = np.cumsum(counts) - counts
+    positions = rows[order][starts + np.arange(k)[:, None]]
+    ranked = np.take_along_axis(filled, positions, axis=0)
+    return positions, np.where(np.isfinite(ranked), ranked, np.nan)
+
+
+def rank_jumps(data, n=5, horizons=JUMP_HORIZONS):
+    """
+    The n biggest rises and falls of every column over every horizon
+
+    Returns a tidy frame sorted by series, horizon, direction and rank with
+    columns: series, horizon, direction, rank (1 = biggest), date, change (%),
+    rate (the level at the end of the move). Columns with fewer than n changes
+    at a horizon get fewer rows.
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    changes = horizon_changes(data, horizons)
+    n_horizons, n_rows, n_cols = changes.shape
+    scores = changes.transpose(1, 0, 2).reshape(n_rows, n_horizons * n_cols)  # column j = horizon * n_cols + series
+    values = data.to_numpy(dtype='float64')
+
+    tables = []
+    for d, (direction, sign) in enumerate(zip(JUMP_DIRECTIONS, (1.0, -1.0))):
+        positions, top = _top_k(sign * scores, n)
+        ranks, cols = np.nonzero(~np.isnan(top))
+        rows = positions[ranks, cols]
+        series = cols % n_cols
+        tables.append(pd.DataFrame({
+            '_series': series,
+            'series': data.columns[series],
+            'horizon': np.asarray(horizons)[cols // n_cols],
+            '_direction': d,
+            'direction': direction,
+            'rank': ranks + 1,
+            'date': data.index[rows],
+            'change': sign * top[ranks, cols],
+            'rate': values[rows, series],
+        }))
+    jumps = pd.concat(tables, ignore_index=True)
+    jumps = jumps.sort_values(['_series', 'horizon', '_direction', 'rank'], kind='stable')
+    return jumps.drop(columns=['_series', '_direction']).reset_index(drop=True)
+
+
+class JumpTracker:
+    """
+    Running top-n jumps and summary aggregates of one series, updated in O(new rows)
+
+        tracker = JumpTracker.from_series(data['Rate'])      # full build, once
+        new_rows = tracker.update(data['Rate'])              # later: only the appended months
+        tracker.ranking()                                    # same frame as rank_jumps()
+
+    State: the last max(horizons) observations, one size-n min-heap per
+    (horizon, direction) whose root is the weakest kept move, and level/change
+    aggregates. Everything is plain JSON (save / load).
+    """
+
+    def __init__(self, name, n=5, horizons=JUMP_HORIZONS):
+        self.name = name
+        self.n = n
+        self.horizons = tuple(int(h) for h in horizons)
+        self.tail = []  # [[date iso, level]] of the last max(horizons) observations
+        self.heaps = {f"{h}:{d}": [] for h in self.horizons for d in JUMP_DIRECTIONS}
+        self.stats = {'levels': 0, 'level_sum': 0.0, 'level_min': None, 'level_max': None,
+                      'changes': 0, 'change_sum': 0.0, 'change_sumsq': 0.0}
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.tail[-1][0]) if self.tail else None
+
+    def _push(self, horizon, direction, date, change, rate):
+        # Heap items compare by strength, then by earlier date (ties keep the earlier move, as rank_jumps does)
+        sign = 1.0 if direction == JUMP_DIRECTIONS[0] else -1.0
+        item = [sign * change, -pd.Timestamp(date).value, date, change, rate]
+        heap = self.heaps[f"{horizon}:{direction}"]
+        if len(heap) < self.n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def _observe(self, date, level):
+        date, level = pd.Timestamp(date).isoformat(), float(level)
+        stats = self.stats
+        if np.isfinite(level):
+            stats['levels'] += 1
+            stats['level_sum'] += level
+            stats['level_min'] = level if stats['level_min'] is None else min(stats['level_min'], level)
+            stats['level_max'] = level if stats['level_max'] is None else max(stats['level_max'], level)
+        for h in self.horizons:
+            if len(self.tail) < h:
+                continue
+            base = self.tail[-h][1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = float((np.float64(level) / base - 1) * 100)
+            if not np.isfinite(change):
+                continue
+            if h == 1:
+                stats['changes'] += 1
+                stats['change_sum'] += change
+                stats['change_sumsq'] += change * change
+            for direction in JUMP_DIRECTIONS:
+                self._push(h, direction, date, change, level)
+        self.tail.append([date, level])
+        del self.tail[:-max(self.horizons)]
+
+    @classmethod
+    def from_series(cls, series, n=5, horizons=JUMP_HORIZONS):
+        """Build the state from a full history (vectorized, via rank_jumps)"""
+        series = series.sort_index()
+        tracker = cls(series.name, n=n, horizons=horizons)
+        for row in rank_jumps(series.to_frame(), n=n, horizons=horizons).itertuples():
+            tracker._push(row.horizon, row.direction, row.date.isoformat(), float(row.change), float(row.rate))
+
+        levels = series.to_numpy(dtype='float64')
+        finite = levels[np.isfinite(levels)]
+        changes = horizon_changes(series.to_frame(), (1,))[0, :, 0]
+        changes = changes[np.isfinite(changes)]
+        tracker.stats = {
+            'levels': int(len(finite)), 'level_sum': float(finite.sum()),
+            'level_min': float(finite.min()) if len(finite) else None,
+            'level_max': float(finite.max()) if len(finite) else None,
+            'changes': int(len(changes)), 'change_sum': float(changes.sum()),
+            'change_sumsq': float((changes ** 2).sum()),
+        }
+        keep = max(tracker.horizons)
+        tracker.tail = [[d.isoformat(), float(v)] for d, v in zip(series.index[-keep:], levels[-keep:])]
+        return tracker
+
+    def update(self, series):
+        """
+        Feed the observations after the last one seen; returns them as a Series
+
+        Returns None (state untouched) when an observation already in the state
+        was revised or removed, since the kept heaps can't be un-applied; the
+        caller should rebuild with from_series().
+        """
+        series = series.sort_index()
+        if self.tail:
+            seen = pd.DatetimeIndex([d for d, _ in self.tail])
+            current = series.reindex(seen).to_numpy(dtype='float64')
+            kept = np.array([v for _, v in self.tail])
+            if not np.array_equal(current, kept, equal_nan=True):
+                return None
+            series = series[series.index > self.last_date]
+        for date, level in series.items():
+            self._observe(date, level)
+        return series
+
+    def ranking(self):
+        """Current ranking as the frame rank_jumps() would return for the full series"""
+        rows = []
+        for h in self.horizons:
+            for direction in JUMP_DIRECTIONS:
+                ranked = sorted(self.heaps[f"{h}:{direction}"], reverse=True)
+                for rank, (_, _, date, change, rate) in enumerate(ranked, 1):
+                    rows.append({'series': self.name, 'horizon': h, 'direction': direction, 'rank': rank,
+                                 'date': pd.Timestamp(date), 'change': change, 'rate': rate})
+        columns = ['series', 'horizon', 'direction', 'rank', 'date', 'change', 'rate']
+        jumps = pd.DataFrame(rows, columns=columns)
+        return jumps.sort_values('horizon', kind='stable').reset_index(drop=True)
+
+    def summary(self):
+        """Current, average, peak and low level plus mean / std of the 1-step changes"""
+        stats = self.stats
+        n = stats['changes']
+        mean = stats['change_sum'] / n if n else np.nan
+        variance = (stats['change_sumsq'] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+        return {
+            'current': self.tail[-1][1] if self.tail else np.nan,
+            'average': stats['level_sum'] / stats['levels'] if stats['levels'] else np.nan,
+            'peak': stats['level_max'] if stats['level_max'] is not None else np.nan,
+            'low': stats['level_min'] if stats['level_min'] is not None else np.nan,
+            'mean_change': mean,
+            'std_change': float(np.sqrt(max(variance, 0.0))) if n > 1 else np.nan,
+            'observations': stats['levels'],
+        }
+
+    def to_dict(self):
+        return {'name': self.name, 'n': self.n, 'horizons': list(self.horizons),
+                'tail': self.tail, 'heaps': self.heaps, 'stats': self.stats}
+
+    @classmethod
+    def from_dict(cls, state):
+        tracker = cls(state['name'], n=state['n'], horizons=state['horizons'])
+        tracker.tail = state['tail']
+        tracker.heaps = {key: [list(item) for item in heap] for key, heap in state['heaps'].items()}
+        tracker.stats = state['stats']
+        return tracker
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Tracker saved at path, or None if there is none"""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
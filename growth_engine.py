@@ -0,0 +1,110 @@
+"""
+Calendar-aware growth rates for series reported on irregular dates
+
+RBI Table 6 is reported on irregular dates (15-Jan, 31-Dec, 15-Dec, 28-Nov, ...),
+so "one year ago" or "the previous fortnight" can't be a fixed number of rows.
+growth_rates() sorts the rows once into a reporting calendar and then, for every
+column at once:
+  period      - growth since the column's previous reported value
+  annualized  - that growth compounded to a year using the actual days between reports
+  yoy         - growth since the value as of one year earlier (the last report on
+                or before date - 1 year, as merge_asof(direction='backward') would
+                pick it, and no more than `tolerance_days` before that date)
+Row order of the input does not matter.
+"""
+
+import numpy as np
+import pandas as pd
+
+from alignment import normalize_index
+from returns_engine import _previous_valid_rows
+
+GROWTH_METRICS = ('yoy', 'period', 'annualized')
+YOY_TOLERANCE_DAYS = 16
+DAYS_PER_YEAR = 365.25
+
+
+def _last_valid_rows(valid):
+    """For every cell, the row of the last valid value at or above it (-1 if none)"""
+    rows = np.where(valid, np.arange(valid.shape[0])[:, None], -1)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return rows
+
+
+def reporting_calendar(levels):
+    """Levels sorted by date with one row per reporting date (last one wins) and a naive index"""
+    return normalize_index(levels)
+
+
+def growth_rates(levels, tolerance_days=YOY_TOLERANCE_DAYS):
+    """
+    YoY, period-on-period and annualized growth (%) of every column
+
+    Returns a frame on the sorted reporting calendar with (series, metric)
+    column levels, metric in GROWTH_METRICS.
+    """
+    if isinstance(levels, pd.Series):
+        levels = levels.to_frame()
+    levels = reporting_calendar(levels)
+    values = levels.to_numpy(dtype='float64')
+    valid = np.isfinite(values)
+    days = levels.index.to_numpy(dtype='datetime64[D]').astype('int64')
+    cols = np.arange(values.shape[1])
+
+    # Period on period: against the column's previous valid report
+    previous = _previous_valid_rows(valid)
+    has_previous = valid & (previous >= 0)
+    ratio = np.full_like(values, np.nan)
+    np.divide(values, values[np.maximum(previous, 0), cols], out=ratio, where=has_previous)
+    gap = days[:, None] - days[np.maximum(previous, 0)]
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        period = (ratio - 1) * 100
+        annualized = np.where(gap > 0, (ratio ** (DAYS_PER_YEAR / gap) - 1) * 100, np.nan)
+
+    # Year on year: as-of join of (date - 1 year) onto the reporting calendar
+    targets = (levels.index - pd.DateOffset(years=1)).to_numpy(dtype='datetime64[D]').astype('int64')
+    row = np.searchsorted(days, targets, side='right') - 1
+    base = np.where(row[:, None] >= 0, _last_valid_rows(valid)[np.maximum(row, 0)], -1)
+    found = valid & (base >= 0) & (days[np.maximum(base, 0)] >= targets[:, None] - tolerance_days)
+    yoy = np.full_like(values, np.nan)
+    np.divide(values, values[np.maximum(base, 0), cols], out=yoy, where=found)
+    yoy = (yoy - 1) * 100
+
+    metrics = {'yoy': yoy, 'period': period, 'annualized': annualized}
+    data = np.stack([metrics[m] for m in GROWTH_METRICS], axis=2).reshape(len(levels), -1)
+    columns = pd.MultiIndex.from_tuples(
+        [(name, metric) for name in levels.columns for metric in GROWTH_METRICS],
+        names=['series', 'metric'])
+    return pd.DataFrame(data, index=levels.index, columns=columns)
+
+
+def growth_summary(levels, growth=None):
+    """
+    Earliest / latest value and date, total and compound annual growth (%) and
+    the latest and average YoY growth (%) of every column, regardless of row order
+    """
+    if isinstance(levels, pd.Series):
+        levels = levels.to_frame()
+    levels = reporting_calendar(levels)
+    growth = growth if growth is not None else growth_rates(levels)
+    rows = []
+    for name in levels.columns:
+        series = levels[name].dropna()
+        if series.empty:
+            continue
+        years = (series.index[-1] - series.index[0]).days / DAYS_PER_YEAR
+        ratio = series.iloc[-1] / series.iloc[0] if series.iloc[0] != 0 else np.nan
+        yoy = growth[(name, 'yoy')].dropna()
+        rows.append({
+            'series': name,
+            'earliest_date': series.index[0],
+            'latest_date': series.index[-1],
+            'earliest': series.iloc[0],
+            'latest': series.iloc[-1],
+            'total_growth': (ratio - 1) * 100,
+            'cagr': (ratio ** (1 / years) - 1) * 100 if years > 0 else np.nan,
+            'latest_yoy': yoy.iloc[-1] if len(yoy) else np.nan,
+            'average_yoy': yoy.mean() if len(yoy) else np.nan,
+            'observations': len(series),
+        })
+    return pd.DataFrame(rows).set_index('series') if rows else pd.DataFrame()
@@ -3,99 +3,91 @@ Assignment 1 - Part 2: INR/USD Exchange Rate Analysis
 Downloads data from FRED and analyzes biggest monthly jumps
 """
 
+import os
+import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import warnings
+from fred_cache import FredCache
+from excel_export import WorkbookExport, update_workbook
+from cache_utils import cache_dir, safe_name
+from event_calendar import load_event_calendar
+from fx_jumps import rank_jumps, JumpTracker, JUMP_HORIZONS
+from analytics import calculate_monthly_changes, find_biggest_jumps
+from alignment import align, normalize_index
+from downsample import thin
+from render_service import FigureSpec, get_render_service
 warnings.filterwarnings('ignore')
 
-def download_fred_data(series_id='CCUSMA02INM618N'):
+def download_fred_data(series_id='CCUSMA02INM618N', provider=None, cache=None):
     """
     Download INR/USD exchange rate data from FRED
     Series: CCUSMA02INM618N - Indian Rupee to U.S. Dollar Spot Exchange Rate
+
+    Downloads go through a local FredCache (see fred_cache.py), so repeated runs
+    only fetch observations after the last cached one. provider defaults to
+    get_provider() (FRED REST API with pandas_datareader fallback);
+    set MONETARY_DATA_PROVIDER=replay:<dir> or synthetic to run offline
     """
+    cache = cache or FredCache(provider)
     try:
-        import fredapi
-        from fredapi import Fred
-        
-        try:
-            from fredapi import Fred
-            import os
-            api_key = "2cfb19b1c2dbf27ec1a7831223f74a6a"
-            
-            fred = Fred(api_key=api_key)
-            data = fred.get_series(series_id)
-            data = pd.DataFrame(data, columns=['Rate'])
-            data.index.name = 'Date'
-            return data
-        except:
-            # Alternative: Use pandas_datareader
-            try:
-                import pandas_datareader.data as web
-                from datetime import datetime
-                start = datetime(1970, 1, 1)
-                end = datetime.now()
-                data = web.DataReader(series_id, 'fred', start, end)
-                return data
-            except:
-                print("\nCould not download automatically. Please download manually from:")
-                print("https://fred.stlouisfed.org/series/CCUSMA02INM618N")
-                print("Save as CSV and update the code to read from file.")
-                return None
+        series = cache.get(series_id)
     except ImportError:
-        print("Required packages not installed. Installing...")
-        import subprocess
-        try:
-            subprocess.check_call(['pip', 'install', 'fredapi', 'pandas-datareader'])
-            return download_fred_data(series_id)
-        except:
-            print("Please install manually: pip install fredapi pandas-datareader")
-            return None
+        print("Required packages not installed.")
+        print("Please install manually: pip install requests pandas-datareader")
+        return None
+    except (OSError, ValueError) as e:
+        # Network and HTTP errors (requests and pandas_datareader raise IOError
+        # subclasses) and malformed payloads; anything else is a bug and propagates
+        print(f"  ✗ Error downloading {series_id}: {str(e)}")
+        print(f"  Error type: {type(e).__name__}")
+        series = None
+    
+    if series is None or len(series) == 0:
+        print("\nCould not download automatically. Please download manually from:")
+        print("https://fred.stlouisfed.org/series/CCUSMA02INM618N")
+        print("Save as CSV and update the code to read from file.")
+        return None
+    
+    return normalize_index(series.rename('Rate').to_frame()).rename_axis('Date')
+
+def download_fred_batch(series_ids, provider=None, cache=None):
+    """
+    Download several FRED series concurrently into one date x series frame
+    Series that could not be downloaded are left out (with a warning)
+    """
+    cache = cache or FredCache(provider)
+    results = cache.get_many(series_ids)
+    missing = [series_id for series_id, series in results.items() if series is None]
+    if missing:
+        print(f"  ⚠ No data for: {', '.join(missing)}")
+    series = {series_id: s for series_id, s in results.items() if s is not None}
+    if not series:
+        return None
+    return align(series, how='outer')
 
 def load_data_from_file(filepath='CCUSMA02INM618N.csv'):
     """Load data from manually downloaded CSV file"""
     try:
         data = pd.read_csv(filepath, index_col=0, parse_dates=True)
-        return data
+        return normalize_index(data)
     except FileNotFoundError:
         print(f"File {filepath} not found.")
         return None
 
-def calculate_monthly_changes(data):
-    """Calculate month-over-month percentage changes"""
-    monthly_pct_change = data.pct_change() * 100
-    return monthly_pct_change.dropna()
-
-def find_biggest_jumps(data, n=5):
-    """Find the n biggest single month jumps (positive changes)"""
-    monthly_changes = calculate_monthly_changes(data)
-    
-    # Convert to Series if DataFrame (take first column)
-    if isinstance(monthly_changes, pd.DataFrame):
-        if len(monthly_changes.columns) > 0:
-            monthly_changes = monthly_changes.iloc[:, 0]
-        else:
-            return pd.Series(dtype=float)
-    
-    # Get biggest positive changes (INR depreciation)
-    biggest_jumps = monthly_changes.nlargest(n)
-    
-    return biggest_jumps
-
 def get_historical_context(date):
-    """Provide historical context for significant dates"""
-    # This is a simplified version - you should research actual events
-    context_map = {
-        # Add specific dates and events here
-    }
-    return context_map.get(date.strftime('%Y-%m'), "Research historical events for this period")
+    """Provide historical context for significant dates: events in the catalog
+    (events.csv) overlapping the calendar month of date"""
+    month = pd.Timestamp(date).to_period('M')
+    events = load_event_calendar().overlapping(month.start_time, month.end_time)
+    if len(events) == 0:
+        return "Research historical events for this period"
+    return "; ".join(f"{e.name}: {e.description}" for e in events.itertuples())
 
-def plot_exchange_rate(data, save_path='inr_usd_analysis.xlsx'):
-    """Simple INR/USD exchange rate plots"""
-    
-    monthly_changes = calculate_monthly_changes(data)
-    biggest_jumps = find_biggest_jumps(data, n=5)
+def draw_exchange_rate(data, monthly_changes, biggest_jumps):
+    """Exchange rate, monthly changes, their distribution and the top 5 jumps"""
+    import matplotlib.pyplot as plt
     
     # Create figure with larger middle section for monthly changes
     fig = plt.figure(figsize=(16, 10))
@@ -103,7 +95,8 @@ def plot_exchange_rate(data, save_path='inr_usd_analysis.xlsx'):
     
     # ============ Plot 1: Exchange Rate ============
     ax1 = fig.add_subplot(gs[0, :])
-    ax1.plot(data.index, data.iloc[:, 0], linewidth=2, color='steelblue')
+    rate = thin(ax1, data.iloc[:, 0], keep=biggest_jumps.index)
+    ax1.plot(rate.index, rate, linewidth=2, color='steelblue')
     
     # Mark biggest jumps
     for date in biggest_jumps.index:
@@ -181,11 +174,104 @@ def plot_exchange_rate(data, save_path='inr_usd_analysis.xlsx'):
     plt.suptitle('INR/USD Exchange Rate Analysis', 
                 fontsize=16, fontweight='bold', y=0.995)
     
-    plt.savefig('inr_usd_plots.png', dpi=300, bbox_inches='tight')
-    print("✓ Plots saved as 'inr_usd_plots.png'")
-    
     return fig
-def main():
+
+def plot_exchange_rate(data, save_path='inr_usd_analysis.xlsx', monthly_changes=None, biggest_jumps=None):
+    """Simple INR/USD exchange rate plots, rendered in the background (see render_service.py)
+    monthly_changes / biggest_jumps: pass them in when already computed
+    Returns a Future of the written file"""
+    
+    if monthly_changes is None:
+        monthly_changes = calculate_monthly_changes(data)
+    if biggest_jumps is None:
+        biggest_jumps = find_biggest_jumps(data, n=5)
+    
+    return get_render_service().submit(FigureSpec(
+        draw_exchange_rate, 'inr_usd_plots.png',
+        data={'data': data, 'monthly_changes': monthly_changes, 'biggest_jumps': biggest_jumps},
+        savefig={'dpi': 300, 'bbox_inches': 'tight'},
+        message="✓ Plots saved as 'inr_usd_plots.png'"))
+
+def jump_table(data, biggest_jumps):
+    """Rows of the 'Biggest Jumps' sheet: month, change, exchange rate and historical context"""
+    jump_data = []
+    for date, change in biggest_jumps.items():
+        change_value = change  # Now it's a scalar value from Series
+        # Get exchange rate for this date
+        if date in data.index:
+            if isinstance(data.loc[date], pd.Series):
+                rate_value = data.loc[date].iloc[0]
+            else:
+                rate_value = data.loc[date]
+        else:
+            rate_value = None
+        
+        jump_data.append({
+            'Date': date.strftime('%Y-%m'),
+            'Monthly Change (%)': f"{change_value:.2f}",
+            'Exchange Rate (INR/USD)': f"{rate_value:.2f}" if rate_value is not None else "N/A",
+            'Historical Context': get_historical_context(date)
+        })
+    return jump_data
+
+def jump_state_path(save_path='inr_usd_analysis.xlsx'):
+    """Where the JumpTracker state behind a workbook is kept (.cache/fx_state)"""
+    name = os.path.splitext(os.path.basename(save_path))[0]
+    return os.path.join(cache_dir('fx_state'), safe_name(name) + '.json')
+
+def update_analysis(data, save_path='inr_usd_analysis.xlsx', n=5):
+    """
+    Incremental run: feed only the months after the saved state to the JumpTracker
+    and update just the outputs they change (new rows appended to the data sheets,
+    jump sheets rewritten only if the ranking moved, plots redrawn)
+
+    Returns False when a full run is needed instead: no saved state or workbook,
+    or observations already processed were revised.
+    """
+    tracker = JumpTracker.load(jump_state_path(save_path))
+    if tracker is None or not os.path.exists(save_path) or tracker.n != n or tracker.horizons != JUMP_HORIZONS:
+        print("  No saved state for an incremental run, running the full analysis")
+        return False
+    
+    previous = tracker.ranking()
+    new = tracker.update(data.iloc[:, 0])
+    if new is None:
+        print("  ⚠ Earlier observations were revised, running the full analysis")
+        return False
+    if new.empty:
+        print(f"\n✓ No new months since {tracker.last_date:%Y-%m}, outputs are up to date")
+        return True
+    
+    print(f"\n✓ {len(new)} new month(s): {new.index.min():%Y-%m} to {new.index.max():%Y-%m}")
+    first_new = data.index.get_loc(new.index[0])
+    new_changes = calculate_monthly_changes(data.iloc[max(first_new - 1, 0):])
+    
+    jumps = tracker.ranking()
+    biggest_jumps = find_biggest_jumps(data, n=n, jumps=jumps)
+    replace = {}
+    if not jumps.equals(previous):
+        print("  Jump ranking changed, rewriting the jump sheets")
+        replace = {
+            'Biggest Jumps': (pd.DataFrame(jump_table(data, biggest_jumps)), False),
+            'Jump Ranking': (jumps, False),
+        }
+    update_workbook(save_path, append={
+        'Exchange Rate Data': (data.loc[new.index], True),
+        'Monthly Changes': (new_changes, True),
+    }, replace=replace)
+    plot_exchange_rate(data, biggest_jumps=biggest_jumps)
+    tracker.save(jump_state_path(save_path))
+    
+    summary = tracker.summary()
+    print(f"  Current: ₹{summary['current']:.2f} | Average: ₹{summary['average']:.2f} | "
+          f"Peak: ₹{summary['peak']:.2f} | Low: ₹{summary['low']:.2f}")
+    print(f"  Monthly change: mean {summary['mean_change']:.2f}%, std {summary['std_change']:.2f}% "
+          f"over {summary['observations']} months")
+    print(f"✓ Updated '{save_path}'")
+    return True
+
+def main(incremental=False, save_path='inr_usd_analysis.xlsx'):
+    """incremental: only process months added since the last run (see update_analysis)"""
     print("=" * 80)
     print("INR/USD Exchange Rate Analysis - Assignment 1, Part 2")
     print("=" * 80)
@@ -212,53 +298,44 @@ def main():
     print(f"\n✓ Successfully loaded {len(data)} months of data")
     print(f"  Date range: {data.index.min()} to {data.index.max()}")
     
+    if incremental and update_analysis(data, save_path):
+        get_render_service().wait()
+        return
+    
     # Calculate monthly changes
     monthly_changes = calculate_monthly_changes(data)
     
-    # Find biggest jumps (positive = INR depreciation)
-    biggest_jumps = find_biggest_jumps(data, n=5)
+    # Rank the biggest moves over 1, 3, 6 and 12 months (positive = INR depreciation)
+    jumps = rank_jumps(data, n=5, horizons=JUMP_HORIZONS)
+    biggest_jumps = find_biggest_jumps(data, n=5, jumps=jumps)
     
     print("\n" + "=" * 80)
     print("FIVE BIGGEST SINGLE MONTH JUMPS (INR Depreciation)")
     print("=" * 80)
     
-    jump_data = []
-    for date, change in biggest_jumps.items():
-        change_value = change  # Now it's a scalar value from Series
-        # Get exchange rate for this date
-        if date in data.index:
-            if isinstance(data.loc[date], pd.Series):
-                rate_value = data.loc[date].iloc[0]
-            else:
-                rate_value = data.loc[date]
-        else:
-            rate_value = None
-        
-        jump_data.append({
-            'Date': date.strftime('%Y-%m'),
-            'Monthly Change (%)': f"{change_value:.2f}",
-            'Exchange Rate (INR/USD)': f"{rate_value:.2f}" if rate_value is not None else "N/A"
-        })
-        print(f"\n{date.strftime('%Y-%m')}: {change_value:.2f}% increase")
-        print(f"  Exchange Rate: {rate_value:.2f} INR/USD" if rate_value is not None else "")
+    jump_data = jump_table(data, biggest_jumps)
+    for row in jump_data:
+        print(f"\n{row['Date']}: {row['Monthly Change (%)']}% increase")
+        rate = row['Exchange Rate (INR/USD)']
+        print(f"  Exchange Rate: {rate} INR/USD" if rate != "N/A" else "")
+        print(f"  Context: {row['Historical Context']}")
+    
+    print("\n" + "=" * 80)
+    print("BIGGEST MOVES BY HORIZON")
+    print("=" * 80)
+    for (horizon, direction), moves in jumps[jumps['rank'] == 1].groupby(['horizon', 'direction'], sort=False):
+        move = moves.iloc[0]
+        print(f"  {horizon:>2}-month {direction:<13}: {move['change']:+.2f}% to {move['date'].strftime('%Y-%m')}")
     
     # Create plots
-    plot_exchange_rate(data)
-    
-    # Save to Excel
-    # Remove timezone information if present (Excel doesn't support timezone-aware datetimes)
-    data_export = data.copy()
-    monthly_changes_export = monthly_changes.copy()
-    
-    if data_export.index.tz is not None:
-        data_export.index = pd.DatetimeIndex(data_export.index.values)
-    if monthly_changes_export.index.tz is not None:
-        monthly_changes_export.index = pd.DatetimeIndex(monthly_changes_export.index.values)
-    
-    with pd.ExcelWriter('inr_usd_analysis.xlsx', engine='openpyxl') as writer:
-        data_export.to_excel(writer, sheet_name='Exchange Rate Data', index=True)
-        monthly_changes_export.to_excel(writer, sheet_name='Monthly Changes', index=True)
-        pd.DataFrame(jump_data).to_excel(writer, sheet_name='Biggest Jumps', index=False)
+    plot_exchange_rate(data, monthly_changes=monthly_changes, biggest_jumps=biggest_jumps)
+    
+    # Save to Excel (timezones are dropped on export, Excel doesn't support them)
+    with WorkbookExport(save_path) as writer:
+        writer.add(data, 'Exchange Rate Data', index=True)
+        writer.add(monthly_changes, 'Monthly Changes', index=True)
+        writer.add(pd.DataFrame(jump_data), 'Biggest Jumps', index=False)
+        writer.add(jumps, 'Jump Ranking', index=False)
         
         # Add analysis sheet
         analysis_text = """
@@ -302,10 +379,13 @@ def main():
         """
         
         analysis_df = pd.DataFrame({'Analysis': [analysis_text]})
-        analysis_df.to_excel(writer, sheet_name='Analysis', index=False)
+        writer.add(analysis_df, 'Analysis', index=False)
+    
+    # State for later --incremental runs
+    JumpTracker.from_series(data.iloc[:, 0], n=5, horizons=JUMP_HORIZONS).save(jump_state_path(save_path))
     
     print("\n" + "=" * 80)
-    print("Analysis saved to 'inr_usd_analysis.xlsx'")
+    print(f"Analysis saved to '{save_path}'")
     print("=" * 80)
     print("\nNext Steps:")
     print("1. Research historical events for the dates identified above")
@@ -316,6 +396,12 @@ def main():
     print("   - 2020 COVID-19 pandemic")
     print("   - 2022 Fed rate hikes")
     print("3. Update the analysis sheet with specific events")
+    
+    # Charts still rendering in the background
+    get_render_service().wait()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--incremental', action='store_true',
+                        help='only process months added since the last run')
+    main(incremental=parser.parse_args().incremental)
@@ -0,0 +1,193 @@
+"""
+Column resolution and aggregate definitions for RBI money stock tables
+
+ColumnIndex normalizes a table's column names once and memoizes keyword
+lookups, so resolving many aggregates over many weekly sheets (which mostly
+share the same headers) does not rescan and renormalize every column.
+
+AGGREGATES is a declarative registry: each monetary aggregate has the
+keywords of a direct column plus alternative formulas built from component
+columns, each component with keyword rules and an optional numbered-prefix
+fallback ("1.1", "1.4", ...) for header drift between WSS vintages.
+"""
+
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+
+def _norm(col):
+    return " ".join(str(col).replace("\n", " ").replace("\r", " ").strip().upper().split())
+
+
+class ColumnIndex:
+    """Normalized column names of a table, compiled once and queried many times"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.normalized = [_norm(c) for c in self.columns]
+        self.stripped = [str(c).strip() for c in self.columns]
+        self._contains = {}
+        self._lookups = {}
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def for_columns(cls, columns):
+        """Shared index for a tuple of column names (identical headers across sheets reuse it)"""
+        return cls(columns)
+
+    def _mask(self, keyword):
+        mask = self._contains.get(keyword)
+        if mask is None:
+            mask = np.array([keyword in n for n in self.normalized], dtype=bool)
+            self._contains[keyword] = mask
+        return mask
+
+    def find(self, include_any=None, include_all=None, exclude_any=None, startswith=None):
+        """First column matching the keyword rules (case-insensitive substrings), or None"""
+        key = (tuple(include_any or ()), tuple(include_all or ()),
+               tuple(exclude_any or ()), startswith)
+        if key in self._lookups:
+            return self._lookups[key]
+
+        mask = np.ones(len(self.columns), dtype=bool)
+        if include_any:
+            mask &= np.logical_or.reduce([self._mask(k.upper()) for k in include_any])
+        for k in include_all or ():
+            mask &= self._mask(k.upper())
+        for k in exclude_any or ():
+            mask &= ~self._mask(k.upper())
+        if startswith:
+            mask &= np.array([n.startswith(startswith.upper()) for n in self.normalized], dtype=bool)
+
+        hits = np.flatnonzero(mask)
+        col = self.columns[hits[0]] if len(hits) else None
+        self._lookups[key] = col
+        return col
+
+    def find_prefix(self, prefix):
+        """First column whose (stripped) name starts with a numbered prefix such as '1.4'"""
+        key = ('prefix', prefix.strip())
+        if key not in self._lookups:
+            self._lookups[key] = next((c for c, s in zip(self.columns, self.stripped)
+                                       if s.startswith(key[1])), None)
+        return self._lookups[key]
+
+    def resolve(self, part):
+        """Column for a formula component: keyword rules first, then the numbered prefix"""
+        col = self.find(**part.get('keywords', {}))
+        if col is None and part.get('prefix'):
+            col = self.find_prefix(part['prefix'])
+        return col
+
+
+# Reusable components
+CURRENCY_WITH_PUBLIC = {'name': "Currency with Public",
+                        'keywords': {'include_all': ["CURRENCY", "PUBLIC"]}, 'prefix': "1.1"}
+OTHER_DEPOSITS_RBI = {'name': "Other Deposits with RBI",
+                      'keywords': {'include_all': ["OTHER", "DEPOSITS", "RBI"]}, 'prefix': "1.4"}
+
+AGGREGATES = [
+    {
+        'name': 'M0',
+        'direct': {'include_any': ["M0", "M 0", "RESERVE MONEY"]},
+        'formulas': [
+            {
+                'label': "M0 = Currency in Circulation + Bankers' Deposits with RBI + Other Deposits with RBI",
+                'parts': [
+                    # Fall back to numbered components if present (typically in "1 Components" table)
+                    {'name': "Currency in Circulation",
+                     'keywords': {'include_all': ["CURRENCY", "CIRCULATION"]}, 'prefix': "1.1"},
+                    {'name': "Bankers' Deposits with RBI",
+                     'keywords': {'include_all': ["BANKERS", "DEPOSITS", "RBI"]}},
+                    OTHER_DEPOSITS_RBI,
+                ],
+            },
+        ],
+    },
+    {
+        'name': 'M1',
+        'direct': {'include_any': ["M1", "M 1", "NARROW MONEY"]},
+        'formulas': [
+            {
+                'label': "M1 = Currency with Public + Demand Deposits + Other Deposits with RBI",
+                'parts': [
+                    CURRENCY_WITH_PUBLIC,
+                    {'name': "Demand Deposits", 'missing_as': "Demand Deposits or Current Deposits",
+                     'keywords': {'include_all': ["DEMAND", "DEPOSITS", "BANKING SYSTEM"]}, 'prefix': "1.2"},
+                    OTHER_DEPOSITS_RBI,
+                ],
+            },
+            {
+                'label': ("M1 = Currency with Public + Current Deposits + Demand Liabilities of "
+                          "Savings Deposits + Other Deposits with RBI"),
+                'parts': [
+                    CURRENCY_WITH_PUBLIC,
+                    {'name': "Current Deposits",
+                     'keywords': {'include_all': ["CURRENT", "DEPOSITS", "BANKING SYSTEM"]}},
+                    {'name': "Demand Liabilities of Savings Deposits",
+                     'keywords': {'include_all': ["SAVINGS", "DEPOSITS"],
+                                  'include_any': ["DEMAND LIABILITIES", "DEMAND PORTION", "DEMAND LIAB"]}},
+                    OTHER_DEPOSITS_RBI,
+                ],
+            },
+        ],
+    },
+    {
+        'name': 'M3',
+        'direct': {'include_any': ["M3", "M 3", "BROAD MONEY"], 'exclude_any': ["EXCLUDING", "M30"]},
+        'formulas': [
+            {
+                'label': ("M3 = M2 + Term Deposits (over 1 year) + Call/Term Borrowings "
+                          "(non-depository financial corporations)"),
+                'parts': [
+                    {'name': "M2", 'keywords': {'include_any': ["M2", "M 2"]}},
+                    {'name': "Term Deposits over 1 year",
+                     'keywords': {'include_all': ["TERM", "DEPOSITS", "OVER ONE YEAR"]}},
+                    {'name': "Call/Term Borrowings from non-depository financial corporations",
+                     'keywords': {'include_all': ["CALL/TERM", "BORROWINGS"],
+                                  'include_any': ["NON-DEPOSITORY", "NON DEPOSITORY"]}},
+                ],
+            },
+        ],
+    },
+]
+
+
+def resolve_aggregates(df, registry=AGGREGATES):
+    """
+    Resolve every aggregate in the registry against one (already numeric) table
+
+    For each aggregate the direct column is used if it has data, otherwise the
+    first formula whose components are all present; if none is complete the
+    components missing from the primary formula are reported. Returns {name: Series}.
+    """
+    index = ColumnIndex.for_columns(tuple(df.columns))
+    components = {}
+
+    for aggregate in registry:
+        name = aggregate['name']
+        direct = index.find(**aggregate['direct'])
+        if direct is not None:
+            series = pd.to_numeric(df[direct], errors='coerce')
+            if series.notna().sum() > 0:
+                components[name] = series
+                print(f"  ✓ Extracted {name} from column: '{direct}'")
+                continue
+
+        primary_missing = None
+        for formula in aggregate['formulas']:
+            cols = [index.resolve(part) for part in formula['parts']]
+            missing = [part.get('missing_as', part['name'])
+                       for part, col in zip(formula['parts'], cols) if col is None]
+            if not missing:
+                components[name] = sum(pd.to_numeric(df[col], errors='coerce') for col in cols)
+                print(f"  ✓ Calculated {formula['label']}")
+                break
+            if primary_missing is None:
+                primary_missing = missing
+        else:
+            if primary_missing:
+                print(f"  ⚠ Cannot calculate {name} - missing components: {', '.join(primary_missing)}")
+
+    return components
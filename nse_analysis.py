@@ -5,33 +5,57 @@ Downloads and analyzes NIFTY 50 and NIFTY BANK indices
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import requests
-session = requests.Session()
-session.headers.update({
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-})
 from datetime import datetime, timedelta
+from functools import lru_cache
 import warnings
-import yfinance as yf
+from price_cache import PriceCache
+from data_providers import INDEX_SYMBOLS
+from excel_export import WorkbookExport
+from returns_engine import price_panel
+from analytics import (calculate_returns, calculate_volatility, calculate_rolling_risk,
+                       rolling_risk_table, horizon_returns, ROLLING_LABELS, HORIZON_LEVELS)
+from event_study import event_study
+from event_calendar import load_event_calendar
+from alignment import normalize_index
+from downsample import thin
+from render_service import FigureSpec, get_render_service
 warnings.filterwarnings('ignore')
 
-def download_nifty_data(index_name, years=5):
+
+@lru_cache(maxsize=None)
+def http_session():
+    """requests.Session with a browser User-Agent, created on first use"""
+    import requests
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    })
+    return session
+
+
+def __getattr__(name):
+    # nse_analysis.session used to be built at import time
+    if name == 'session':
+        return http_session()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _index_symbol(index_name):
+    """Preferred Yahoo Finance symbol of an NSE index (see data_providers.INDEX_SYMBOLS)"""
+    symbols = INDEX_SYMBOLS.get(index_name)
+    return symbols[0] if symbols else None
+
+def download_nifty_data(index_name, years=5, cache=None):
     """
     Download historical data for NSE indices
     Note: NSE doesn't provide direct API access, so we'll use yfinance as an alternative
     or provide instructions for manual download
+
+    Downloads go through a local PriceCache (see price_cache.py), so repeated runs
+    only fetch the trailing days that are missing. Pass a cache built on another
+    provider (e.g. ReplayProvider) or set MONETARY_DATA_PROVIDER to run offline.
     """
     try:
-        # Map NSE indices to Yahoo Finance symbols
-        symbol_map = {
-            'NIFTY 50': '^NSEI',            
-            'NIFTY BANK': '^NSEBANK',
-            'NIFTY 100': '^CNX100',
-            'NIFTY 500': '^NSE500'
-        }
-        
-        symbol = symbol_map.get(index_name)
+        symbol = _index_symbol(index_name)
         if not symbol:
             print(f"Symbol mapping not found for {index_name}")
             return None
@@ -42,43 +66,18 @@ def download_nifty_data(index_name, years=5):
         
         print(f"  Attempting to download {index_name} ({symbol}) from {start_date.date()} to {end_date.date()}...")
         
-        # Download data - try multiple methods
-        ticker = yf.Ticker(symbol)
-        
-        # Method 1: Try with date range
-        try:
-            data = ticker.history(start=start_date, end=end_date)
-        except Exception as e:
-            print(f"  Warning: Date range method failed: {e}")
-            data = pd.DataFrame()
-        
-        # Method 2: If empty, try with period parameter
-        if data.empty:
-            print(f"  Trying alternative download method (period={years}y)...")
-            try:
-                data = ticker.history(period=f"{years}y")
-            except Exception as e:
-                print(f"  Warning: Period method failed: {e}")
-                data = pd.DataFrame()
-        
-        # Method 3: If still empty, try max period
-        if data.empty:
-            print(f"  Trying max available period...")
-            try:
-                data = ticker.history(period="max")
-                # Filter to last 5 years
-                if not data.empty:
-                    data = data[data.index >= start_date]
-            except Exception as e:
-                print(f"  Warning: Max period method failed: {e}")
-                data = pd.DataFrame()
+        # Cached history plus only the missing trailing days (yfinance fallbacks live in the provider)
+        if cache is None:
+            cache = PriceCache()
+        data = cache.get(symbol, start=start_date, end=end_date)
             
-        if data.empty:
+        if data is None or data.empty:
             print(f"  Error: All download methods failed for {index_name} ({symbol})")
             return None
         
         print(f"  ✓ Successfully downloaded {len(data)} days of data for {index_name}")
-        return data
+        # Naive, sorted trading days from here on (no timezone handling downstream)
+        return normalize_index(data)
         
     except Exception as e:
         print(f"  ✗ Error downloading {index_name}: {str(e)}")
@@ -86,113 +85,106 @@ def download_nifty_data(index_name, years=5):
         import traceback
         traceback.print_exc()
         return None
-    
 
-def calculate_returns(data):
-    """Calculate daily returns"""
-    return data['Close'].pct_change().dropna()
+def load_nifty_bars(index_name, years=5, level=None, min_points=None, cache=None):
+    """
+    OHLC bars of an index already downloaded with download_nifty_data, from the
+    PriceCache pyramid (see ohlc_pyramid.py): the given level ('daily', 'weekly',
+    'monthly', 'quarterly') or the coarsest one with at least min_points bars
+    """
+    symbol = _index_symbol(index_name)
+    if not symbol:
+        return None
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=years*365)
+    bars = (cache or PriceCache()).bars(symbol, start_date, end_date, level=level, min_points=min_points)
+    if bars is None or bars.empty:
+        return None
+    return normalize_index(bars)
+    
+
+def draw_rolling_risk(risk):
+    """One panel per risk metric; colour per index, line style per window"""
+    import matplotlib.pyplot as plt
+    metrics = list(dict.fromkeys(risk.columns.get_level_values('metric')))
+    indices = list(dict.fromkeys(risk.columns.get_level_values('index')))
+    windows = list(dict.fromkeys(risk.columns.get_level_values('window')))
+    colors = ['#1E88E5', '#E53935', '#43A047', '#FB8C00', '#8E24AA']
+    styles = [':', '--', '-', '-.']
+    
+    fig, axes = plt.subplots(len(metrics), 1, figsize=(16, 4 * len(metrics)), sharex=True)
+    axes = np.atleast_1d(axes)
+    for ax, metric in zip(axes, metrics):
+        for i, index_name in enumerate(indices):
+            for j, window in enumerate(windows):
+                series = thin(ax, risk[(index_name, metric, window)], dpi=200)
+                ax.plot(series.index, series, color=colors[i % len(colors)], linestyle=styles[j % len(styles)],
+                        linewidth=1.2, alpha=0.85, label=f"{index_name} ({window}d)")
+        ax.set_title(f"Rolling {ROLLING_LABELS[metric]}", fontsize=13, fontweight='bold')
+        ax.set_ylabel(ROLLING_LABELS[metric], fontsize=11)
+        ax.grid(True, alpha=0.3)
+        if metric == 'sharpe':
+            ax.axhline(y=0, color='black', linestyle='--', linewidth=0.8)
+        ax.legend(fontsize=9, ncol=len(indices), loc='upper left')
+    axes[-1].set_xlabel('Date', fontsize=12)
+    
+    plt.tight_layout()
+    return fig
 
-def calculate_volatility(returns):
-    """Calculate annualized volatility"""
-    return returns.std() * np.sqrt(252) * 100  # Annualized percentage
+def plot_rolling_risk(risk, save_path='nifty_rolling_risk.png'):
+    """Render draw_rolling_risk in the background (see render_service.py); returns a Future"""
+    return get_render_service().submit(FigureSpec(
+        draw_rolling_risk, save_path, data={'risk': risk},
+        savefig={'dpi': 200, 'bbox_inches': 'tight'},
+        message=f"✓ Rolling risk plots saved as '{save_path}'"))
 
 def get_us_election_dates():
-    """Get US election dates in the last 5 years"""
-    elections = [
-        {'date': datetime(2020, 11, 3), 'name': '2020 US Presidential Election', 'winner': 'Joe Biden'},
-        {'date': datetime(2016, 11, 8), 'name': '2016 US Presidential Election', 'winner': 'Donald Trump'},
-    ]
-    return elections
+    """Get US election dates from the event catalog (events.csv), latest first"""
+    elections = load_event_calendar().select(category='us_election').records()
+    return [{'date': e['date'], 'name': e['name'], 'winner': e['winner']} for e in reversed(elections)]
+
+def get_trump_elections():
+    """Trump elections to highlight on the NIFTY plots, from the event catalog
+    Events with an explicit start/end in the catalog get the extended shading"""
+    trump_elections = []
+    for event in load_event_calendar().select(category='us_election', winner='Donald Trump').records():
+        election = {
+            'date': event['date'],
+            'name': event['label'],
+            'color': event['color'],
+            'window_days': int(event['window_days'])
+        }
+        if event['start'] is not None:
+            election['extended_start'] = event['start']
+            election['extended_end'] = event['end']
+        trump_elections.append(election)
+    return trump_elections
 
 def analyze_us_election_impact(data, index_name, days_before=30, days_after=30):
-    """Analyze market behavior around US election dates"""
+    """Analyze market behavior around US election dates (see event_study.py)"""
     elections = get_us_election_dates()
+    study = event_study(price_panel({index_name: data}), elections, windows=[(days_before, days_after)])
     analysis_results = []
     
-    # Get timezone-naive min/max for comparison
-    index_min = data.index.min()
-    index_max = data.index.max()
-    if index_min.tz is not None:
-        index_min = index_min.tz_localize(None)
-    if index_max.tz is not None:
-        index_max = index_max.tz_localize(None)
-    
-    for election in elections:
-        election_date = election['date']
-        
-        # Check if election date is within data range (using timezone-naive comparison)
-        if election_date < index_min or election_date > index_max:
-            continue
-        
-        # Find closest trading day to election date
-        try:
-            closest_date = data.index[data.index.get_indexer([election_date], method='nearest')[0]]
-        except:
-            # If timezone mismatch, try with timezone-naive index
-            naive_index = pd.DatetimeIndex(data.index.values)
-            closest_idx = naive_index.get_indexer([election_date], method='nearest')[0]
-            closest_date = data.index[closest_idx]
-        
-        # Get data window around election
-        start_idx = data.index.get_indexer([closest_date - timedelta(days=days_before)], method='nearest')[0]
-        end_idx = data.index.get_indexer([closest_date + timedelta(days=days_after)], method='nearest')[0]
-        
-        if start_idx < 0 or end_idx >= len(data):
-            continue
-        
-        window_data = data.iloc[start_idx:end_idx+1]
-        election_idx = window_data.index.get_indexer([closest_date], method='nearest')[0]
-        
-        if election_idx < 0 or election_idx >= len(window_data):
-            continue
-        
-        # Calculate metrics
-        pre_election_price = window_data['Close'].iloc[:election_idx+1].iloc[0]
-        election_day_price = window_data['Close'].iloc[election_idx]
-        post_election_price = window_data['Close'].iloc[election_idx:].iloc[-1]
-        
-        pre_election_return = ((election_day_price / pre_election_price) - 1) * 100
-        post_election_return = ((post_election_price / election_day_price) - 1) * 100
-        total_return = ((post_election_price / pre_election_price) - 1) * 100
-        
-        # Calculate volatility
-        pre_volatility = window_data['Close'].iloc[:election_idx+1].pct_change().std() * np.sqrt(252) * 100
-        post_volatility = window_data['Close'].iloc[election_idx:].pct_change().std() * np.sqrt(252) * 100
-        
+    for _, row in study.iterrows():
         analysis_results.append({
-            'Election': election['name'],
-            'Election Date': closest_date.strftime('%Y-%m-%d'),
-            'Winner': election['winner'],
-            'Pre-Election Return (%)': f"{pre_election_return:.2f}",
-            'Post-Election Return (%)': f"{post_election_return:.2f}",
-            'Total Return (%)': f"{total_return:.2f}",
-            'Pre-Election Volatility (%)': f"{pre_volatility:.2f}",
-            'Post-Election Volatility (%)': f"{post_volatility:.2f}",
-            'Election Day Price': f"{election_day_price:.2f}"
+            'Election': row['name'],
+            'Election Date': row['event_day'].strftime('%Y-%m-%d'),
+            'Winner': row['winner'],
+            'Pre-Election Return (%)': f"{row['pre_return'] * 100:.2f}",
+            'Post-Election Return (%)': f"{row['post_return'] * 100:.2f}",
+            'Total Return (%)': f"{row['total_return'] * 100:.2f}",
+            'Pre-Election Volatility (%)': f"{row['pre_volatility'] * 100:.2f}",
+            'Post-Election Volatility (%)': f"{row['post_volatility'] * 100:.2f}",
+            'Election Day Price': f"{row['event_price']:.2f}"
         })
     
     return analysis_results
 
-def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xlsx'):
-    """Plot NIFTY indices with Trump elections highlighted - Extended 2024 view"""
-    
-    # Trump election dates with extended marking periods
-    trump_elections = [
-        {
-            'date': pd.Timestamp('2016-11-08'), 
-            'name': 'Trump 2016', 
-            'color': '#FF6B6B',
-            'window_days': 15  # Standard window for 2016
-        },
-        {
-            'date': pd.Timestamp('2024-11-05'), 
-            'name': 'Trump 2024', 
-            'color': '#FF0000',
-            'window_days': 60,  # Extended: Oct-Dec window
-            'extended_start': pd.Timestamp('2024-10-01'),
-            'extended_end': pd.Timestamp('2024-12-31')
-        }
-    ]
+def draw_nifty_plots(nifty50_data, nifty_bank_data, trump_elections):
+    """NIFTY 50 and NIFTY BANK closes with Trump elections highlighted - Extended 2024 view"""
+    import matplotlib.pyplot as plt
+    election_dates = [election['date'] for election in trump_elections]
     
     # Create figure
     fig, axes = plt.subplots(2, 1, figsize=(20, 12))
@@ -201,25 +193,18 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
     # ============ NIFTY 50 Plot ============
     ax1 = axes[0]
     
-    # Main line plot
-    ax1.plot(nifty50_data.index, nifty50_data['Close'], 
+    # Main line plot (downsampled to the axis' pixel width, election days kept)
+    close = thin(ax1, nifty50_data['Close'], keep=election_dates)
+    ax1.plot(close.index, close, 
              linewidth=2.8, color='#1E88E5', label='NIFTY 50', alpha=0.95)
-    ax1.fill_between(nifty50_data.index, nifty50_data['Close'], 
+    ax1.fill_between(close.index, close, 
                      alpha=0.12, color='#1E88E5')
     
     # Mark Trump elections
     for election in trump_elections:
         election_date = election['date']
         
-        # Handle timezone
-        index_min = nifty50_data.index.min()
-        index_max = nifty50_data.index.max()
-        if index_min.tz is not None:
-            index_min = index_min.tz_localize(None)
-            index_max = index_max.tz_localize(None)
-            election_date = election_date.tz_localize(None)
-        
-        if index_min <= election_date <= index_max:
+        if nifty50_data.index.min() <= election_date <= nifty50_data.index.max():
             try:
                 idx = nifty50_data.index.get_indexer([election_date], method='nearest')[0]
                 closest_date = nifty50_data.index[idx]
@@ -229,9 +214,6 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
                 if 'extended_start' in election:
                     start_shade = election['extended_start']
                     end_shade = election['extended_end']
-                    if start_shade.tz is None and closest_date.tz is not None:
-                        start_shade = start_shade.tz_localize(closest_date.tz)
-                        end_shade = end_shade.tz_localize(closest_date.tz)
                     
                     # Light background shading for entire Oct-Dec period
                     ax1.axvspan(start_shade, end_shade, alpha=0.15, 
@@ -316,24 +298,18 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
     # ============ NIFTY BANK Plot ============
     ax2 = axes[1]
     
-    # Main line plot
-    ax2.plot(nifty_bank_data.index, nifty_bank_data['Close'], 
+    # Main line plot (downsampled to the axis' pixel width, election days kept)
+    close = thin(ax2, nifty_bank_data['Close'], keep=election_dates)
+    ax2.plot(close.index, close, 
              linewidth=2.8, color='#D32F2F', label='NIFTY BANK', alpha=0.95)
-    ax2.fill_between(nifty_bank_data.index, nifty_bank_data['Close'], 
+    ax2.fill_between(close.index, close, 
                      alpha=0.12, color='#D32F2F')
     
     # Mark Trump elections (same logic)
     for election in trump_elections:
         election_date = election['date']
         
-        index_min = nifty_bank_data.index.min()
-        index_max = nifty_bank_data.index.max()
-        if index_min.tz is not None:
-            index_min = index_min.tz_localize(None)
-            index_max = index_max.tz_localize(None)
-            election_date = election_date.tz_localize(None)
-        
-        if index_min <= election_date <= index_max:
+        if nifty_bank_data.index.min() <= election_date <= nifty_bank_data.index.max():
             try:
                 idx = nifty_bank_data.index.get_indexer([election_date], method='nearest')[0]
                 closest_date = nifty_bank_data.index[idx]
@@ -343,9 +319,6 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
                 if 'extended_start' in election:
                     start_shade = election['extended_start']
                     end_shade = election['extended_end']
-                    if start_shade.tz is None and closest_date.tz is not None:
-                        start_shade = start_shade.tz_localize(closest_date.tz)
-                        end_shade = end_shade.tz_localize(closest_date.tz)
                     
                     ax2.axvspan(start_shade, end_shade, alpha=0.15, 
                                color=election['color'], zorder=1,
@@ -418,21 +391,30 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
         spine.set_linewidth(1.5)
     
     plt.tight_layout()
-    plt.savefig('nifty_plots.png', dpi=300, bbox_inches='tight', facecolor='#fafafa')
-    print("✓ Enhanced Trump election plots saved as 'nifty_plots.png'")
+    return fig
+
+def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xlsx', rolling=None,
+                    horizons=None):
+    """Plot NIFTY indices with Trump elections highlighted - Extended 2024 view
+    rolling: optional calculate_rolling_risk output, exported as a 'Rolling Risk' sheet
+    horizons: optional horizon_returns output, exported as a 'Horizon Returns' sheet
+    The chart is rendered in the background (see render_service.py) while the workbook is written;
+    returns a Future of the written file"""
+    
+    # Trump election dates with extended marking periods (see events.csv)
+    future = get_render_service().submit(FigureSpec(
+        draw_nifty_plots, 'nifty_plots.png',
+        data={'nifty50_data': nifty50_data[['Close']],
+              'nifty_bank_data': nifty_bank_data[['Close']]},
+        style={'trump_elections': get_trump_elections()},
+        savefig={'dpi': 300, 'bbox_inches': 'tight', 'facecolor': '#fafafa'},
+        message="✓ Enhanced Trump election plots saved as 'nifty_plots.png'"))
     
     # ============ Save to Excel ============
-    nifty50_export = nifty50_data[['Close']].copy()
-    nifty_bank_export = nifty_bank_data[['Close']].copy()
-    
-    if nifty50_export.index.tz is not None:
-        nifty50_export.index = pd.DatetimeIndex(nifty50_export.index.values)
-    if nifty_bank_export.index.tz is not None:
-        nifty_bank_export.index = pd.DatetimeIndex(nifty_bank_export.index.values)
-    
-    with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-        nifty50_export.to_excel(writer, sheet_name='NIFTY 50', index=True)
-        nifty_bank_export.to_excel(writer, sheet_name='NIFTY BANK', index=True)
+    # Timezones are dropped on export (Excel doesn't support them)
+    with WorkbookExport(save_path) as writer:
+        writer.add(nifty50_data[['Close']], 'NIFTY 50', index=True)
+        writer.add(nifty_bank_data[['Close']], 'NIFTY BANK', index=True)
         
         # Summary
         summary_data = {
@@ -452,19 +434,24 @@ def plot_nifty_data(nifty50_data, nifty_bank_data, save_path='nifty_analysis.xls
                 calculate_volatility(calculate_returns(nifty_bank_data))
             ]
         }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        writer.add(pd.DataFrame(summary_data), 'Summary', index=False)
+        
+        # Rolling volatility / Sharpe / downside deviation
+        if rolling is not None:
+            writer.add(rolling_risk_table(rolling), 'Rolling Risk', index=True)
+        
+        if horizons is not None and not horizons.empty:
+            writer.add(horizons.round(2), 'Horizon Returns', index=False)
         
         # Election impact
         nifty50_election = analyze_us_election_impact(nifty50_data, 'NIFTY 50')
         nifty_bank_election = analyze_us_election_impact(nifty_bank_data, 'NIFTY BANK')
         
         if nifty50_election:
-            pd.DataFrame(nifty50_election).to_excel(
-                writer, sheet_name='Trump Impact - NIFTY 50', index=False)
+            writer.add(pd.DataFrame(nifty50_election), 'Trump Impact - NIFTY 50', index=False)
         
         if nifty_bank_election:
-            pd.DataFrame(nifty_bank_election).to_excel(
-                writer, sheet_name='Trump Impact - NIFTY BANK', index=False)
+            writer.add(pd.DataFrame(nifty_bank_election), 'Trump Impact - NIFTY BANK', index=False)
         
         # Detailed Oct-Dec 2024 analysis
         oct_dec_analysis = """
@@ -595,11 +582,11 @@ resilience. Strategic investors who maintained discipline through
 the volatility were positioned to benefit from post-clarity moves.
         """
         
-        pd.DataFrame({'Oct-Dec 2024 Analysis': [oct_dec_analysis]}).to_excel(
-            writer, sheet_name='Oct-Dec 2024 Deep Dive', index=False)
+        writer.add(pd.DataFrame({'Oct-Dec 2024 Analysis': [oct_dec_analysis]}),
+                   'Oct-Dec 2024 Deep Dive', index=False)
     
     print(f"✓ Comprehensive analysis saved to '{save_path}'")
-    return fig
+    return future
 
 def main():
     print("=" * 60)
@@ -650,8 +637,24 @@ def main():
     else:
         print(f"\nNIFTY 50 is more volatile ({nifty50_vol:.2f}% vs {nifty_bank_vol:.2f}%)")
     
+    # Rolling risk for both indices at once
+    rolling = calculate_rolling_risk({'NIFTY 50': nifty50_data, 'NIFTY BANK': nifty_bank_data})
+    latest = rolling.ffill().iloc[-1].unstack('window')
+    print("\nLatest rolling risk (windows in trading days):")
+    print(latest.rename(index=ROLLING_LABELS, level='metric').round(2).to_string())
+    plot_rolling_risk(rolling)
+    
+    # The long-horizon statistics read the weekly/monthly/quarterly pyramid levels
+    index_names = ('NIFTY 50', 'NIFTY BANK')
+    horizons = horizon_returns({name: {level: load_nifty_bars(name, years=5, level=level)
+                                       for level in HORIZON_LEVELS}
+                                for name in index_names})
+    if not horizons.empty:
+        print("\nReturns by horizon (from weekly/monthly/quarterly bars):")
+        print(horizons.set_index(['Index', 'Horizon']).round(2).to_string())
+    
     # Create plots and save to Excel
-    plot_nifty_data(nifty50_data, nifty_bank_data)
+    plot_nifty_data(nifty50_data, nifty_bank_data, rolling=rolling, horizons=horizons)
     
     # US Election Analysis
     print("\n" + "=" * 60)
@@ -689,6 +692,9 @@ def main():
     print("- NIFTY BANK tends to react more strongly to policy uncertainties")
     print("- Check the Excel file for detailed US election impact analysis")
     print("- US election dates are marked on the plots with green dashed lines")
+    
+    # Charts still rendering in the background
+    get_render_service().wait()
 
 if __name__ == "__main__":
     main()
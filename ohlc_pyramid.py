@@ -0,0 +1,116 @@
+"""
+Multi-resolution OHLC pyramid next to the daily price cache
+
+Besides each symbol's daily history, PriceCache keeps weekly, monthly and
+quarterly OHLC bars in the same directory (<symbol>.weekly.parquet, ...). The
+levels are updated incrementally: when a refresh changes the daily bars from
+some date on, only the buckets from that date's week/month/quarter onwards are
+recomputed. Long-horizon statistics read a few hundred weekly, monthly or
+quarterly bars instead of resampling the whole daily history; level_for picks
+the coarsest level that still gives a caller enough points.
+
+A bar is dated by its last trading day, so its Close is the daily Close of that
+day; Open/High/Low/Close/Volume aggregate as first/max/min/last/sum and Days
+counts the daily bars in the bucket. Complete is False for the week, month or
+quarter still in progress (its period has not ended by the date the history
+was fetched through), whose Close is not yet a period close.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from cache_utils import safe_name, read_frame, write_frame, FRAME_SUFFIX
+from alignment import normalize_index
+
+PYRAMID_LEVELS = ('daily', 'weekly', 'monthly', 'quarterly')
+LEVEL_PERIODS = {'weekly': 'W-FRI', 'monthly': 'M', 'quarterly': 'Q'}
+BARS_PER_YEAR = {'daily': 252, 'weekly': 52, 'monthly': 12, 'quarterly': 4}
+OHLC_AGGREGATES = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def ohlc_bars(daily, level, through=None):
+    """
+    Daily OHLC(V) history aggregated to 'weekly', 'monthly' or 'quarterly' bars
+
+    through: date the daily history was fetched through (exclusive); buckets whose
+             period ends on or after it are marked Complete=False (default: the
+             day after the last daily bar)
+    """
+    daily = normalize_index(daily)
+    if level == 'daily':
+        return daily
+    if daily.empty:
+        return daily.iloc[:0].assign(Days=np.array([], dtype='int64'), Complete=np.array([], dtype=bool))
+    periods = daily.index.to_period(LEVEL_PERIODS[level])
+    codes = periods.asi8
+    # The index is sorted, so every bucket is one run of equal codes
+    last = np.flatnonzero(np.append(codes[1:] != codes[:-1], True))
+    aggregates = {column: how for column, how in OHLC_AGGREGATES.items() if column in daily.columns}
+    groups = daily.groupby(codes, sort=False)
+    bars = groups.agg(aggregates)
+    bars.index = daily.index[last]
+    bars['Days'] = np.diff(np.append(-1, last))
+    through = _naive_day(through) if through is not None else daily.index[-1].normalize() + pd.Timedelta(days=1)
+    bars['Complete'] = periods[last].end_time < through
+    return bars
+
+
+def _naive_day(ts):
+    ts = pd.Timestamp(ts)
+    return (ts.tz_localize(None) if ts.tz is not None else ts).normalize()
+
+
+def level_for(start, end, min_points):
+    """Coarsest pyramid level with at least min_points bars between start and end ('daily' if none has)"""
+    years = (pd.Timestamp(end) - pd.Timestamp(start)).days / 365.25
+    for level in reversed(PYRAMID_LEVELS):
+        if years * BARS_PER_YEAR[level] >= min_points:
+            return level
+    return 'daily'
+
+
+class OHLCPyramid:
+    """
+    Weekly, monthly and quarterly bars of the symbols in a price cache
+
+    directory: where the level files live, normally the PriceCache directory of
+               the provider they come from (PriceCache.pyramid)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, symbol, level):
+        return os.path.join(self.directory, f"{safe_name(symbol)}.{level}{FRAME_SUFFIX}")
+
+    def update(self, symbol, daily, changed_from=None, through=None):
+        """
+        Bring every level in line with the full daily history of symbol
+
+        changed_from: first date whose daily bar was added or replaced; buckets
+                      before its week/month/quarter are kept as stored
+                      (None rebuilds every level)
+        through: date the daily history was fetched through (see ohlc_bars)
+        """
+        daily = normalize_index(daily)
+        if changed_from is not None:
+            changed_from = _naive_day(changed_from)
+        for level, period in LEVEL_PERIODS.items():
+            stored = read_frame(self._path(symbol, level)) if changed_from is not None else None
+            if stored is None or stored.empty or 'Complete' not in stored.columns:
+                bars = ohlc_bars(daily, level, through)
+            else:
+                # Recompute from the changed bucket, or from an earlier one still in progress
+                start = changed_from
+                if not stored['Complete'].all():
+                    start = min(start, stored.index[~stored['Complete'].to_numpy()][0])
+                cut = pd.Period(start, period).start_time
+                bars = pd.concat([stored[stored.index < cut],
+                                  ohlc_bars(daily[daily.index >= cut], level, through)])
+            write_frame(bars, self._path(symbol, level))
+
+    def read(self, symbol, level):
+        """Stored bars of symbol at a coarse level, or None if they were never built"""
+        return read_frame(self._path(symbol, level))
@@ -0,0 +1,150 @@
+"""
+Persistent incremental price cache for NSE index downloads
+Each symbol's history is kept in a local columnar file; a run only asks the
+provider for the days that are not already cached. Weekly, monthly and
+quarterly bars are kept up to date alongside (see ohlc_pyramid.py) and served by
+bars()
+"""
+
+import os
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+
+from cache_utils import cache_dir, safe_name, read_frame, write_frame, FRAME_SUFFIX
+from data_providers import get_provider, filter_date_range, provider_namespace, _naive
+from ohlc_pyramid import OHLCPyramid, ohlc_bars, level_for
+
+
+class PriceCache:
+    """
+    Local OHLC cache in front of a data provider
+
+    provider: object with history(symbol, start, end), see data_providers.py
+              (default: get_provider(), i.e. MONETARY_DATA_PROVIDER or live Yahoo Finance)
+    directory: where the per-symbol files live (default .cache/prices/<provider namespace>)
+    refresh_overlap_days: trailing days re-requested on every refresh, so a bar
+                          that was still forming during the last run gets replaced
+    pyramid: keep the weekly/monthly/quarterly levels next to the daily files
+             (True, the default), an OHLCPyramid elsewhere, or False
+    """
+
+    def __init__(self, provider=None, directory=None, refresh_overlap_days=1, pyramid=True):
+        self.provider = provider if provider is not None else get_provider()
+        self.directory = directory or cache_dir('prices', provider_namespace(self.provider))
+        os.makedirs(self.directory, exist_ok=True)
+        self.refresh_overlap_days = refresh_overlap_days
+        self.pyramid = OHLCPyramid(self.directory) if pyramid is True else pyramid or None
+
+    def _data_path(self, symbol):
+        return os.path.join(self.directory, safe_name(symbol) + FRAME_SUFFIX)
+
+    def _meta_path(self, symbol):
+        return os.path.join(self.directory, safe_name(symbol) + '.json')
+
+    def load(self, symbol):
+        """Return (cached history, metadata) for a symbol"""
+        data = read_frame(self._data_path(symbol))
+        meta = {}
+        if os.path.exists(self._meta_path(symbol)):
+            with open(self._meta_path(symbol)) as f:
+                meta = json.load(f)
+        return data, meta
+
+    def _save(self, symbol, data, meta):
+        write_frame(data, self._data_path(symbol))
+        with open(self._meta_path(symbol), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def _update_pyramid(self, symbol, data, changed_from=None, through=None):
+        if self.pyramid is not None:
+            self.pyramid.update(symbol, data, changed_from, through)
+
+    def get(self, symbol, start, end=None):
+        """Return history for start <= date < end, fetching only what is missing"""
+        end = end or datetime.now()
+        start, end = _naive(start), _naive(end)
+        cached, meta = self.load(symbol)
+
+        if cached is None or cached.empty or 'covered_from' not in meta:
+            # Nothing usable on disk: one full download
+            data = self.provider.history(symbol, start=start, end=end)
+            if data is None or data.empty:
+                return None
+            self._save(symbol, data.sort_index(), {
+                'covered_from': start.isoformat(),
+                'fetched_through': end.isoformat(),
+            })
+            self._update_pyramid(symbol, data.sort_index(), through=end)
+            return filter_date_range(data.sort_index(), start, end)
+
+        covered_from = pd.Timestamp(meta['covered_from'])
+        fetched_through = pd.Timestamp(meta['fetched_through'])
+        pieces = [cached]
+
+        # Head gap: caller wants an older start than anything requested before
+        changed_from = None
+        if start < covered_from:
+            head = self.provider.history(symbol, start=start, end=covered_from)
+            # A failed or empty head fetch leaves the range uncovered, so the next run asks again
+            if head is not None and not head.empty:
+                pieces.insert(0, head)
+                covered_from = start
+
+        # Tail gap: only the trailing days since the last refresh; a later run on the
+        # same day asks again while today's bar may still be forming
+        today = pd.Timestamp(datetime.now()).normalize()
+        if end.normalize() > fetched_through.normalize() or (end > fetched_through and end.normalize() == today):
+            last_cached = _naive(cached.index.max())
+            tail_start = min(last_cached, fetched_through) - timedelta(days=self.refresh_overlap_days)
+            tail = self.provider.history(symbol, start=tail_start, end=end)
+            if tail is not None and not tail.empty:
+                pieces.append(tail)
+                # Only the pyramid buckets from the tail on change, unless a head was added too
+                changed_from = tail.index.min() if pieces[0] is cached else None
+            fetched_through = end
+
+        if len(pieces) > 1:
+            data = pd.concat(pieces)
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+        else:
+            data = cached
+
+        new_meta = {
+            'covered_from': covered_from.isoformat(),
+            'fetched_through': fetched_through.isoformat(),
+        }
+        if len(pieces) > 1 or new_meta != meta:
+            self._save(symbol, data, new_meta)
+        if len(pieces) > 1:
+            self._update_pyramid(symbol, data, changed_from, fetched_through)
+        elif new_meta['fetched_through'] != meta['fetched_through']:
+            # No new bars, but a week/month/quarter may have ended since the last refresh
+            self._update_pyramid(symbol, data, data.index.max(), fetched_through)
+
+        return filter_date_range(data, start, end)
+
+    def bars(self, symbol, start, end=None, level=None, min_points=None):
+        """
+        Cached OHLC bars of symbol whose last day falls in start <= date < end
+
+        level: 'daily', 'weekly', 'monthly' or 'quarterly'; by default the
+               coarsest level with at least min_points bars over the period
+               (daily without min_points). Coarse levels are read from the
+               pyramid, which is built from the daily history if missing.
+        Returns None if nothing is cached for symbol (call get() first).
+        """
+        end = end or datetime.now()
+        start, end = _naive(start), _naive(end)
+        if level is None:
+            level = level_for(start, end, min_points) if min_points else 'daily'
+        data = self.pyramid.read(symbol, level) if level != 'daily' and self.pyramid is not None else None
+        if data is None or 'Complete' not in data.columns:
+            daily, meta = self.load(symbol)
+            if daily is None or daily.empty:
+                return None
+            through = meta.get('fetched_through')
+            if level != 'daily' and self.pyramid is not None:
+                self.pyramid.update(symbol, daily, through=through)
+            data = ohlc_bars(daily, level, through)
+        return filter_date_range(data, start, end)
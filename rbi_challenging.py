@@ -6,28 +6,25 @@ Note: 10-year G-sec yield data needs to be added separately
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import warnings
+from rbi_io import load_snapshot, read_wss_csv
+from excel_export import WorkbookExport
+from alignment import normalize_index
+from analytics import (extract_money_stock, align_money_with_yields, normalize_series,
+                       create_summary_statistics)
+from downsample import thin
+from render_service import FigureSpec, get_render_service
 warnings.filterwarnings('ignore')
 
 def load_rbi_table6(filepath):
-    """Load RBI Table 6 - Money Stock"""
+    """
+    Load RBI Table 6 - Money Stock
+    Shares the parser and the parsed snapshot with rbi_money_stock.py, so the CSV
+    is only parsed again when it changes
+    """
     try:
-        # Read CSV with proper encoding
-        data = pd.read_csv(filepath, skiprows=0, encoding='latin-1')
-        
-        # Parse dates
-        data['Date'] = pd.to_datetime(data['Date'], format='%d-%b-%y', errors='coerce')
-        data = data.set_index('Date')
-        
-        # Clean numeric columns - remove commas
-        for col in data.columns:
-            if col != 'Date':
-                data[col] = data[col].astype(str).str.replace(',', '').replace('-', np.nan)
-                data[col] = pd.to_numeric(data[col], errors='coerce')
-        
-        return data
+        return load_snapshot(filepath, read_wss_csv)
     except Exception as e:
         print(f"Error loading Table 6: {e}")
         return None
@@ -46,44 +43,14 @@ def load_yield_data(filepath=None):
     
     try:
         yield_data = pd.read_csv(filepath, index_col=0, parse_dates=True)
-        return yield_data
+        return normalize_index(yield_data)
     except Exception as e:
         print(f"Error loading yield data: {e}")
         return None
 
-def extract_money_stock(table6_data):
-    """Extract M3 from Table 6"""
-    components = {}
-    
-    # Look for M3 column
-    if 'M3' in table6_data.columns:
-        components['M3'] = table6_data['M3']
-        print(f"✓ Found M3 with {len(table6_data['M3'].dropna())} data points")
-    
-    # Look for M3 (Excluding Merger) as backup
-    if 'M3 (Excluding Merger)' in table6_data.columns:
-        components['M3_excl_merger'] = table6_data['M3 (Excluding Merger)']
-    
-    return components
-
-def normalize_series(series):
-    """Normalize a series to start at 100 for comparison"""
-    if series is None or len(series) == 0:
-        return None
-    
-    # Remove NaN values and get first valid value
-    series_clean = series.dropna()
-    if len(series_clean) == 0:
-        return None
-    
-    first_value = series_clean.iloc[0]
-    if first_value == 0 or pd.isna(first_value):
-        return None
-    
-    return (series / first_value) * 100
-
-def plot_money_stock(money_components, yields=None):
-    """Plot money stock components with optional treasury yields"""
+def draw_money_stock(money_components, yields=None):
+    """Money stock components with optional treasury yields"""
+    import matplotlib.pyplot as plt
     
     if yields is not None and '10_year_gsec' in yields:
         # Create figure with 2 subplots if yields available
@@ -96,12 +63,14 @@ def plot_money_stock(money_components, yields=None):
             m3_normalized = normalize_series(money_components['M3'])
             if m3_normalized is not None:
                 ax1_twin = ax1.twinx()
+                m3_normalized = thin(ax1, m3_normalized)
                 ax1.plot(m3_normalized.index, m3_normalized.values,
                         label='M3 (Broad Money)', linewidth=2.5, color='red')
                 ax1.set_ylabel('M3 Index (Base = 100)', fontsize=12, color='red', fontweight='bold')
                 ax1.tick_params(axis='y', labelcolor='red')
                 
-                ax1_twin.plot(yields['10_year_gsec'].index, yields['10_year_gsec'].values,
+                yield_line = thin(ax1_twin, yields['10_year_gsec'])
+                ax1_twin.plot(yield_line.index, yield_line.values,
                              label='10-Year G-Sec Yield', linewidth=2.5, 
                              color='darkgreen', linestyle='--')
                 ax1_twin.set_ylabel('10-Year G-Sec Yield (%)', fontsize=12, 
@@ -120,9 +89,10 @@ def plot_money_stock(money_components, yields=None):
         
         # Plot 2: 10-Year G-Sec Yield separately
         ax2 = axes[1]
-        ax2.plot(yields['10_year_gsec'].index, yields['10_year_gsec'].values,
+        yield_line = thin(ax2, yields['10_year_gsec'])
+        ax2.plot(yield_line.index, yield_line.values,
                 label='10-Year G-Sec Yield', linewidth=2.5, color='darkgreen')
-        ax2.fill_between(yields['10_year_gsec'].index, yields['10_year_gsec'].values, 
+        ax2.fill_between(yield_line.index, yield_line.values, 
                          alpha=0.3, color='darkgreen')
         ax2.set_title('10-Year G-Sec Yield Trend', fontsize=15, fontweight='bold', pad=20)
         ax2.set_xlabel('Date', fontsize=12)
@@ -136,7 +106,7 @@ def plot_money_stock(money_components, yields=None):
         
         if 'M3' in money_components:
             # Plot absolute values
-            m3_data = money_components['M3'].dropna()
+            m3_data = thin(ax, money_components['M3'])
             ax.plot(m3_data.index, m3_data.values / 100000,  # Convert to lakhs
                    label='M3 (Broad Money)', linewidth=2.5, color='red')
             ax.fill_between(m3_data.index, m3_data.values / 100000, alpha=0.2, color='red')
@@ -150,7 +120,7 @@ def plot_money_stock(money_components, yields=None):
             
             # Add secondary axis with normalized values
             ax2 = ax.twinx()
-            m3_normalized = normalize_series(money_components['M3'])
+            m3_normalized = thin(ax2, normalize_series(money_components['M3']))
             ax2.plot(m3_normalized.index, m3_normalized.values,
                     label='M3 Normalized (Base = 100)', linewidth=2, 
                     color='blue', linestyle='--', alpha=0.7)
@@ -163,27 +133,18 @@ def plot_money_stock(money_components, yields=None):
             ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=11)
     
     plt.tight_layout()
-    plt.savefig('money_stock_analysis.png', dpi=300, bbox_inches='tight')
-    print("\n✓ Plot saved as 'money_stock_analysis.png'")
-    
     return fig
 
-def create_summary_statistics(money_components):
-    """Create summary statistics for M3"""
-    stats = {}
-    
-    if 'M3' in money_components:
-        m3 = money_components['M3'].dropna()
-        
-        stats['Latest M3 (₹ Lakh Crore)'] = m3.iloc[0] / 100000
-        stats['Earliest M3 (₹ Lakh Crore)'] = m3.iloc[-1] / 100000
-        stats['Total Growth (₹ Lakh Crore)'] = (m3.iloc[0] - m3.iloc[-1]) / 100000
-        stats['Growth Rate (%)'] = ((m3.iloc[0] / m3.iloc[-1]) - 1) * 100
-        stats['Latest Date'] = m3.index[0].strftime('%Y-%m-%d')
-        stats['Earliest Date'] = m3.index[-1].strftime('%Y-%m-%d')
-        stats['Number of Observations'] = len(m3)
-        
-    return stats
+def plot_money_stock(money_components, yields=None):
+    """Plot money stock components with optional treasury yields
+    Rendered in the background (see render_service.py); returns a Future of the written file"""
+    data = {'money_components': money_components}
+    if yields is not None and '10_year_gsec' in yields:
+        data['yields'] = yields[['10_year_gsec']]
+    return get_render_service().submit(FigureSpec(
+        draw_money_stock, 'money_stock_analysis.png', data=data,
+        savefig={'dpi': 300, 'bbox_inches': 'tight'},
+        message="\n✓ Plot saved as 'money_stock_analysis.png'"))
 
 def main():
     print("=" * 80)
@@ -201,7 +162,7 @@ def main():
         return
     
     print(f"✓ Loaded data with {len(table6_data)} rows")
-    print(f"  Date range: {table6_data.index[-1]} to {table6_data.index[0]}")
+    print(f"  Date range: {table6_data.index.min()} to {table6_data.index.max()}")
     
     print("\nExtracting money stock components...")
     money_components = extract_money_stock(table6_data)
@@ -221,22 +182,34 @@ def main():
     print("\nCalculating summary statistics...")
     stats = create_summary_statistics(money_components)
     
+    # M3 and yields on one (Table 6) calendar
+    money_yields = align_money_with_yields(money_components, yields)
+    if money_yields is not None:
+        both = money_yields.dropna()
+        if len(both) > 2:
+            stats['Correlation: M3 YoY Growth vs 10Y Yield'] = both['M3 YoY Growth (%)'].corr(both['10_year_gsec'])
+            print(f"  M3 YoY growth vs 10-year yield: correlation "
+                  f"{stats['Correlation: M3 YoY Growth vs 10Y Yield']:+.2f} over {len(both)} reporting dates")
+    
     # Save comprehensive analysis
     print("\nSaving analysis to Excel...")
-    with pd.ExcelWriter('rbi_money_stock_analysis.xlsx', 
-                        engine='openpyxl') as writer:
+    with WorkbookExport('rbi_money_stock_analysis.xlsx') as writer:
         # Save M3 data
         if 'M3' in money_components:
             m3_df = pd.DataFrame({
                 'M3 (₹ Crore)': money_components['M3'],
                 'M3 (₹ Lakh Crore)': money_components['M3'] / 100000
             })
-            m3_df.to_excel(writer, sheet_name='M3 Data', index=True)
+            writer.add(m3_df, 'M3 Data', index=True)
+        
+        # M3 with the 10-year yield as of each reporting date
+        if money_yields is not None:
+            writer.add(money_yields, 'M3 vs Yield', index=True)
         
         # Save statistics
         stats_df = pd.DataFrame([stats]).T
         stats_df.columns = ['Value']
-        stats_df.to_excel(writer, sheet_name='Summary Statistics', index=True)
+        writer.add(stats_df, 'Summary Statistics', index=True)
         
         # Analysis notes
         analysis = """
@@ -289,7 +262,7 @@ DATA SOURCES:
 - Look for "Government Securities Market" or "Interest Rates" sections
         """
         analysis_df = pd.DataFrame({'Analysis': [analysis]})
-        analysis_df.to_excel(writer, sheet_name='Analysis Notes', index=False)
+        writer.add(analysis_df, 'Analysis Notes', index=False)
     
     print("\n" + "=" * 80)
     print("ANALYSIS COMPLETE")
@@ -312,6 +285,9 @@ DATA SOURCES:
     print("  - Download yield data from RBI or other sources")
     print("  - The script will automatically create combined visualizations")
     print("=" * 80)
+    
+    # Charts still rendering in the background
+    get_render_service().wait()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
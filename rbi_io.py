@@ -0,0 +1,522 @@
+"""
+Shared input helpers for the RBI Weekly Statistical Supplement (WSS) tables
+Used by rbi_money_stock.py and rbi_challenging.py
+"""
+
+import io
+import os
+import csv
+import json
+import zlib
+import codecs
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from cache_utils import cache_dir, file_digest, safe_name, read_frame, write_frame, FRAME_SUFFIX
+
+# Result of sniffing a CSV export: text encoding and number of header rows
+CsvLayout = namedtuple('CsvLayout', ['encoding', 'header_rows', 'sample_bytes'])
+
+SNIFF_BYTES = 64 * 1024
+# Bump whenever the parsers below change, so stale snapshots are not reused
+SNAPSHOT_VERSION = 1
+_CHUNK_CELLS = 1 << 19
+_MAX_DIGITS = 15  # mantissas up to 15 digits are exact in int64 and float64
+
+# Multi-file archive ingestion
+ARCHIVE_CHUNK_ROWS = 5000
+ARCHIVE_CSV = ('.csv',)
+ARCHIVE_EXCEL = ('.xlsx', '.xlsm')
+
+
+def _is_text(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _parse_chunk(values):
+    """
+    Parse a flat object array of number strings into float64
+
+    The strings are laid out as a fixed-width code-point matrix and scanned one
+    character column at a time across all cells (Horner's rule), skipping
+    grouping commas and blanks and tracking the sign, decimal point and trailing
+    '-' placeholders. The mantissa is accumulated as an exact integer and divided
+    once by a power of ten, which rounds exactly like float(). Cells with any
+    other characters go through pd.to_numeric individually.
+    """
+    text = values.astype(str)  # fixed-width unicode, missing values become 'nan'
+    n, width = len(text), text.dtype.itemsize // 4
+    out = np.full(n, np.nan)
+    if width == 0:
+        return out
+
+    columns = text.view(np.uint32).reshape(n, width).T.copy()  # one contiguous row per character position
+    mantissa = np.zeros(n, dtype=np.int64)
+    n_digits = np.zeros(n, dtype=np.int16)
+    frac_digits = np.zeros(n, dtype=np.int16)
+    leading_minus = np.zeros(n, dtype=np.int16)
+    seen_dot = np.zeros(n, dtype=bool)
+    trailing = np.zeros(n, dtype=bool)  # a '-' after the digits: only blanks or more '-' may follow
+    malformed = np.zeros(n, dtype=bool)
+    foreign = np.zeros(n, dtype=bool)   # characters that are not part of a plain number
+
+    for c in columns:
+        is_digit = (c - 48) < 10  # unsigned wrap-around also rejects codes below '0'
+        is_minus = c == 45
+        is_dot = c == 46
+        started = n_digits > 0
+        foreign |= ~(is_digit | is_minus | is_dot | (c == 44) | (c == 32) | (c == 0))
+        malformed |= (is_digit | is_dot) & trailing
+        malformed |= is_dot & seen_dot
+        trailing |= is_minus & started
+        leading_minus += is_minus & ~started
+        seen_dot |= is_dot
+        mantissa = np.where(is_digit, mantissa * 10 + (c.astype(np.int64) - 48), mantissa)
+        n_digits += is_digit
+        frac_digits += is_digit & seen_dot
+
+    too_long = n_digits > _MAX_DIGITS
+    ok = ~(foreign | malformed | too_long) & (n_digits > 0) & (leading_minus <= 1)
+    value = mantissa / 10.0 ** np.minimum(frac_digits, _MAX_DIGITS)
+    value[leading_minus == 1] *= -1
+    out[ok] = value[ok]
+
+    # Anything unusual ('1e5', very long numbers, stray labels) takes the slow but
+    # general path; blanks, '-' placeholders and missing values are simply NaN
+    odd = (foreign | too_long) & (text != 'nan')
+    if odd.any():
+        cleaned = pd.Series(text[odd]).str.replace(',', '').str.replace(' ', '').str.rstrip(' -')
+        out[odd] = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype='float64')
+    return out
+
+
+def parse_indian_numbers(frame):
+    """
+    Convert Indian-grouped number strings ("2,95,02,905") and '-' placeholders to float64
+
+    All text columns are stacked into one flat array and converted together in a
+    single vectorized pass; numeric and datetime columns are passed through
+    untouched. Unparseable cells become NaN.
+    """
+    text_pos = [i for i in range(frame.shape[1]) if _is_text(frame.iloc[:, i])]
+    if not text_pos:
+        return frame
+
+    block = frame.iloc[:, text_pos].to_numpy(dtype=object).ravel(order='F')
+    values = np.concatenate([_parse_chunk(block[i:i + _CHUNK_CELLS])
+                             for i in range(0, len(block), _CHUNK_CELLS)] or [np.empty(0)])
+    values = values.reshape(len(frame), len(text_pos), order='F')
+
+    parsed = {}
+    slot = {pos: k for k, pos in enumerate(text_pos)}
+    for i in range(frame.shape[1]):
+        parsed[i] = values[:, slot[i]] if i in slot else frame.iloc[:, i].to_numpy()
+    result = pd.DataFrame(parsed, index=frame.index)
+    result.columns = frame.columns
+    return result
+
+
+def sniff_encoding(sample):
+    """Pick the encoding of a CSV export from its first bytes (UTF-8, then cp1252, then latin-1)"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # Incremental decoding tolerates a multi-byte character cut at the sample boundary
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('cp1252')  # Excel "CSV" exports on Windows, e.g. smart quotes around 'Other'
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _looks_like_data(row):
+    """A row is data (not header) if it starts with a date or is mostly numbers"""
+    cells = [c.strip() for c in row if c.strip()]
+    if not cells:
+        return False
+    if pd.notna(pd.to_datetime(row[0].strip() or None, errors='coerce', dayfirst=True)) \
+            and any(ch.isdigit() for ch in row[0]):
+        return True
+    numeric = _parse_chunk(np.array(cells, dtype=object))
+    return np.isfinite(numeric).sum() * 2 >= len(cells)
+
+
+def sniff_header_rows(sample_text, max_rows=10):
+    """Number of header rows before the first data row (at least 1)"""
+    lines = sample_text.splitlines()[:max_rows + 1]
+    for i, row in enumerate(csv.reader(lines)):
+        if i > 0 and _looks_like_data(row):
+            return i
+    return 1
+
+
+def decode_csv(filepath, sample_size=SNIFF_BYTES):
+    """
+    Read a CSV export exactly once and sniff its layout from the first few kilobytes
+
+    Returns (decoded text, CsvLayout). If the sniffed encoding turns out not to hold
+    for the rest of the file, the bytes already in memory are re-decoded as cp1252
+    with replacement characters instead of reading the file again.
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+
+    sample = raw[:sample_size]
+    encoding = sniff_encoding(sample)
+    try:
+        text = raw.decode(encoding)
+    except UnicodeDecodeError:
+        encoding = 'cp1252'
+        text = raw.decode(encoding, errors='replace')
+
+    header_rows = sniff_header_rows(text[:sample_size])
+    return text, CsvLayout(encoding, header_rows, len(sample))
+
+
+def flatten_columns(df):
+    """Join multi-row headers into single column names, dropping 'Unnamed' filler levels"""
+    if isinstance(df.columns, pd.MultiIndex):
+        flat_cols = []
+        for parts in df.columns:
+            cleaned = [str(p).strip() for p in parts if p is not None and str(p).strip() != '' and 'UNNAMED' not in str(p).upper()]
+            flat_cols.append(" ".join(cleaned).strip())
+        df.columns = flat_cols
+    return df
+
+
+def read_wss_csv(filepath):
+    """Parse a WSS CSV export into a date-indexed float frame (single read, sniffed layout)"""
+    # Read the file once; encoding and header depth are sniffed from the first few KB
+    text, layout = decode_csv(filepath)
+    
+    print(f"  Detected encoding: {layout.encoding}, header rows: {layout.header_rows} "
+          f"(sniffed from first {layout.sample_bytes:,} bytes)")
+    header = list(range(layout.header_rows)) if layout.header_rows > 1 else 0
+    
+    try:
+        data = pd.read_csv(io.StringIO(text), header=header)
+        
+        # Flatten multi-row headers if present
+        data = flatten_columns(data)
+        
+        # Try to identify date column (usually first column)
+        date_col = data.columns[0]
+        print(f"  Date column identified: '{date_col}'")
+        
+        # Convert date column - handle DD-Mon-YY format
+        try:
+            # Try parsing with dayfirst=True for DD-Mon-YY format
+            data[date_col] = pd.to_datetime(data[date_col], dayfirst=True, errors='coerce')
+        except:
+            # If that fails, try standard parsing
+            try:
+                data[date_col] = pd.to_datetime(data[date_col], errors='coerce')
+            except:
+                # If still fails, keep as is
+                pass
+        
+        # Set date as index
+        data = data.set_index(date_col)
+        
+        # Remove rows where date is NaT (invalid dates) - but keep numeric index if dates failed
+        if data.index.dtype == 'object' or pd.api.types.is_datetime64_any_dtype(data.index):
+            data = data[data.index.notna()]
+        else:
+            # If index is numeric, it might be row numbers - try to find date column
+            print("  Warning: Date column might not be properly parsed")
+        
+        # Convert numeric columns (handle Indian numbering with commas) in one pass
+        data = parse_indian_numbers(data)
+        data.attrs['csv_layout'] = layout._asdict()
+        
+        print(f"✓ Successfully loaded CSV file with {layout.encoding} encoding")
+        print(f"  Date range: {data.index.min()} to {data.index.max()}")
+        print(f"  Number of rows: {len(data)}")
+        print(f"  Sample data types: {dict(data.dtypes.head(5))}")
+        return data
+    except Exception as e:
+        print(f"Error loading CSV file: {e}")
+        # Try one more time with simpler approach, reusing the text already in memory
+        try:
+            data = pd.read_csv(io.StringIO(text))
+            # Unparsed dates and numbers: not worth a snapshot (see load_snapshot)
+            data.attrs['snapshot'] = False
+            print(f"✓ Loaded CSV with basic parsing (encoding: {layout.encoding})")
+            return data
+        except Exception:
+            return None
+
+
+def read_wss_excel(filepath):
+    """Parse every sheet of a WSS Excel download, flattening the two-row headers"""
+    data = pd.read_excel(filepath, sheet_name=None, header=[0, 1])  # Try multi-row header
+    # Flatten MultiIndex headers if present
+    if isinstance(data, dict):
+        return {k: flatten_columns(v) for k, v in data.items()}
+    return flatten_columns(data)
+
+
+def _is_date_cell(value):
+    return isinstance(value, (datetime, pd.Timestamp)) or \
+        (isinstance(value, str) and any(ch.isdigit() for ch in value) and any(ch.isalpha() for ch in value))
+
+
+def _table_frame(dates, rows, groups, names, index_name):
+    """Typed frame from raw cells of a two-row-header table: DatetimeIndex (oldest first), float64 columns"""
+    # Column names come from the second header row; the group ("Ratios", "Components", ...)
+    # only fills in where a column has no name of its own
+    columns, group = [], ''
+    for g, n in zip(groups, names):
+        group = str(g).strip() if g not in (None, '') else group
+        columns.append(str(n).strip() if n not in (None, '') else group)
+
+    index = pd.Series(dates, dtype=object)
+    parsed = pd.to_datetime(index.where(index.map(lambda d: not isinstance(d, str))), errors='coerce')
+    text = index.map(lambda d: d.strip() if isinstance(d, str) else None)
+    for fmt in ('%b %d, %Y', '%d-%b-%y'):  # "Jan 15, 2026" (Table 5), "15-Jan-26" (Table 6)
+        parsed = parsed.fillna(pd.to_datetime(text, format=fmt, errors='coerce'))
+    parsed = parsed.fillna(pd.to_datetime(text, format='mixed', dayfirst=True, errors='coerce'))
+
+    data = pd.DataFrame(rows, columns=columns, dtype=object)
+    # '-' placeholders (non-merger columns after the merger) become NaN
+    data = parse_indian_numbers(data).astype('float64')
+    data.index = pd.DatetimeIndex(parsed, name=index_name)
+    data = data.loc[data.index.notna(), [c != '' for c in columns]]  # trailing separators give nameless columns
+    return data[~data.index.duplicated(keep='first')].sort_index()
+
+
+def read_ratios_csv(filepath):
+    """Parse a Table 5 (Ratios and Rates) CSV export in one pass over the decoded text"""
+    text, layout = decode_csv(filepath)
+    reader = csv.reader(io.StringIO(text))
+    header = [next(reader, []) for _ in range(max(layout.header_rows, 2))]
+    width = max(len(row) for row in header)
+    groups, names = [row[1:] + [''] * (width - len(row)) for row in header[:2]]
+
+    dates, rows = [], []
+    for row in reader:
+        if row and _is_date_cell(row[0]):
+            dates.append(row[0])
+            rows.append((row[1:] + [''] * width)[:width - 1])
+    data = _table_frame(dates, rows, groups, names, 'Fortnight Ended')
+    print(f"✓ Loaded {len(data)} fortnights x {data.shape[1]} series from {os.path.basename(filepath)}")
+    return data
+
+
+def iter_sheet_chunks(filepath, date_label, sheets=None, chunk_rows=None):
+    """
+    Yield (sheet name, frame) chunks of the WSS tables in an Excel workbook
+
+    The workbook is opened read-only, so rows are streamed and only the requested
+    sheets (default: all) are ever parsed; multi-year archives stay cheap to open.
+    The header is located by its `date_label` cell ("Date", "Fortnight Ended"),
+    title rows above it and footnotes below the data are skipped. With chunk_rows
+    set, at most that many rows are held before a chunk is yielded.
+    """
+    from openpyxl import load_workbook
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        for name in workbook.sheetnames:
+            if sheets is not None and name not in sheets:
+                continue
+            rows = workbook[name].iter_rows(values_only=True)
+            date_col = None
+            for row in rows:
+                labels = [str(c).strip().upper() if c is not None else '' for c in row]
+                if date_label.upper() in labels:
+                    date_col = labels.index(date_label.upper())
+                    groups, names = list(row[date_col + 1:]), list(next(rows, ())[date_col + 1:])
+                    break
+            if date_col is None:
+                print(f"  ⚠ No '{date_label}' header in sheet '{name}', skipped")
+                continue
+
+            dates, values = [], []
+            for row in rows:
+                if len(row) > date_col and _is_date_cell(row[date_col]):
+                    dates.append(row[date_col])
+                    values.append(row[date_col + 1:date_col + 1 + len(names)])
+                    if chunk_rows and len(dates) >= chunk_rows:
+                        yield name, _table_frame(dates, values, groups, names, date_label)
+                        dates, values = [], []
+            if dates:
+                yield name, _table_frame(dates, values, groups, names, date_label)
+    finally:
+        workbook.close()
+
+
+def iter_ratios_sheets(filepath, sheets=None):
+    """Yield (sheet name, frame) for the Table 5 sheets of an Excel workbook, one sheet at a time"""
+    return iter_sheet_chunks(filepath, 'Fortnight Ended', sheets=sheets)
+
+
+def read_ratios_excel(filepath, sheets=None):
+    """Parse the Table 5 sheets of a workbook into one fortnightly frame (newest vintage wins)"""
+    frames = [frame for _, frame in iter_ratios_sheets(filepath, sheets=sheets)]
+    if not frames:
+        return pd.DataFrame()
+    # Sheets are listed newest first in the WSS archives, so keep the first copy of a date
+    data = pd.concat(frames)
+    data = data[~data.index.duplicated(keep='first')].sort_index()
+    print(f"✓ Loaded {len(data)} fortnights x {data.shape[1]} series from {len(frames)} sheet(s) "
+          f"of {os.path.basename(filepath)}")
+    return data
+
+
+def iter_csv_chunks(filepath, chunk_rows=ARCHIVE_CHUNK_ROWS):
+    """
+    Yield date-indexed float chunks of a WSS CSV export without reading the whole file
+
+    Encoding and header depth are sniffed from the first SNIFF_BYTES, then the file is
+    streamed through csv.reader holding at most chunk_rows rows at a time.
+    """
+    with open(filepath, 'rb') as f:
+        sample = f.read(SNIFF_BYTES)
+    encoding = sniff_encoding(sample)
+    header_rows = sniff_header_rows(sample.decode(encoding, errors='replace'))
+
+    with open(filepath, encoding=encoding, errors='replace', newline='') as f:
+        reader = csv.reader(f)
+        header = [next(reader, []) for _ in range(header_rows)]
+        width = max(len(row) for row in header)
+        header = [row + [''] * (width - len(row)) for row in header]
+        groups = header[-2][1:] if header_rows > 1 else [''] * (width - 1)
+        names = header[-1][1:]
+        index_name = next((row[0].strip() for row in header if row[0].strip()), 'Date')
+
+        dates, rows = [], []
+        for row in reader:
+            if row and _is_date_cell(row[0]):
+                dates.append(row[0])
+                rows.append((row[1:] + [''] * width)[:width - 1])
+                if len(dates) >= chunk_rows:
+                    yield _table_frame(dates, rows, groups, names, index_name)
+                    dates, rows = [], []
+        if dates:
+            yield _table_frame(dates, rows, groups, names, index_name)
+
+
+def iter_wss_chunks(filepath, chunk_rows=ARCHIVE_CHUNK_ROWS):
+    """Yield date-indexed float chunks of a Table 6 CSV or Excel download"""
+    if os.path.splitext(filepath)[1].lower() in ARCHIVE_EXCEL:
+        for _, chunk in iter_sheet_chunks(filepath, 'Date', chunk_rows=chunk_rows):
+            yield chunk
+    else:
+        yield from iter_csv_chunks(filepath, chunk_rows=chunk_rows)
+
+
+def _overlay(consolidated, chunk):
+    """Write a newer chunk over the consolidated frame: its values win for the dates and columns it covers"""
+    if consolidated.empty:
+        return chunk.copy()
+    index = consolidated.index.union(chunk.index)
+    columns = consolidated.columns.append(chunk.columns.difference(consolidated.columns, sort=False))
+    values = consolidated.reindex(index=index, columns=columns).to_numpy(dtype='float64', copy=True)
+    values[np.ix_(index.get_indexer(chunk.index), columns.get_indexer(chunk.columns))] = chunk.to_numpy()
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def ingest_wss_archive(directory, output_path=None, chunk_rows=ARCHIVE_CHUNK_ROWS, vintage=os.path.getmtime):
+    """
+    Consolidate a directory of Table 6 downloads (CSV/XLSX) into one time series
+
+    Files are processed oldest vintage first (by `vintage(path)`, default the file
+    modification time, ties broken by name) and streamed in chunks of at most
+    chunk_rows rows, so peak memory is one chunk plus the consolidated frame, which
+    holds a single row per date. Where downloads overlap, the latest vintage wins;
+    columns a vintage does not have keep their older values.
+
+    The result (oldest date first) is written to output_path (.csv, or Parquet/pickle
+    otherwise; default .cache/archives/<directory name>) and returned.
+    """
+    paths = sorted((os.path.join(directory, name) for name in os.listdir(directory)
+                    if os.path.splitext(name)[1].lower() in ARCHIVE_CSV + ARCHIVE_EXCEL),
+                   key=lambda path: (vintage(path), os.path.basename(path)))
+    print(f"Ingesting {len(paths)} WSS file(s) from {directory}")
+
+    consolidated = pd.DataFrame()
+    for path in paths:
+        n_rows = 0
+        try:
+            for chunk in iter_wss_chunks(path, chunk_rows=chunk_rows):
+                consolidated = _overlay(consolidated, chunk)
+                n_rows += len(chunk)
+        except Exception as e:
+            print(f"  ⚠ Skipped the rest of {os.path.basename(path)}: {e}")
+            continue
+        print(f"  ✓ {os.path.basename(path)}: {n_rows} rows")
+
+    if consolidated.empty:
+        print("  ⚠ No Table 6 data found")
+        return consolidated
+    consolidated.index.name = 'Date'
+
+    if output_path is None:
+        output_path = os.path.join(cache_dir('archives'), safe_name(os.path.basename(os.path.abspath(directory))) + FRAME_SUFFIX)
+    if output_path.lower().endswith('.csv'):
+        consolidated.to_csv(output_path)
+    else:
+        write_frame(consolidated, output_path)
+    print(f"✓ Consolidated {len(consolidated)} dates x {consolidated.shape[1]} series "
+          f"({consolidated.index.min().date()} to {consolidated.index.max().date()}) -> {output_path}")
+    return consolidated
+
+
+def load_snapshot(filepath, parser, **parser_kwargs):
+    """
+    Return parser(filepath), served from a binary snapshot when the file is unchanged
+
+    Snapshots live in .cache/snapshots and are keyed by the parser, SNAPSHOT_VERSION
+    and a hash of the source file, so editing or replacing the CSV/XLSX (or changing
+    the parser) triggers a re-parse. Dicts of sheets are stored one file per sheet.
+    Keyword arguments are passed on to the parser and are part of the key as well.
+    Results a parser flags with attrs['snapshot'] = False (fallback parses) and
+    None are returned without a snapshot, so the next run parses the file again.
+    """
+    digest = file_digest(filepath)
+    parser_key = parser.__name__
+    if parser_kwargs:
+        parser_key += '.' + format(zlib.crc32(repr(sorted(parser_kwargs.items())).encode()), '08x')
+    stem = f"{safe_name(os.path.basename(filepath))}-{parser_key}-v{SNAPSHOT_VERSION}-{digest}"
+    directory = cache_dir('snapshots')
+    frame_path = os.path.join(directory, stem + FRAME_SUFFIX)
+    manifest_path = os.path.join(directory, stem + '.json')
+
+    if os.path.exists(frame_path):
+        data = read_frame(frame_path)
+        print(f"✓ Loaded parsed snapshot of {os.path.basename(filepath)} ({len(data)} rows)")
+        return data
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            sheets = json.load(f)
+        data = {name: read_frame(os.path.join(directory, f"{stem}-{i}{FRAME_SUFFIX}"))
+                for i, name in enumerate(sheets)}
+        print(f"✓ Loaded parsed snapshot of {os.path.basename(filepath)} ({len(data)} sheets)")
+        return data
+
+    data = parser(filepath, **parser_kwargs)
+    if data is None or (isinstance(data, pd.DataFrame) and data.attrs.get('snapshot') is False):
+        return data
+    try:
+        # Drop snapshots of older versions of this file before writing the new one
+        prefix = f"{safe_name(os.path.basename(filepath))}-{parser_key}-"
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and not name.startswith(stem):
+                os.remove(os.path.join(directory, name))
+        if isinstance(data, pd.DataFrame):
+            write_frame(data, frame_path)
+        elif isinstance(data, dict):
+            for i, frame in enumerate(data.values()):
+                write_frame(frame, os.path.join(directory, f"{stem}-{i}{FRAME_SUFFIX}"))
+            with open(manifest_path, 'w') as f:
+                json.dump([str(name) for name in data], f)
+    except Exception as e:
+        # A snapshot is only an optimisation; the parsed data is still good
+        print(f"  Warning: could not write snapshot for {os.path.basename(filepath)}: {e}")
+    return data
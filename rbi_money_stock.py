@@ -5,10 +5,16 @@ Downloads and analyzes M3 money stock component
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import requests
 from datetime import datetime
 import warnings
+from rbi_io import (load_snapshot, read_wss_csv, read_wss_excel,
+                    read_ratios_csv, read_ratios_excel, ingest_wss_archive)
+from growth_engine import growth_summary
+from analytics import (extract_money_components, _extract_from_dataframe, calculate_correlation,
+                       calculate_growth_rates, calculate_lagged_correlation, GROWTH_LABELS, LAG_RATIOS)
+from downsample import thin
+from render_service import FigureSpec, get_render_service
+from excel_export import WorkbookExport
 warnings.filterwarnings('ignore')
 
 def download_rbi_data():
@@ -34,325 +40,73 @@ def download_rbi_data():
     
     return None
 
-def load_money_stock_data(filepath=r'C:\Users\hp\Desktop\Monetary Economics\rbi_money_stock.csv'):
-    """Load money stock data from Excel or CSV file"""
-    import os
-    
-    def _flatten_columns(df):
-        if isinstance(df.columns, pd.MultiIndex):
-            flat_cols = []
-            for parts in df.columns:
-                cleaned = [str(p).strip() for p in parts if p is not None and str(p).strip() != '' and 'UNNAMED' not in str(p).upper()]
-                flat_cols.append(" ".join(cleaned).strip())
-            df.columns = flat_cols
-        return df
+def load_money_stock_data(filepath=r'C:\Users\hp\Desktop\Monetary Economics\rbi_money_stock.csv'):
+    """
+    Load money stock data from Excel or CSV file
+    The parsed frame is snapshotted next to the other caches, so an unchanged
+    file is loaded from the snapshot instead of being parsed again
+    A directory of weekly downloads is streamed into one consolidated series
+    (latest vintage wins), see rbi_io.ingest_wss_archive
+    """
+    import os
+    
+    if os.path.isdir(filepath):
+        return ingest_wss_archive(filepath)
     
     # Check file extension to determine file type
     file_ext = os.path.splitext(filepath)[1].lower()
     
     if file_ext in ['.xlsx', '.xls']:
         # Try Excel
-        try:
-            data = pd.read_excel(filepath, sheet_name=None, header=[0, 1])  # Try multi-row header
-            # Flatten MultiIndex headers if present
-            if isinstance(data, dict):
-                data = {k: _flatten_columns(v) for k, v in data.items()}
-            else:
-                data = _flatten_columns(data)
-            return data
-        except Exception as e:
-            print(f"Error loading Excel file: {e}")
-            return None
+        try:
+            return load_snapshot(filepath, read_wss_excel)
+        except Exception as e:
+            print(f"Error loading Excel file: {e}")
+            return None
     else:
-        # Try CSV with different encodings
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'windows-1252']
-        
-        for encoding in encodings:
-            try:
-                # Read CSV - try with header detection
-                # First, try reading with header=0 (first row as header)
-                try:
-                    data = pd.read_csv(filepath, encoding=encoding, header=[0, 1], thousands=',')
-                except:
-                    # If that fails, try without thousands parameter
-                    data = pd.read_csv(filepath, encoding=encoding, header=[0, 1])
-                
-                # Flatten multi-row headers if present
-                data = _flatten_columns(data)
-                
-                # Try to identify date column (usually first column)
-                date_col = data.columns[0]
-                print(f"  Date column identified: '{date_col}'")
-                
-                # Convert date column - handle DD-Mon-YY format
-                try:
-                    # Try parsing with dayfirst=True for DD-Mon-YY format
-                    data[date_col] = pd.to_datetime(data[date_col], dayfirst=True, errors='coerce')
-                except:
-                    # If that fails, try standard parsing
-                    try:
-                        data[date_col] = pd.to_datetime(data[date_col], errors='coerce')
-                    except:
-                        # If still fails, keep as is
-                        pass
-                
-                # Set date as index
-                data = data.set_index(date_col)
-                
-                # Remove rows where date is NaT (invalid dates) - but keep numeric index if dates failed
-                if data.index.dtype == 'object' or pd.api.types.is_datetime64_any_dtype(data.index):
-                    data = data[data.index.notna()]
-                else:
-                    # If index is numeric, it might be row numbers - try to find date column
-                    print("  Warning: Date column might not be properly parsed")
-                
-                # Convert numeric columns (handle Indian numbering with commas)
-                for col in data.columns:
-                    if data[col].dtype == 'object':
-                        # Remove commas, spaces, and other non-numeric chars except decimal point
-                        data[col] = data[col].astype(str).str.replace(',', '').str.replace(' ', '')
-                        # Remove any trailing hyphens or special chars
-                        data[col] = data[col].str.rstrip(' -')
-                        # Convert to numeric
-                        data[col] = pd.to_numeric(data[col], errors='coerce')
-                
-                print(f"✓ Successfully loaded CSV file with {encoding} encoding")
-                print(f"  Date range: {data.index.min()} to {data.index.max()}")
-                print(f"  Number of rows: {len(data)}")
-                print(f"  Sample data types: {dict(data.dtypes.head(5))}")
-                return data
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                # If it's not an encoding error, try next encoding or return None
-                if 'codec' not in str(e).lower() and 'decode' not in str(e).lower():
-                    print(f"Error loading CSV file: {e}")
-                    # Try one more time with simpler approach
-                    try:
-                        data = pd.read_csv(filepath, encoding=encoding)
-                        print(f"✓ Loaded CSV with basic parsing (encoding: {encoding})")
-                        return data
-                    except:
-                        continue
-                continue
-        
-        print(f"Error: Could not decode CSV file with any of the tried encodings: {encodings}")
+        try:
+            return load_snapshot(filepath, read_wss_csv)
+        except OSError as e:
+            print(f"Error loading CSV file: {e}")
+            return None
+
+def load_ratios_rates_data(filepath='rbi_ratios_rates.csv', sheets=None):
+    """
+    Load WSS Table 5 (Ratios and Rates) as a fortnightly frame, oldest first
+    Dates become a DatetimeIndex, every ratio a float64 column ('-' -> NaN).
+    For Excel archives, `sheets` limits parsing to the given sheet names;
+    sheets are otherwise streamed one at a time. Results are snapshotted
+    like load_money_stock_data.
+    """
+    import os
+    
+    file_ext = os.path.splitext(filepath)[1].lower()
+    try:
+        if file_ext in ['.xlsx', '.xlsm']:
+            if sheets is not None:
+                return load_snapshot(filepath, read_ratios_excel, sheets=sorted(sheets))
+            return load_snapshot(filepath, read_ratios_excel)
+        return load_snapshot(filepath, read_ratios_csv)
+    except Exception as e:
+        print(f"Error loading ratios and rates file: {e}")
         return None
 
-def extract_money_components(data):
-    """
-    Extract M0, M1, M3 components from RBI data.
-    Handles both direct columns and component-based structure.
-    """
-    components = {}
-    
-    if isinstance(data, dict):
-        # Multiple sheets - process each sheet
-        for sheet_name, sheet_data in data.items():
-            print(f"Processing sheet: {sheet_name}")
-            result = _extract_from_dataframe(sheet_data)
-            components.update(result)
-    else:
-        # Single DataFrame
-        components = _extract_from_dataframe(data)
-    
-    return components
+PLOT_ORDER = [
+    ("M0", "M0 (Reserve Money)", "#1f77b4"),
+    ("M1", "M1 (Narrow Money)", "#2ca02c"),
+    ("M3", "M3 (Broad Money)", "#d62728"),
+]
 
-def _extract_from_dataframe(df):
-    """Helper function to extract M0, M1, M3 from a single DataFrame"""
-    components = {}
-    
-    print(f"  Available columns: {list(df.columns)[:15]}...")  # Show first 15 columns
-    
-    def _norm(col):
-        return " ".join(str(col).replace("\n", " ").replace("\r", " ").strip().upper().split())
-    
-    def _to_numeric(series):
-        s = series.copy()
-        if s.dtype == 'object':
-            s = s.astype(str)
-            s = s.str.replace(',', '', regex=False)
-            s = s.str.replace(' ', '', regex=False)
-            s = s.str.rstrip(' -')
-        return pd.to_numeric(s, errors='coerce')
-    
-    def _find_col_by_keywords(include_any=None, include_all=None, exclude_any=None, startswith=None):
-        include_any = [k.upper() for k in (include_any or [])]
-        include_all = [k.upper() for k in (include_all or [])]
-        exclude_any = [k.upper() for k in (exclude_any or [])]
-        startswith = startswith.upper() if startswith else None
-        for col in df.columns:
-            n = _norm(col)
-            if startswith and not n.startswith(startswith):
-                continue
-            if include_any and not any(k in n for k in include_any):
-                continue
-            if include_all and not all(k in n for k in include_all):
-                continue
-            if exclude_any and any(k in n for k in exclude_any):
-                continue
-            return col
-        return None
-
-    def _find_col_by_prefix(prefix):
-        p = prefix.strip()
-        for col in df.columns:
-            c = str(col).strip()
-            if c.startswith(p):
-                return col
-        return None
-    
-    # Direct columns first (M0/M1/M3)
-    direct_m0 = _find_col_by_keywords(include_any=["M0", "M 0", "RESERVE MONEY"])
-    direct_m1 = _find_col_by_keywords(include_any=["M1", "M 1", "NARROW MONEY"])
-    direct_m3 = _find_col_by_keywords(include_any=["M3", "M 3", "BROAD MONEY"], exclude_any=["EXCLUDING", "M30"])
-    
-    if direct_m0:
-        m0_data = _to_numeric(df[direct_m0])
-        if m0_data.notna().sum() > 0:
-            components['M0'] = m0_data
-            print(f"  ✓ Extracted M0 from column: '{direct_m0}'")
-    
-    if direct_m1:
-        m1_data = _to_numeric(df[direct_m1])
-        if m1_data.notna().sum() > 0:
-            components['M1'] = m1_data
-            print(f"  ✓ Extracted M1 from column: '{direct_m1}'")
-    
-    if direct_m3:
-        m3_data = _to_numeric(df[direct_m3])
-        if m3_data.notna().sum() > 0:
-            components['M3'] = m3_data
-            print(f"  ✓ Extracted M3 from column: '{direct_m3}'")
-    
-    # Compute M0 if not found: Currency in Circulation + Bankers' Deposits with RBI + Other Deposits with RBI
-    if 'M0' not in components:
-        col_currency_circ = _find_col_by_keywords(include_all=["CURRENCY", "CIRCULATION"])
-        col_bankers_dep = _find_col_by_keywords(include_all=["BANKERS", "DEPOSITS", "RBI"])
-        col_other_dep_rbi = _find_col_by_keywords(include_all=["OTHER", "DEPOSITS", "RBI"])
-        # Fall back to numbered components if present (typically in "1 Components" table)
-        if not col_currency_circ:
-            col_currency_circ = _find_col_by_prefix("1.1")
-        if not col_other_dep_rbi:
-            col_other_dep_rbi = _find_col_by_prefix("1.4")
-        if col_currency_circ and col_bankers_dep and col_other_dep_rbi:
-            components['M0'] = (
-                _to_numeric(df[col_currency_circ]) +
-                _to_numeric(df[col_bankers_dep]) +
-                _to_numeric(df[col_other_dep_rbi])
-            )
-            print("  ✓ Calculated M0 = Currency in Circulation + Bankers' Deposits with RBI + Other Deposits with RBI")
-        else:
-            missing = []
-            if not col_currency_circ:
-                missing.append("Currency in Circulation")
-            if not col_bankers_dep:
-                missing.append("Bankers' Deposits with RBI")
-            if not col_other_dep_rbi:
-                missing.append("Other Deposits with RBI")
-            if missing:
-                print(f"  ⚠ Cannot calculate M0 - missing components: {', '.join(missing)}")
-    
-    # Compute M1 if not found:
-    # M1 = Currency with the Public + Demand Deposits with the Banking System + Other Deposits with RBI
-    # or Currency with the Public + Current Deposits + Demand Liabilities Portion of Savings Deposits + Other Deposits with RBI
-    if 'M1' not in components:
-        col_currency_public = _find_col_by_keywords(include_all=["CURRENCY", "PUBLIC"])
-        col_demand_deposits = _find_col_by_keywords(include_all=["DEMAND", "DEPOSITS", "BANKING SYSTEM"])
-        col_other_dep_rbi = _find_col_by_keywords(include_all=["OTHER", "DEPOSITS", "RBI"])
-        
-        # Fall back to numbered components if present (1.1, 1.2, 1.4)
-        if not col_currency_public:
-            col_currency_public = _find_col_by_prefix("1.1")
-        if not col_demand_deposits:
-            col_demand_deposits = _find_col_by_prefix("1.2")
-        if not col_other_dep_rbi:
-            col_other_dep_rbi = _find_col_by_prefix("1.4")
-        
-        if col_currency_public and col_demand_deposits and col_other_dep_rbi:
-            components['M1'] = (
-                _to_numeric(df[col_currency_public]) +
-                _to_numeric(df[col_demand_deposits]) +
-                _to_numeric(df[col_other_dep_rbi])
-            )
-            print("  ✓ Calculated M1 = Currency with Public + Demand Deposits + Other Deposits with RBI")
-        else:
-            # Try expanded definition
-            col_current_dep = _find_col_by_keywords(include_all=["CURRENT", "DEPOSITS", "BANKING SYSTEM"])
-            col_savings_demand_liab = _find_col_by_keywords(
-                include_all=["SAVINGS", "DEPOSITS"],
-                include_any=["DEMAND LIABILITIES", "DEMAND PORTION", "DEMAND LIAB"]
-            )
-            if col_currency_public and col_current_dep and col_savings_demand_liab and col_other_dep_rbi:
-                components['M1'] = (
-                    _to_numeric(df[col_currency_public]) +
-                    _to_numeric(df[col_current_dep]) +
-                    _to_numeric(df[col_savings_demand_liab]) +
-                    _to_numeric(df[col_other_dep_rbi])
-                )
-                print("  ✓ Calculated M1 = Currency with Public + Current Deposits + Demand Liabilities of Savings Deposits + Other Deposits with RBI")
-            else:
-                missing = []
-                if not col_currency_public:
-                    missing.append("Currency with Public")
-                if not col_demand_deposits and not col_current_dep:
-                    missing.append("Demand Deposits or Current Deposits")
-                if not col_other_dep_rbi:
-                    missing.append("Other Deposits with RBI")
-                if missing:
-                    print(f"  ⚠ Cannot calculate M1 - missing components: {', '.join(missing)}")
-    
-    # Compute M3 if not found:
-    # M3 = M2 + Term Deposits (over 1 year) + Call/Term borrowings from 'non-depository' financial corporations
-    if 'M3' not in components:
-        col_m2 = _find_col_by_keywords(include_any=["M2", "M 2"])
-        col_term_over_1y = _find_col_by_keywords(include_all=["TERM", "DEPOSITS", "OVER ONE YEAR"])
-        col_call_term_borrowings = _find_col_by_keywords(include_all=["CALL/TERM", "BORROWINGS"], include_any=["NON-DEPOSITORY", "NON DEPOSITORY"])
-        
-        if col_m2 and col_term_over_1y and col_call_term_borrowings:
-            components['M3'] = (
-                _to_numeric(df[col_m2]) +
-                _to_numeric(df[col_term_over_1y]) +
-                _to_numeric(df[col_call_term_borrowings])
-            )
-            print("  ✓ Calculated M3 = M2 + Term Deposits (over 1 year) + Call/Term Borrowings (non-depository financial corporations)")
-        else:
-            missing = []
-            if not col_m2:
-                missing.append("M2")
-            if not col_term_over_1y:
-                missing.append("Term Deposits over 1 year")
-            if not col_call_term_borrowings:
-                missing.append("Call/Term Borrowings from non-depository financial corporations")
-            if missing:
-                print(f"  ⚠ Cannot calculate M3 - missing components: {', '.join(missing)}")
-    
-    return components
-
-def plot_money_components(components, save_path='rbi_money_stock_analysis.xlsx'):
-    """Plot M0, M1, M3 on a graph"""
-    if not components:
-        print("No money stock components found to plot")
-        return None
-    
+def draw_money_components(components):
+    """M0, M1, M3 (whichever are in components) on one graph"""
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(16, 8))
     
-    plot_order = [
-        ("M0", "M0 (Reserve Money)", "#1f77b4"),
-        ("M1", "M1 (Narrow Money)", "#2ca02c"),
-        ("M3", "M3 (Broad Money)", "#d62728"),
-    ]
-    
-    plotted = False
-    for key, label, color in plot_order:
-        if key in components and components[key] is not None and len(components[key]) > 0:
-            ax.plot(components[key].index, components[key].values,
+    for key, label, color in PLOT_ORDER:
+        if key in components:
+            series = thin(ax, components[key])
+            ax.plot(series.index, series.values,
                     label=label, linewidth=2, color=color)
-            plotted = True
-    
-    if not plotted:
-        print("No usable series found to plot")
-        return None
     
     ax.set_title('Money Stock: M0, M1, M3', fontsize=16, fontweight='bold')
     ax.set_xlabel('Date', fontsize=12)
@@ -361,20 +115,49 @@ def plot_money_components(components, save_path='rbi_money_stock_analysis.xlsx')
     ax.grid(True, alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig('money_stock_components.png', dpi=300, bbox_inches='tight')
-    print("Plot saved as 'money_stock_components.png'")
-    
     return fig
 
-def calculate_correlation(components):
-    """Calculate correlation between money stock components"""
-    # Combine all components into a single DataFrame
-    df = pd.DataFrame(components)
+def plot_money_components(components, save_path='rbi_money_stock_analysis.xlsx'):
+    """Plot M0, M1, M3 on a graph, rendered in the background (see render_service.py)
+    Returns a Future of the written file (None if there is nothing to plot)"""
+    if not components:
+        print("No money stock components found to plot")
+        return None
+    
+    usable = {key: components[key] for key, _, _ in PLOT_ORDER
+              if key in components and components[key] is not None and len(components[key]) > 0}
+    if not usable:
+        print("No usable series found to plot")
+        return None
     
-    # Calculate correlation matrix
-    corr_matrix = df.corr()
+    return get_render_service().submit(FigureSpec(
+        draw_money_components, 'money_stock_components.png', data={'components': usable},
+        savefig={'dpi': 300, 'bbox_inches': 'tight'},
+        message="Plot saved as 'money_stock_components.png'"))
+
+def draw_lagged_correlation(correlations):
+    """Every pair's correlation against the lag (positive lag: first series leads)"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(16, 8))
+    for x, y in correlations.columns:
+        ax.plot(correlations.index, correlations[(x, y)], linewidth=1.5, label=f"{x} → {y}")
+    ax.axvline(x=0, color='black', linestyle='--', linewidth=0.8)
+    ax.axhline(y=0, color='black', linewidth=0.8)
+    ax.set_title('Lead/Lag Correlation of Growth Rates', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Lag (fortnights, positive = first series leads)', fontsize=12)
+    ax.set_ylabel('Correlation', fontsize=12)
+    ax.legend(fontsize=8, loc='upper left', ncol=2)
+    ax.grid(True, alpha=0.3)
     
-    return corr_matrix
+    plt.tight_layout()
+    return fig
+
+def plot_lagged_correlation(correlations, save_path='money_stock_cross_correlation.png'):
+    """Render draw_lagged_correlation in the background (see render_service.py); returns a Future"""
+    return get_render_service().submit(FigureSpec(
+        draw_lagged_correlation, save_path, data={'correlations': correlations},
+        savefig={'dpi': 200, 'bbox_inches': 'tight'},
+        message=f"Plot saved as '{save_path}'"))
 
 def document_components():
     """Document the RBI money stock components (M0, M1, M3)"""
@@ -476,12 +259,14 @@ def main():
     print("\nCreating plots...")
     plot_money_components(components)
     
-    # Calculate basic statistics for M0/M1/M3
+    # Calculate basic statistics for M0/M1/M3 (rows may come in any order)
     stats_rows = []
     for comp_name in ["M0", "M1", "M3"]:
         if comp_name in components:
             series = components[comp_name]
             if series is not None and len(series) > 0:
+                series = series.sort_index()
+                summary = growth_summary(series.rename(comp_name))
                 print("\n" + "=" * 80)
                 print(f"{comp_name} STATISTICS")
                 print("=" * 80)
@@ -494,6 +279,10 @@ def main():
                 if len(series) > 1 and series.iloc[0] != 0:
                     growth_rate = ((series.iloc[-1] / series.iloc[0]) - 1) * 100
                     print(f"Total Growth: {growth_rate:.2f}%")
+                growth = summary.loc[comp_name] if comp_name in summary.index else None
+                if growth is not None:
+                    print(f"Annualized Growth: {growth['cagr']:.2f}%")
+                    print(f"Latest YoY Growth: {growth['latest_yoy']:.2f}% | Average YoY Growth: {growth['average_yoy']:.2f}%")
                 print(f"Date Range: {series.index.min()} to {series.index.max()}")
                 
                 stats_rows.append({
@@ -503,22 +292,48 @@ def main():
                     "Maximum": f"{series.max():,.0f}",
                     "Average": f"{series.mean():,.0f}",
                     "Total Growth (%)": f"{growth_rate:.2f}" if growth_rate is not None else "N/A",
+                    "Annualized Growth (%)": f"{growth['cagr']:.2f}" if growth is not None else "N/A",
+                    "Latest YoY Growth (%)": f"{growth['latest_yoy']:.2f}" if growth is not None else "N/A",
+                    "Average YoY Growth (%)": f"{growth['average_yoy']:.2f}" if growth is not None else "N/A",
                 })
+    
+    # Growth rates of every Table 6 column on its reporting calendar
+    growth_table = calculate_growth_rates(data) if isinstance(data, pd.DataFrame) else None
+    
+    # Lead/lag correlations of growth rates (aggregates and Table 5 ratios)
+    ratios = load_ratios_rates_data()
+    correlations, peaks = calculate_lagged_correlation(components, ratios)
+    print("\n" + "=" * 80)
+    print("LEAD/LAG CORRELATIONS OF GROWTH RATES (strongest lag per pair)")
+    print("=" * 80)
+    for peak in peaks.itertuples():
+        print(f"  {peak.x} → {peak.y}: {peak.peak_correlation:+.2f} at lag {peak.peak_lag:+d} "
+              f"(lag 0: {peak.lag0_correlation:+.2f})")
+    plot_lagged_correlation(correlations)
     
     # Save analysis
-    with pd.ExcelWriter('rbi_money_stock_analysis.xlsx', engine='openpyxl') as writer:
+    with WorkbookExport('rbi_money_stock_analysis.xlsx') as writer:
         # Save components
         components_df = pd.DataFrame(components)
-        components_df.to_excel(writer, sheet_name='Money Stock Components', index=True)
+        writer.add(components_df, 'Money Stock Components', index=True)
         
         # Save documentation
         doc_df = pd.DataFrame({'Documentation': [doc]})
-        doc_df.to_excel(writer, sheet_name='Components Documentation', index=False)
+        writer.add(doc_df, 'Components Documentation', index=False)
         
         # Save M0/M1/M3 statistics if available
         if stats_rows:
             stats_df = pd.DataFrame(stats_rows)
-            stats_df.to_excel(writer, sheet_name='Money Stock Statistics', index=False)
+            writer.add(stats_df, 'Money Stock Statistics', index=False)
+        
+        # YoY / period / annualized growth of every Table 6 column
+        if growth_table is not None:
+            writer.add(growth_table, 'Growth Rates', index=True)
+        
+        # Lag x pair correlation matrix and the strongest lag of every pair
+        lag_table = correlations.set_axis([f"{x} → {y}" for x, y in correlations.columns], axis=1)
+        writer.add(lag_table, 'Lagged Correlations', index=True)
+        writer.add(peaks, 'Lead-Lag Peaks', index=False)
         
         # Analysis sheet
         analysis = """
@@ -551,11 +366,14 @@ def main():
         transaction money, and savings in the economy than any single measure alone.
         """
         analysis_df = pd.DataFrame({'Analysis': [analysis]})
-        analysis_df.to_excel(writer, sheet_name='Best Measure Analysis', index=False)
+        writer.add(analysis_df, 'Best Measure Analysis', index=False)
     
     print("\n" + "=" * 80)
     print("Analysis saved to 'rbi_money_stock_analysis.xlsx'")
     print("=" * 80)
+    
+    # Charts still rendering in the background
+    get_render_service().wait()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,310 @@
+"""
+Chart rendering in worker processes
+
+At dpi=300 drawing and saving the figures takes longer than the analysis once
+the data is cached. The scripts therefore describe each chart as a FigureSpec:
+a top-level draw function, its data (Series, DataFrames, arrays) and style
+keyword arguments. RenderService renders specs in a process pool with the Agg
+backend, several charts at once and while the script carries on with its Excel
+export. The data itself is not pickled: all arrays of a spec are copied once
+into a multiprocessing.shared_memory block and the worker rebuilds the Series
+and DataFrames on top of it; only the layout (names, dtypes, offsets) and the
+style travel through the pool's pipe.
+
+MONETARY_RENDER_WORKERS sets the number of worker processes (default: one per
+CPU); 0 renders in the calling process. Charts whose draw function, data, style
+and savefig arguments are unchanged since an earlier run are copied from the
+artifact cache (see artifact_cache.py) instead of being rendered again.
+"""
+
+import os
+import gc
+from functools import lru_cache
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from artifact_cache import get_artifact_cache, _package_version
+
+ALIGNMENT = 64
+
+
+class FigureSpec:
+    """
+    One chart to render
+
+    draw:    top-level function called as draw(**data, **style), returning a Figure
+    path:    file to write
+    data:    {argument: Series, DataFrame, numpy array or dict of those}, the bulk data
+    style:   the remaining (small) keyword arguments of draw: labels, colours, event lists
+    savefig: keyword arguments of Figure.savefig (dpi, bbox_inches, facecolor, ...)
+    message: printed once the file is written
+    """
+
+    def __init__(self, draw, path, data=None, style=None, savefig=None, message=None):
+        self.draw = draw
+        self.path = path
+        self.data = data or {}
+        self.style = style or {}
+        self.savefig = savefig or {}
+        self.message = message
+
+
+# ---------------------------------------------------------------------------
+# Shared-memory packing
+# ---------------------------------------------------------------------------
+
+class _Packer:
+    """Collects the arrays of a spec and replaces them by (offset, dtype, shape) references"""
+
+    def __init__(self):
+        self.arrays = []
+        self.size = 0
+
+    def array(self, values):
+        values = np.asarray(values)
+        if values.dtype.hasobject:
+            return ('pickled', values)
+        offset = self.size
+        self.arrays.append((offset, values))
+        self.size += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+        return ('shared', offset, values.dtype.str, values.shape)
+
+    def index(self, index):
+        if isinstance(index, pd.RangeIndex):
+            return ('range', index.start, index.stop, index.step, index.name)
+        if isinstance(index, pd.DatetimeIndex):
+            return ('datetime', self.array(index.asi8), index.unit, str(index.tz) if index.tz else None, index.name)
+        if isinstance(index, pd.MultiIndex) or index.dtype == object:
+            return ('pickled', index)
+        return ('values', self.array(index.to_numpy()), index.name)
+
+    def item(self, item):
+        if isinstance(item, pd.Series):
+            return ('series', self.array(item.to_numpy()), self.index(item.index), item.name)
+        if isinstance(item, pd.DataFrame):
+            columns = [self.array(item.iloc[:, i].to_numpy()) for i in range(item.shape[1])]
+            return ('frame', columns, list(item.columns), item.columns.names, self.index(item.index))
+        if isinstance(item, dict):
+            return ('dict', {key: self.item(value) for key, value in item.items()})
+        if isinstance(item, np.ndarray):
+            return ('array', self.array(item))
+        return ('pickled', item)
+
+
+def _array(ref, buffer):
+    if ref[0] == 'pickled':
+        return ref[1]
+    _, offset, dtype, shape = ref
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape, dtype='int64'))
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def _index(ref, buffer):
+    kind = ref[0]
+    if kind == 'range':
+        return pd.RangeIndex(ref[1], ref[2], ref[3], name=ref[4])
+    if kind == 'datetime':
+        _, values, unit, tz, name = ref
+        index = pd.DatetimeIndex(_array(values, buffer).view(f'datetime64[{unit}]'), name=name)
+        return index.tz_localize('UTC').tz_convert(tz) if tz else index
+    if kind == 'pickled':
+        return ref[1]
+    return pd.Index(_array(ref[1], buffer), name=ref[2])
+
+
+def _unpack(ref, buffer):
+    kind = ref[0]
+    if kind == 'series':
+        return pd.Series(_array(ref[1], buffer), index=_index(ref[2], buffer), name=ref[3], copy=False)
+    if kind == 'frame':
+        _, columns, labels, names, index = ref
+        frame = pd.DataFrame({i: _array(column, buffer) for i, column in enumerate(columns)},
+                             index=_index(index, buffer), copy=False)
+        frame.columns = pd.MultiIndex.from_tuples(labels, names=names) if len(names) > 1 \
+            else pd.Index(labels, name=names[0])
+        return frame
+    if kind == 'dict':
+        return {key: _unpack(value, buffer) for key, value in ref[1].items()}
+    if kind == 'array':
+        return _array(ref[1], buffer)
+    return ref[1]
+
+
+def pack(data):
+    """
+    Copy the arrays of {argument: data} into one new shared memory block
+    Returns (SharedMemory or None when there is nothing to share, layout)
+    """
+    packer = _Packer()
+    layout = {key: packer.item(value) for key, value in data.items()}
+    if not packer.size:
+        return None, layout
+    block = shared_memory.SharedMemory(create=True, size=packer.size)
+    for offset, values in packer.arrays:
+        np.frombuffer(block.buf, dtype=values.dtype, count=values.size, offset=offset)[:] = values.ravel()
+    return block, layout
+
+
+def unpack(layout, buffer):
+    """{argument: data} rebuilt on top of a shared memory buffer (see pack)"""
+    return {key: _unpack(value, buffer) for key, value in layout.items()}
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _draw_and_save(draw, data, style, path, savefig):
+    import matplotlib.pyplot as plt
+    fig = draw(**data, **style)
+    try:
+        fig.savefig(path, **savefig)
+    finally:
+        plt.close(fig)
+    return path
+
+
+def _render_shared(draw, block_name, layout, style, path, savefig):
+    """Worker side: attach to the spec's shared memory, draw and save"""
+    block = shared_memory.SharedMemory(name=block_name) if block_name else None
+    try:
+        data = unpack(layout, block.buf if block is not None else None)
+        return _draw_and_save(draw, data, style, path, savefig)
+    finally:
+        data = None
+        gc.collect()
+        if block is not None:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a view is still referenced somewhere; unmapped when the worker exits
+
+
+def render_figure(spec):
+    """Draw and save one spec in the calling process"""
+    return _draw_and_save(spec.draw, spec.data, spec.style, spec.path, spec.savefig)
+
+
+class RenderService:
+    """
+    Process pool rendering FigureSpecs in the background
+
+    max_workers: worker processes (default MONETARY_RENDER_WORKERS, else one per
+                 CPU); 0 renders synchronously in the calling process
+    cache:       ArtifactCache to reuse unchanged charts from (default
+                 get_artifact_cache()); False always renders
+
+    submit() returns a Future resolving to the written path; wait() blocks until
+    everything submitted so far is written and re-raises the first failure.
+    """
+
+    def __init__(self, max_workers=None, cache=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get('MONETARY_RENDER_WORKERS', os.cpu_count() or 1))
+        self.max_workers = max_workers
+        self.cache = get_artifact_cache() if cache is None else cache or None
+        self._executor = None
+        self._pending = []
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_use_agg)
+        return self._executor
+
+    def cache_key(self, spec):
+        """Artifact cache key of a spec (None without a cache)"""
+        if self.cache is None:
+            return None
+        return self.cache.key(spec.draw, spec.data, spec.style, spec.savefig,
+                              os.path.splitext(spec.path)[1], _package_version('matplotlib'))
+
+    def submit(self, spec):
+        """Queue a FigureSpec for rendering (or restore it from the artifact cache)"""
+        key = self.cache_key(spec)
+        cached = key is not None and self.cache.restore(key, spec.path)
+        if cached:
+            future = Future()
+            future.set_result(spec.path)
+        elif self.max_workers == 0:
+            future = Future()
+            try:
+                future.set_result(render_figure(spec))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            block, layout = pack(spec.data)
+            try:
+                future = self._pool().submit(_render_shared, spec.draw, block.name if block else None,
+                                             layout, spec.style, spec.path, spec.savefig)
+            except Exception:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+                raise
+            future.add_done_callback(lambda _, block=block: self._release(block))
+        if key is not None and not cached:
+            future.add_done_callback(lambda f, key=key, path=spec.path: self._store(f, key, path))
+        future.add_done_callback(lambda f, spec=spec: self._report(f, spec))
+        self._pending.append(future)
+        return future
+
+    @staticmethod
+    def _release(block):
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    def _store(self, future, key, path):
+        if not future.cancelled() and future.exception() is None:
+            try:
+                self.cache.store(key, path)
+            except OSError as e:
+                print(f"  ⚠ Could not cache '{path}': {e}")
+
+    @staticmethod
+    def _report(future, spec):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f"✗ Could not render '{spec.path}': {future.exception()}")
+        elif spec.message:
+            print(spec.message)
+
+    def render(self, specs):
+        """Render several specs in parallel and return their paths"""
+        futures = [self.submit(spec) for spec in specs]
+        return [future.result() for future in futures]
+
+    def wait(self):
+        """Block until all submitted charts are written; returns their paths"""
+        pending, self._pending = self._pending, []
+        return [future.result() for future in pending]
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+@lru_cache(maxsize=None)
+def get_render_service():
+    """The render service shared by the analysis scripts"""
+    return RenderService()